@@ -0,0 +1,99 @@
+"""Micro-benchmark for AT commands encoding
+
+Compares the previous string path (``_float2dec`` through ``struct.pack`` and
+``unpack`` per float, string concatenation, then ``str.replace`` and
+``encode`` on every tick) against the preformatted templates of
+``at_encoder``, for building ``AT*PCMD`` commands and for the 30 ms tick
+formatting the watchdog reset and the current command into a datagram.
+
+Usage
+------------------
+    $ python benchmarks/bench_at_encoder.py [--iterations 100000]
+"""
+from typing import Callable
+import argparse
+import random
+import struct
+import time
+
+from dronevis.drone_connect import at_encoder
+
+
+def legacy_float2dec(my_float: float) -> int:
+    """Previous conversion of a float to the integer sharing its representation"""
+    return int(struct.unpack("=l", struct.pack("f", float(my_float)))[0])
+
+
+def legacy_pcmd(
+    left_right: float, front_back: float, up_down: float, angle_change: float
+) -> str:
+    """Previous ``AT*PCMD`` formatting of ``Drone.navigate``"""
+    return (
+        "AT*PCMD=#ID#,1,"
+        + str(legacy_float2dec(left_right))
+        + ","
+        + str(legacy_float2dec(front_back))
+        + ","
+        + str(legacy_float2dec(up_down))
+        + ","
+        + str(legacy_float2dec(angle_change))
+        + "\r"
+    )
+
+
+def legacy_tick(com: str, counter: int) -> bytes:
+    """Previous datagram of a ``Command.run`` tick"""
+    payload = "AT*COMWDG\r"
+    payload += com.replace("#ID#", str(counter))
+    return payload.encode()
+
+
+def measure(name: str, func: Callable[[int], object], iterations: int) -> None:
+    """Print mean time per call"""
+    for index in range(1000):
+        func(index)  # warm up
+    start = time.perf_counter()
+    for index in range(iterations):
+        func(index)
+    elapsed = (time.perf_counter() - start) / iterations
+    print(f"{name:<32} {elapsed * 1e9:8.1f} ns/call")
+
+
+def main() -> None:
+    """Run the benchmark for both paths"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=100000)
+    args = parser.parse_args()
+
+    speeds = [
+        tuple(round(random.uniform(-1, 1), 1) for _ in range(4)) for _ in range(64)
+    ]
+    for speed in speeds:
+        assert legacy_pcmd(*speed) == str(at_encoder.pcmd(*speed))
+
+    measure(
+        "legacy navigate",
+        lambda index: legacy_pcmd(*speeds[index % 64]),
+        args.iterations,
+    )
+    measure(
+        "pcmd (uncached)",
+        lambda index: at_encoder.pcmd.__wrapped__(*speeds[index % 64]),
+        args.iterations,
+    )
+    measure(
+        "pcmd (cached)",
+        lambda index: at_encoder.pcmd(*speeds[index % 64]),
+        args.iterations,
+    )
+
+    com = legacy_pcmd(0.2, 0.0, 0.0, 0.0)
+    template = at_encoder.pcmd(0.2, 0.0, 0.0, 0.0)
+    heartbeat = at_encoder.frame(at_encoder.WATCHDOG, template)
+    assert legacy_tick(com, 42) == heartbeat.encode(42)[0]
+    measure("legacy tick", lambda index: legacy_tick(com, index), args.iterations)
+    measure("frame tick", heartbeat.encode, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
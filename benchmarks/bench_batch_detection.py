@@ -0,0 +1,47 @@
+"""Benchmark per-frame against batched inference for torch detection models
+
+Usage
+------------------
+    $ python benchmarks/bench_batch_detection.py [--model SSD] [--batch-size 4]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from dronevis.models.model_factory import ModelFactory
+
+
+def main() -> None:
+    """Run the benchmark and print frames per second for both paths"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", default="SSD", choices=["SSD", "Faster R-CNN"])
+    parser.add_argument("--batch-size", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    model = ModelFactory.create_model(args.model)
+    frames = [
+        np.random.randint(0, 255, (360, 640, 3), dtype=np.uint8)
+        for _ in range(args.batch_size)
+    ]
+    model.predict_batch(frames)  # warm up
+
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        for frame in frames:
+            model.predict(frame)
+    per_frame_fps = args.rounds * len(frames) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        for frame, detections in zip(frames, model.predict_batch(frames)):
+            model.render(frame, detections)
+    batch_fps = args.rounds * len(frames) / (time.perf_counter() - start)
+
+    print(f"{args.model} per-frame: {per_frame_fps:.2f} FPS")
+    print(f"{args.model} batch of {args.batch_size}: {batch_fps:.2f} FPS")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Micro-benchmark for navdata decoding
+
+Compares the previous decoder (option blocks split into lists and sliced
+``bytes``, a dictionary per option, one ``struct.unpack_from`` per field)
+against the precompiled layouts of ``decode_navdata``. Packets carry every
+registered option, like the full navdata sent by the drone, and are decoded
+with the default options, with all of them, and with checksum verification.
+
+Usage
+------------------
+    $ python benchmarks/bench_navdata_decode.py [--packets 10000]
+"""
+from typing import Any, Callable, Dict, List
+import argparse
+import random
+import struct
+import time
+
+from dronevis.drone_connect.navdata_decode import (
+    DRONE_STATE_BITS,
+    NAVDATA_OPTIONS,
+    GPSInfo,
+    NavdataDecoder,
+    NavdataDemo,
+    VisionDetect,
+    decode_navdata,
+    encode_navdata,
+    navdata_checksum,
+    navdata_decode,
+)
+
+
+def legacy_navdata_decode(packet: bytes) -> Dict[str, Dict[str, Any]]:
+    """Previous decoder splitting the packet into lists of sliced blocks"""
+    offset = 0
+    block: List[list] = [list(struct.unpack_from("=IIII", packet, 0))]
+    offset += struct.calcsize("=IIII")
+    i = 1
+    while True:
+        try:
+            current_block = list(struct.unpack_from("=HH", packet, offset))
+            offset += struct.calcsize("=HH")
+            block.append(current_block)
+        except struct.error:
+            break
+        block[i].append(
+            packet[offset : offset - struct.calcsize("=HH") + int(block[i][1])]
+        )
+        offset += block[i][1] - struct.calcsize("=HH")
+        i = i + 1
+
+    drone_state = {
+        name: block[0][1] >> bit & 1 for name, bit in DRONE_STATE_BITS.items()
+    }
+    navdata_demo: Dict[str, Any] = {}
+    vision_detect: Dict[str, Any] = {}
+    gps_info: Dict[str, Any] = {}
+    for i in range(1, len(block)):
+        data = block[i][2]
+        if block[i][0] == 0:
+            navdata_demo["ctrl_state"] = struct.unpack_from("=I", data, 0)[0]
+            navdata_demo["battery_percentage"] = struct.unpack_from("=I", data, 4)[0]
+            navdata_demo["theta"] = int(struct.unpack_from("=f", data, 8)[0] / 1000)
+            navdata_demo["phi"] = int(struct.unpack_from("=f", data, 12)[0] / 1000)
+            navdata_demo["psi"] = struct.unpack_from("=f", data, 16)[0]
+            navdata_demo["altitude"] = struct.unpack_from("=i", data, 20)[0]
+            navdata_demo["vx"] = int(struct.unpack_from("=f", data, 24)[0])
+            navdata_demo["vy"] = int(struct.unpack_from("=f", data, 28)[0])
+            navdata_demo["vz"] = int(struct.unpack_from("=f", data, 32)[0])
+        elif block[i][0] == 16:
+            vision_detect["nb_detected"] = struct.unpack_from("=I", data[0:20])[0]
+            vision_detect["xc"] = struct.unpack_from("=I", data[20:36])[0]
+            vision_detect["yc"] = struct.unpack_from("=I", data[36:52])[0]
+            vision_detect["width"] = struct.unpack_from("=I", data[52:68])[0]
+            vision_detect["height"] = struct.unpack_from("=I", data[68:84])[0]
+            vision_detect["distance"] = struct.unpack_from("=I", data[84:100])[0]
+        elif block[i][0] == 27:
+            unpacked = struct.unpack_from("=ddddBBB", data, 0)
+            gps_info["latitude"] = unpacked[0]
+            gps_info["longitude"] = unpacked[1]
+            gps_info["elevation"] = unpacked[2]
+            gps_info["hdop"] = unpacked[3]
+            gps_info["data_available"] = unpacked[4]
+            gps_info["zero_validated"] = unpacked[5]
+            gps_info["wpt_validated"] = unpacked[6]
+    return {
+        "drone_state": drone_state,
+        "vision_detect": vision_detect,
+        "navdata_demo": navdata_demo,
+        "gps_info": gps_info,
+    }
+
+
+def make_packets(num_packets: int) -> List[bytes]:
+    """Encode navdata packets with random flight values"""
+    packets = []
+    for sequence in range(num_packets):
+        options = {
+            "navdata_demo": NavdataDemo(
+                0x20000,
+                random.randint(0, 100),
+                random.uniform(-30000, 30000),
+                random.uniform(-30000, 30000),
+                random.uniform(-180000, 180000),
+                random.randint(0, 5000),
+                random.uniform(-2000, 2000),
+                random.uniform(-2000, 2000),
+                random.uniform(-2000, 2000),
+            ),
+            "vision_detect": VisionDetect(1, 320, 180, 40, 30, 1500),
+            "gps_info": GPSInfo(30.0444, 31.2357, 23.0, 1.2, 1, 1, 0),
+        }
+        for option in NAVDATA_OPTIONS.values():
+            if option.name not in options:
+                values = option.layout.unpack(random.randbytes(option.layout.size))
+                options[option.name] = option.record._make(values)
+        packets.append(encode_navdata(random.getrandbits(32), sequence, options))
+    return packets
+
+
+def measure(name: str, func: Callable[[bytes], object], packets: List[bytes]) -> None:
+    """Print mean decoding time per packet and the sustainable packet rate"""
+    for packet in packets[:100]:
+        func(packet)  # warm up
+    start = time.perf_counter()
+    for packet in packets:
+        func(packet)
+    elapsed = (time.perf_counter() - start) / len(packets)
+    print(f"{name:<28} {elapsed * 1e6:7.2f} us/packet {1 / elapsed:12.0f} packets/s")
+
+
+def main() -> None:
+    """Run the benchmark for every decoding path"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--packets", type=int, default=10000)
+    args = parser.parse_args()
+
+    packets = make_packets(args.packets)
+    assert legacy_navdata_decode(packets[0]) == navdata_decode(packets[0])
+
+    measure("legacy navdata_decode", legacy_navdata_decode, packets)
+    measure("navdata_decode (dicts)", navdata_decode, packets)
+    measure("decode_navdata (records)", decode_navdata, packets)
+    measure(
+        "decode_navdata (memoryview)",
+        decode_navdata,
+        [memoryview(packet) for packet in packets],
+    )
+    measure("all options", NavdataDecoder(NAVDATA_OPTIONS).decode, packets)
+    measure(
+        "verified checksum",
+        NavdataDecoder(verify_checksum=True).decode,
+        packets,
+    )
+    measure("python checksum", lambda packet: sum(packet[:-8]), packets)
+    measure(
+        "numpy checksum",
+        lambda packet: navdata_checksum(packet, len(packet) - 8),
+        packets,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Benchmark in-thread inference against the shared memory process backend
+
+The in-thread path runs the model on each frame in the calling thread, as the
+video thread does. The process backend spreads the same frames across worker
+processes, passing them through shared memory ring slots. Models with
+GIL-bound pre- and postprocessing (e.g. "Pose", "Segment") gain the most.
+
+Usage
+------------------
+    $ python benchmarks/bench_shared_inference.py [--model HaarFaceDetector] [--workers 4]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from dronevis.models import models_list
+from dronevis.models.model_factory import ModelFactory
+from dronevis.utils.fan_out import infer
+from dronevis.utils.shared_inference import SharedMemoryBackend
+
+
+def main() -> None:
+    """Run the benchmark and print frames per second for both paths"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", default="HaarFaceDetector", choices=models_list)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--frames", type=int, default=200)
+    args = parser.parse_args()
+
+    frames = [
+        np.random.randint(0, 255, (360, 640, 3), dtype=np.uint8) for _ in range(16)
+    ]
+
+    model = ModelFactory.create_model(args.model)
+    infer(model, frames[0])  # warm up
+    start = time.perf_counter()
+    for index in range(args.frames):
+        infer(model, frames[index % len(frames)])
+    thread_fps = args.frames / (time.perf_counter() - start)
+
+    with SharedMemoryBackend(args.model, args.workers) as backend:
+        backend.map(frames[: args.workers])  # warm up
+        start = time.perf_counter()
+        futures = [
+            backend.submit(frames[index % len(frames)]) for index in range(args.frames)
+        ]
+        for future in futures:
+            future.result()
+        process_fps = args.frames / (time.perf_counter() - start)
+
+    print(f"{args.model} in-thread: {thread_fps:.2f} FPS")
+    print(f"{args.model} {args.workers} shared memory workers: {process_fps:.2f} FPS")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Micro-benchmark for TorchDetectionModel preprocessing and drawing
+
+Compares the previous path (PIL round-trip for preprocessing, float32 copies
+and two color conversions for drawing) against the tensor-native path and
+in-place ``uint8`` drawing. Reports time and peak numpy allocations per frame
+(``tracemalloc`` does not see torch's own tensor allocations).
+
+Usage
+------------------
+    $ python benchmarks/bench_torch_preprocessing.py [--frames 200]
+"""
+from typing import Callable
+import argparse
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+import torch
+from torchvision.models.detection import SSDLite320_MobileNet_V3_Large_Weights
+from torchvision.transforms.functional import to_pil_image
+
+from dronevis.models import SSD
+
+BOXES = np.array([[10, 10, 100, 100], [200, 50, 300, 200]], dtype=np.int32)
+CLASSES = ["person", "car"]
+LABELS = torch.tensor([1, 3])
+
+
+def legacy_transform(model: SSD, image: np.ndarray) -> torch.Tensor:
+    """Previous preprocessing going through a PIL image"""
+    assert model.transform is not None
+    return model.transform(to_pil_image(image))
+
+
+def legacy_draw(model: SSD, image: np.ndarray) -> np.ndarray:
+    """Previous drawing on a float32 copy with two color conversions"""
+    image = cv2.cvtColor(np.asarray(image, dtype=np.float32), cv2.COLOR_BGR2RGB)
+    for i, box in enumerate(BOXES):
+        color = model.colors[LABELS[i]]
+        cv2.rectangle(image, tuple(box[:2]), tuple(box[2:]), color, 2)
+    return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+
+def measure(name: str, func: Callable[[np.ndarray], object], num_frames: int) -> None:
+    """Print mean time and peak traced allocation of ``func`` per frame"""
+    frame = np.random.randint(0, 255, (360, 640, 3), dtype=np.uint8)
+    func(frame.copy())  # warm up
+    frames = [frame.copy() for _ in range(num_frames)]
+
+    tracemalloc.start()
+    peak = 0
+    start = time.perf_counter()
+    for image in frames:
+        tracemalloc.reset_peak()
+        func(image)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+    elapsed = (time.perf_counter() - start) / num_frames
+    tracemalloc.stop()
+    print(f"{name:<28} {elapsed * 1000:7.3f} ms/frame {peak / 1024:10.1f} KiB peak")
+
+
+def main() -> None:
+    """Run the benchmark for both paths"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=200)
+    args = parser.parse_args()
+
+    model = SSD()
+    model.transform = SSDLite320_MobileNet_V3_Large_Weights.DEFAULT.transforms()
+
+    measure("legacy transform_img", lambda img: legacy_transform(model, img), args.frames)
+    measure("tensor transform_img", model.transform_img, args.frames)
+    measure("legacy draw_boxes", lambda img: legacy_draw(model, img), args.frames)
+    measure(
+        "in-place draw_boxes",
+        lambda img: model.draw_boxes(BOXES, CLASSES, LABELS, img),
+        args.frames,
+    )
+
+
+if __name__ == "__main__":
+    main()
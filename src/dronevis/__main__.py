@@ -23,6 +23,7 @@ from dronevis.drone_connect import DemoDrone, Drone
 from dronevis.ui.drone_cli import DroneCli
 from dronevis.utils.general import library_ontro, init_logger
 from dronevis.abstract.base_drone import BaseDrone
+from dronevis.utils.headless import run_headless
 
 _LOG = logging.getLogger(__name__)
 
@@ -35,6 +36,15 @@ def main(arguments: Optional[Sequence[str]] = None) -> None:
     args = cli.parse(arguments)
     init_logger(level=args.logger_level)
 
+    if args.mode == "headless":
+        try:
+            run_headless(args)
+        except KeyboardInterrupt:
+            _LOG.warning("Keyinterrupt: closing headless pipeline ...")
+        except (ConnectionError, ValueError) as error:
+            _LOG.error("An error occured: %s", error)
+        return
+
     # initialize drone instance
     if args.drone == "demo":
         drone: BaseDrone = DemoDrone()
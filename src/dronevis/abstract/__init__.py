@@ -1,2 +1,4 @@
 """Retrieve abstract classes imports"""
 from dronevis.abstract.abstract_model import CVModel
+from dronevis.abstract.detections import Detections
+from dronevis.abstract.abstract_sink import Sink
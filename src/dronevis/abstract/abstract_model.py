@@ -1,8 +1,14 @@
 """Interface for computer vision model. All models implemented should be
 an implementation of this interface for code integrity"""
+from typing import ContextManager, Optional, Sequence
 from abc import ABC, abstractmethod
+from contextlib import nullcontext
 import numpy as np
 
+from dronevis.abstract.detections import Detections
+from dronevis.utils.drawing import draw_detections
+from dronevis.utils.metrics import MetricsRegistry
+
 
 class CVModel(ABC):
     """Base class for creating custom comptervision models.
@@ -27,8 +33,17 @@ class CVModel(ABC):
 
     4. ``detect_webcam``
     Start webcam (or any camera) detection
+
+    5. ``detect`` and ``render`` *(optional)*
+    Get compact array-backed detections without drawing anything, then draw them
+    only if needed. Headless pipelines can skip rendering all together.
+
+    If ``metrics`` is set to a ``MetricsRegistry``, models may record the timings
+    of their internal stages (e.g. preprocess and forward) with ``time_stage``.
     """
 
+    metrics: Optional[MetricsRegistry] = None
+
     @abstractmethod
     def load_model(self):
         """Load model weights from disk"""
@@ -37,6 +52,37 @@ class CVModel(ABC):
     def predict(self, image) -> np.ndarray:
         """Get predictions for inference on input image"""
 
+    def detect(self, image: np.ndarray) -> Detections:
+        """Get structured detections (boxes, scores, class ids, and optionally masks
+        or keypoints) for inference on input image, without rendering them
+
+        Raises:
+            NotImplementedError: The model only produces rendered images
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support structured detections"
+        )
+
+    def render(self, image: np.ndarray, detections: Detections) -> np.ndarray:
+        """Draw detections returned by ``detect`` on the image (in-place)"""
+        return draw_detections(image, detections)
+
+    def time_stage(self, stage: str) -> ContextManager:
+        """Time the enclosed block as a stage in the model metrics, if any"""
+        if self.metrics is None:
+            return nullcontext()
+        return self.metrics.time(stage)
+
+    @property
+    def class_names(self) -> Optional[Sequence[str]]:
+        """Names indexed by the class ids of ``detect``, if the model has any"""
+        return None
+
+    @property
+    def supports_detect(self) -> bool:
+        """Whether the model implements ``detect``"""
+        return type(self).detect is not CVModel.detect
+
     @abstractmethod
     def transform_img(self, image):
         """Transform input image using model transformations"""
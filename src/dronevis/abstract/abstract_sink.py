@@ -0,0 +1,38 @@
+"""Interface for output sinks of the headless video pipeline"""
+from typing import Optional
+from abc import ABC, abstractmethod
+import numpy as np
+
+from dronevis.abstract.detections import Detections
+
+
+class Sink(ABC):
+    """Base class for consumers of the pipeline outputs (e.g. log files or videos).
+
+    Sinks that need the rendered image set ``needs_image``, otherwise the
+    pipeline skips rendering all together.
+    """
+
+    needs_image = False
+
+    @abstractmethod
+    def write(
+        self,
+        frame_index: int,
+        timestamp: float,
+        detections: Optional[Detections],
+        image: Optional[np.ndarray],
+    ) -> None:
+        """Consume the outputs of a single frame
+
+        Args:
+            frame_index (int): Index of the frame in the source
+            timestamp (float): Seconds since the pipeline started
+            detections (Optional[Detections]): Model detections, or ``None`` if
+            the model only produces rendered images
+            image (Optional[np.ndarray]): Rendered image, only provided if
+            ``needs_image`` is set
+        """
+
+    def close(self) -> None:
+        """Flush and release the sink resources"""
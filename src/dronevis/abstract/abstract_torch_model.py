@@ -1,16 +1,16 @@
 """Interface for models implemented with PyTorch"""
-from typing import Union, List, Optional
+from typing import Union, List, Optional, Sequence
 import time
 import logging
 
 import numpy as np
 import torch
 import torchvision
-from torchvision.transforms.functional import to_pil_image
 import cv2
 
 from dronevis.config.general import COCO_NAMES
 from dronevis.abstract.abstract_model import CVModel
+from dronevis.abstract.detections import Detections
 from dronevis.utils.general import write_fps
 
 _LOG = logging.getLogger(__name__)
@@ -22,6 +22,10 @@ class TorchDetectionModel(CVModel):
 
     For each prediction, the model output 300 labels, and their corresponding 300 scores.
     Labels are picked if they surpass the threshold accuracy.
+
+    Input frames are assumed to be ``uint8`` BGR arrays (as read by OpenCV). They are
+    converted to tensors without any intermediate PIL image, and boxes are drawn
+    in-place on the input frame.
     """
 
     coco_names = COCO_NAMES
@@ -57,6 +61,45 @@ class TorchDetectionModel(CVModel):
         Returns:
             numpy.ndarray: output image with boxes drawn
         """
+        detections = self.detect(image, detection_threshold)
+        self.boxes = detections.boxes.astype(np.int32)
+        self.pred_scores = detections.scores
+        self.pred_classes = [self.coco_names[i] for i in detections.class_ids]
+        return self.render(image, detections)
+
+    def detect(
+        self,
+        image: np.ndarray,
+        detection_threshold: float = 0.7,
+    ) -> Detections:
+        """Get boxes, scores and class ids of objects in an image without drawing
+
+        Args:
+            image (numpy.ndarray): video frame or image to predict the classes in it
+            detection_threshold (float): thershold to determine if the calss will be taken or not
+
+        Returns:
+            Detections: detections with a score above the threshold
+        """
+        return self.predict_batch([image], detection_threshold)[0]
+
+    def predict_batch(
+        self,
+        images: Sequence[np.ndarray],
+        detection_threshold: float = 0.7,
+    ) -> List[Detections]:
+        """Run a single forward pass over a micro-batch of images
+
+        Images of the same size are stacked into one tensor, otherwise they are
+        passed as a list which torchvision detection models batch internally.
+
+        Args:
+            images (Sequence[numpy.ndarray]): video frames or images to predict on
+            detection_threshold (float): thershold to determine if the calss will be taken or not
+
+        Returns:
+            List[Detections]: boxes, scores and class ids above the threshold for each image
+        """
         assert (
             self.net
         ), "Model not initialized! You need to load the model first. Please run `load_model`."
@@ -64,30 +107,67 @@ class TorchDetectionModel(CVModel):
             0.0 <= detection_threshold <= 1.0
         ), "Threshold must be a float between 0 and 1."
 
-        input_image = image
+        if len(images) == 0:
+            return []
+
         with torch.no_grad():
-            transformed_image = self.transform_img(image).to(self.device)
-            transformed_image = transformed_image.unsqueeze(0)  # add a batch dimension
-            outputs = self.net(transformed_image)[0]  # get outputs array
-            self.pred_classes = [
-                self.coco_names[i] for i in outputs["labels"].cpu().numpy()
-            ]
-            pred_scores = outputs["scores"].detach().cpu().numpy()
-            pred_bboxes = outputs["boxes"].detach().cpu().numpy()
-            boxes = pred_bboxes[pred_scores >= detection_threshold].astype(np.int32)
-
-        drawn_image = self.draw_boxes(
-            boxes,
-            self.pred_classes,
-            outputs["labels"],
-            input_image,
+            with self.time_stage("preprocess"):
+                tensors = [self.transform_img(image) for image in images]
+                if all(tensor.shape == tensors[0].shape for tensor in tensors):
+                    batch: Union[torch.Tensor, List[torch.Tensor]] = torch.stack(
+                        tensors
+                    )
+                else:
+                    batch = tensors
+            with self.time_stage("forward"):
+                outputs = self.net(batch)
+
+        detections = []
+        with self.time_stage("postprocess"):
+            for output in outputs:
+                scores = output["scores"].cpu().numpy()
+                keep = scores >= detection_threshold
+                detections.append(
+                    Detections(
+                        boxes=output["boxes"].cpu().numpy()[keep],
+                        scores=scores[keep],
+                        class_ids=output["labels"].cpu().numpy()[keep],
+                    )
+                )
+        return detections
+
+    @property
+    def class_names(self) -> Sequence[str]:
+        """COCO class names indexed by class ids"""
+        return self.coco_names
+
+    def render(
+        self,
+        image: np.ndarray,
+        detections: Detections,
+    ) -> np.ndarray:
+        """Draw boxes and class names of detections on an image
+
+        Args:
+            image (numpy.ndarray): an image to draw boxes on.
+            detections (Detections): detections returned by ``detect`` or ``predict_batch``
+
+        Returns:
+            numpy.ndarray: cv2 image after drawing boxes of the detected classes on it
+        """
+        classes = [self.coco_names[i] for i in detections.class_ids]
+        return self.draw_boxes(
+            detections.boxes.astype(np.int32),
+            classes,
+            detections.class_ids,
+            image,
         )
-        self.boxes = boxes
-        self.pred_scores = pred_scores
-        return drawn_image
 
     def transform_img(self, image: np.ndarray) -> torch.Tensor:
-        """Transform image to tensor
+        """Transform BGR image to an RGB float tensor in ``[0, 1]``
+
+        The ``uint8`` array is moved to the device as is, then the channels are
+        reordered and the model transformation converts it to float in one pass.
 
         Args:
             img (numpy.ndarray): input array
@@ -98,8 +178,9 @@ class TorchDetectionModel(CVModel):
         assert (
             self.transform is not None
         ), "Model not initialized. You need to load the model first. Please run `load_model`."
-        pil_image = to_pil_image(image)
-        transformed_image = self.transform(pil_image).to(self.device)
+        tensor = torch.from_numpy(np.ascontiguousarray(image)).to(self.device)
+        tensor = tensor.permute(2, 0, 1).flip(0)  # HWC BGR -> CHW RGB
+        transformed_image = self.transform(tensor)
         return transformed_image
 
     def draw_boxes(
@@ -119,9 +200,10 @@ class TorchDetectionModel(CVModel):
 
         Returns:
             numpy.ndarray: cv2 image after drawing boxes of the predicted classes on
-            it with their labels
+            it with their labels. ``uint8`` images are drawn on in-place.
         """
-        image = cv2.cvtColor(np.asarray(image, dtype=np.float32), cv2.COLOR_BGR2RGB)
+        if image.dtype != np.uint8:
+            image = np.clip(image, 0, 255).astype(np.uint8)
         for i, box in enumerate(boxes):
             color = self.colors[labels[i]]
             cv2.rectangle(
@@ -141,7 +223,7 @@ class TorchDetectionModel(CVModel):
                 thickness=2,
                 lineType=cv2.LINE_AA,
             )
-        return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        return image
 
     def detect_webcam(
         self,
@@ -168,7 +250,6 @@ class TorchDetectionModel(CVModel):
                 image = self.predict(frame, 0.7)
             fps = 1 / (time.time() - prev_time)
             wait_time = max(1, int(fps / 4))
-            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
             cv2.imshow(window_name, write_fps(image, fps))
             if cv2.waitKey(wait_time) & 0xFF == ord("q"):
                 break
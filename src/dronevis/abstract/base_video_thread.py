@@ -1,12 +1,21 @@
 """Interface for video thread"""
 # mypy: ignore-errors
 import threading
-from typing import Callable, Union
+from typing import Callable, List, Optional, Union
+from dataclasses import dataclass
 import logging
 import time
 import cv2
+import numpy as np
 
+from dronevis.abstract.abstract_model import CVModel
+from dronevis.abstract.detections import Detections
 from dronevis.utils.general import write_fps
+from dronevis.utils.frame_grabber import FrameGrabber
+from dronevis.utils.frame_scheduler import FrameScheduler
+from dronevis.utils.metrics import MetricsRegistry
+from dronevis.utils.recording import SessionRecorder, open_capture
+from dronevis.utils.fan_out import ModelFanOut
 from dronevis.models.model_factory import ModelFactory
 
 _LOG = logging.getLogger(__name__)
@@ -26,10 +35,48 @@ class Singleton(type):
         return cls._instances[cls]
 
 
+@dataclass
+class ModelSwitch:
+    """Timings of a model switch in seconds"""
+
+    model_name: str
+    requested_at: float
+    load_time: float
+    warmup_time: float
+    latency: float = 0.0
+
+
 class BaseVideoThread(threading.Thread, metaclass=Singleton):
-    """Abstract class for the video used in both `Drone` and `DemoDrone`"""
+    """Abstract class for the video used in both `Drone` and `DemoDrone`
+
+    Frames are decoded by a dedicated ``FrameGrabber`` thread which only keeps
+    the newest frame, while this thread runs the inference on it. Hence, a slow
+    model drops frames instead of lagging behind the stream.
+
+    The loop is paced by a ``FrameScheduler`` at ``target_fps``. With ``skip_frames``
+    set to N, the model runs on every Nth frame and its last detections (or last
+    output) are reused in between. While paused, the thread blocks on a condition
+    instead of spinning.
+
+    With ``batch_size`` larger than one and a model providing ``predict_batch``,
+    frames that queued up while the model was busy (e.g. replaying recorded footage)
+    are run through the model as a single micro-batch.
+
+    Changing the model loads and warms up the new model in a background thread,
+    while the current model keeps serving frames. The video thread swaps the
+    models between two frames once the new one is ready.
+
+    With a ``ModelFanOut`` set by ``set_fan_out``, each decoded frame is run
+    through several models in parallel instead, and their outputs are composed.
+
+    Timings of the ``capture``, ``inference``, ``draw`` and ``callback`` stages
+    (along with the internal stages of models supporting them), frame counters,
+    dropped frames, queue depth and rates are recorded in ``metrics``.
+    """
 
     frame_name = "Drone Capture"
+    read_timeout = 0.1
+    warmup_shape = (360, 640, 3)
 
     def __init__(
         self,
@@ -38,6 +85,9 @@ class BaseVideoThread(threading.Thread, metaclass=Singleton):
         model_name: str,
         ip_address: str = "192.168.1.1",
         video_index: Union[int, str] = 0,
+        target_fps: float = 30.0,
+        skip_frames: int = 1,
+        batch_size: int = 1,
     ):
         if not hasattr(closing_callback, "__call__"):
             err_message = "Close callback provided is not callable"
@@ -58,58 +108,203 @@ class BaseVideoThread(threading.Thread, metaclass=Singleton):
         self.close_callback = closing_callback
         self.operation_callback = operation_callback
         self.ip_address = ip_address
+        self.metrics = MetricsRegistry()
         self.model = ModelFactory.create_model(model_name)
+        self.model.metrics = self.metrics
+        self.model_name = model_name
+        self.last_model_switch: Optional[ModelSwitch] = None
+        self._pending_model = None
+        self._pending_switch: Optional[ModelSwitch] = None
+        self.fan_out: Optional[ModelFanOut] = None
+        self._pending_fan_out: Optional[ModelFanOut] = None
+        self._fan_out_requested = False
+        self._capture_requested = False
+        self._model_request = 0
         self.running = False
         self._video_index = video_index
         self.is_stopped = False
         self.is_destroyed = True
-        self.cap = cv2.VideoCapture(self._video_index)
+        self.cap = open_capture(self._video_index)
+        self.recorder: Optional[SessionRecorder] = None
+        self.grabber: Optional[FrameGrabber] = None
+        self.scheduler = FrameScheduler(target_fps, skip_frames)
+        self.batch_size = batch_size
+        self._last_output: Optional[np.ndarray] = None
+        self._last_detections: Optional[Detections] = None
+        self._dropped_frames = 0
         self._show_window = True
+        self._state_condition = threading.Condition()
         self.start()
 
     def run(self) -> None:
         """Create video stream and view frames"""
         if not self.cap.isOpened():
             _LOG.warning("Error while trying to read video. Please check path again")
-        prev_time = time.perf_counter()
         while not self.is_stopped:
-            fps = 1 / (time.perf_counter() - prev_time)
-            prev_time = time.perf_counter()
+            self._apply_pending_model()
+            self._apply_pending_fan_out()
+            self._apply_pending_capture()
             if not self.running:
-                if not self.is_destroyed:
-                    cv2.destroyWindow(self.frame_name)
-                    self.cap.release()
-                    self.is_destroyed = True
+                self._release_capture()
+                with self._state_condition:
+                    self._state_condition.wait_for(
+                        lambda: self.running
+                        or self.is_stopped
+                        or self._pending_model is not None
+                    )
+                self.scheduler.reset()
+                self._clear_last_outputs()
                 continue
 
             if not self.cap.isOpened():
-                self.cap = cv2.VideoCapture(self._video_index)
+                self.cap = open_capture(self._video_index)
+
+            grabber = self.grabber
+            if grabber is None:
+                grabber = FrameGrabber(
+                    self.cap,
+                    self.scheduler.capture_rate,
+                    queue_size=self.batch_size if self.is_batching else 1,
+                    metrics=self.metrics,
+                    recorder=self.recorder,
+                )
+                self.grabber = grabber
+                grabber.start()
 
-            status, frame = self.cap.read()
+            status, frames = grabber.read_batch(
+                self.batch_size if self.is_batching else 1,
+                timeout=self.read_timeout,
+            )
 
             if not status:
                 _LOG.warning("Stop reading the video stream")
                 break
 
+            self.metrics.set_gauge("queue_depth", grabber.queue_depth)
+            if not frames:
+                continue
+
             if not self._show_window:
                 _LOG.critical("Showing frames ...")
                 continue
 
             self.is_destroyed = False
-            output_image = self.model.predict(frame)
-            output_image = write_fps(output_image, fps)
-            self.operation_callback(output_image, frame)
-            predict_time = int((time.perf_counter() - prev_time) * 1000)
-            if predict_time > 30:
-                continue
-            time.sleep((30 - predict_time) / 1000)
+            if len(frames) > 1:
+                self._process_batch(frames)
+            else:
+                self._process_frame(frames[0])
 
         _LOG.info("Closing video stream ...")
-        self.cap.release()
+        self._stop_grabber(release_capture=True)
+        self._apply_pending_fan_out()
+        if self.fan_out is not None:
+            self.fan_out.close()
         cv2.destroyAllWindows()
         self.close_callback()
         _LOG.info("Closed video stream")
 
+    @property
+    def is_batching(self) -> bool:
+        """Whether queued frames are fed to the model as a micro-batch"""
+        return (
+            self.fan_out is None
+            and self.batch_size > 1
+            and hasattr(self.model, "predict_batch")
+        )
+
+    def _process_frame(self, frame: np.ndarray) -> None:
+        """Run inference on a single frame. In skip-N mode, the last detections are
+        rendered on the frames in between, or the last output is reused for models
+        without structured detections. With a fan-out, its models run instead.
+        Models draw in-place, so they get a copy and the operation callback
+        receives the untouched frame."""
+        if self.fan_out is not None:
+            with self.metrics.time("inference"):
+                output_image = self.fan_out.process(frame)
+            self._count_inference()
+            self._display(output_image, frame)
+            return
+
+        model = self.model
+        is_inference_frame = self.scheduler.should_infer()
+        if self.scheduler.skip_frames > 1 and model.supports_detect:
+            if is_inference_frame or self._last_detections is None:
+                with self.metrics.time("inference"):
+                    self._last_detections = model.detect(frame)
+                self._count_inference()
+            with self.metrics.time("draw"):
+                output_image = model.render(frame.copy(), self._last_detections)
+        elif is_inference_frame or self._last_output is None:
+            with self.metrics.time("inference"):
+                output_image = model.predict(frame.copy())
+            self._count_inference()
+            if self.scheduler.skip_frames > 1:
+                self._last_output = output_image.copy()
+        else:
+            output_image = self._last_output.copy()
+        self._display(output_image, frame)
+
+    def _process_batch(self, frames: List[np.ndarray]) -> None:
+        """Run a single batched inference on queued frames, then display
+        each of them at the scheduler pace. The inference time is recorded
+        per frame (the batch time divided by the number of frames)."""
+        model = self.model
+        start = time.perf_counter()
+        detections = model.predict_batch(frames)
+        frame_time = (time.perf_counter() - start) / len(frames)
+        for _ in frames:
+            self.metrics.observe("inference", frame_time)
+        self.metrics.increment("batches")
+        for frame, frame_detections in zip(frames, detections):
+            self._count_inference()
+            with self.metrics.time("draw"):
+                output_image = model.render(frame.copy(), frame_detections)
+            self._display(output_image, frame)
+            if not self.running:
+                break
+
+    def _display(self, output_image: np.ndarray, frame: np.ndarray) -> None:
+        """Hand the output image to the operation callback, then wait for the
+        next frame deadline"""
+        display_fps = self.scheduler.display_rate.rate
+        with self.metrics.time("draw"):
+            output_image = write_fps(output_image, display_fps)
+        with self.metrics.time("callback"):
+            self.operation_callback(output_image, frame)
+        self.scheduler.display_rate.tick()
+        self.metrics.increment("frames")
+        self.metrics.set_gauge("display_fps", display_fps)
+        self.metrics.set_gauge("capture_fps", self.capture_fps)
+        self._wait_while_running(self.scheduler.time_to_next_frame())
+
+    def _count_inference(self) -> None:
+        """Record a model inference in rates and metrics"""
+        self.scheduler.inference_rate.tick()
+        self.metrics.increment("inferences")
+        self.metrics.set_gauge("inference_fps", self.inference_fps)
+
+    def _clear_last_outputs(self) -> None:
+        """Forget outputs reused in skip-N mode"""
+        self._last_output = None
+        self._last_detections = None
+
+    def _wait_while_running(self, timeout: float) -> None:
+        """Sleep for ``timeout`` seconds, unless the thread is stopped or closed"""
+        if timeout <= 0:
+            return
+        with self._state_condition:
+            self._state_condition.wait_for(
+                lambda: not self.running or self.is_stopped,
+                timeout,
+            )
+
+    def _release_capture(self) -> None:
+        """Release capture resources while the stream is paused"""
+        self._stop_grabber(release_capture=not self.is_destroyed)
+        if not self.is_destroyed:
+            cv2.destroyWindow(self.frame_name)
+            self.is_destroyed = True
+
     @property
     def video_index(self) -> Union[str, int]:
         """Getter for video index property"""
@@ -117,9 +312,54 @@ class BaseVideoThread(threading.Thread, metaclass=Singleton):
 
     @video_index.setter
     def video_index(self, index: Union[str, int]) -> None:
-        """Setter for video index property"""
-        self._video_index = index
-        self.cap = cv2.VideoCapture(self._video_index)
+        """Setter for video index property. The video thread switches to the
+        new capture between two frames, and releases the previous one."""
+        with self._state_condition:
+            self._video_index = index
+            self._capture_requested = True
+            self._state_condition.notify_all()
+
+    def _apply_pending_capture(self) -> None:
+        """Open the requested capture between two frames"""
+        with self._state_condition:
+            if not self._capture_requested:
+                return
+            self._capture_requested = False
+            video_index = self._video_index
+        self._stop_grabber(release_capture=True)
+        self.cap = open_capture(video_index)
+        self._clear_last_outputs()
+        _LOG.info("Video thread captures %s", video_index)
+
+    @property
+    def dropped_frames(self) -> int:
+        """Number of decoded frames superseded before running inference on them"""
+        if self.grabber is None:
+            return self._dropped_frames
+        return self._dropped_frames + self.grabber.dropped_frames
+
+    def _stop_grabber(self, release_capture: bool = False) -> None:
+        """Stop the capture thread, and keep track of its dropped frames
+
+        Args:
+            release_capture (bool, optional): Whether to release the capture. A
+            grabber still blocked reading a frame releases it once it exits.
+            Defaults to False.
+        """
+        grabber, self.grabber = self.grabber, None
+        if grabber is None:
+            if release_capture:
+                self.cap.release()
+            return
+        grabber.stop(release_capture)
+        grabber.join(timeout=1)
+        if grabber.is_alive():
+            # The capture can't be read by another grabber either, hence it is
+            # left to the stalled grabber, and reopened on resume
+            _LOG.warning("Capture thread is still reading a frame, leaving it behind")
+            grabber.stop(release_capture=True)
+            self.cap = cv2.VideoCapture()
+        self._dropped_frames += grabber.dropped_frames
 
     @property
     def show_window(self) -> bool:
@@ -131,20 +371,169 @@ class BaseVideoThread(threading.Thread, metaclass=Singleton):
         """Setter for show window property"""
         self._show_window = is_shown
 
-    def change_model(self, model_name: str):
-        """Change computer vision model running on the video stream"""
+    def change_model(self, model_name: str) -> threading.Thread:
+        """Change computer vision model running on the video stream.
 
-        self.model = ModelFactory.create_model(model_name)
-        _LOG.debug("Model for video thread changed")
+        The new model is loaded and warmed up with a dummy inference in the
+        background, while the current model keeps running. Models retrieved from
+        the model cache may already be running elsewhere (e.g. on this video
+        stream), hence they are not warmed up. If the model is changed again
+        before loading is done, only the latest model is applied.
+
+        Args:
+            model_name (str): Name of the new model
+
+        Returns:
+            threading.Thread: Thread loading the new model
+        """
+        if model_name not in ModelFactory.models_list:
+            err_message = f"Model {model_name} is not supported"
+            _LOG.critical(err_message)
+            raise ValueError(err_message)
+
+        with self._state_condition:
+            self._model_request += 1
+            request = self._model_request
+
+        loader = threading.Thread(
+            target=self._load_model,
+            args=(model_name, request, time.perf_counter()),
+            name="ModelLoader",
+            daemon=True,
+        )
+        loader.start()
+        return loader
+
+    def _load_model(self, model_name: str, request: int, requested_at: float) -> None:
+        """Load and warm up a model, then hand it over to the video thread"""
+        _LOG.info("Loading model %s in the background ...", model_name)
+        is_cached = model_name in ModelFactory.cached_models()
+        try:
+            model = ModelFactory.create_model(model_name)
+        # pylint: disable=broad-exception-caught
+        except Exception as error:
+            _LOG.error("Could not load model %s: %s", model_name, error)
+            return
+        load_time = time.perf_counter() - requested_at
+
+        warmup_start = time.perf_counter()
+        if not is_cached:
+            self._warm_up(model, model_name)
+        warmup_time = time.perf_counter() - warmup_start
+
+        with self._state_condition:
+            if request != self._model_request:
+                _LOG.debug("Model %s superseded before swapping", model_name)
+                return
+            self._pending_model = model
+            self._pending_switch = ModelSwitch(
+                model_name=model_name,
+                requested_at=requested_at,
+                load_time=load_time,
+                warmup_time=warmup_time,
+            )
+            self._state_condition.notify_all()
+
+    def _warm_up(self, model: CVModel, model_name: str) -> None:
+        """Run a dummy inference on a model which is not shared yet"""
+        dummy_frame = np.zeros(self.warmup_shape, dtype=np.uint8)
+        try:
+            if model.supports_detect:
+                model.detect(dummy_frame)
+            else:
+                model.predict(dummy_frame)
+        # pylint: disable=broad-exception-caught
+        except Exception as error:
+            _LOG.warning("Warmup of model %s failed: %s", model_name, error)
+
+    def _apply_pending_model(self) -> None:
+        """Swap in the loaded model between two frames"""
+        with self._state_condition:
+            model, self._pending_model = self._pending_model, None
+            switch = self._pending_switch
+        if model is None:
+            return
+
+        switch.latency = time.perf_counter() - switch.requested_at
+        model.metrics = self.metrics
+        self.model = model
+        self.model_name = switch.model_name
+        self._clear_last_outputs()
+        self.last_model_switch = switch
+        self.metrics.observe("model_load", switch.load_time)
+        self.metrics.observe("model_warmup", switch.warmup_time)
+        self.metrics.observe("model_switch", switch.latency)
+        _LOG.info(
+            "Model for video thread changed to %s in %.3fs (load %.3fs, warmup %.3fs)",
+            switch.model_name,
+            switch.latency,
+            switch.load_time,
+            switch.warmup_time,
+        )
+
+    def set_fan_out(self, fan_out: Optional[ModelFanOut]) -> None:
+        """Run several models on each frame (or a single one again with None).
+        The fan-out is swapped in between two frames, and the previous one is
+        closed by the video thread.
+
+        Args:
+            fan_out (Optional[ModelFanOut]): Models to run on each frame
+        """
+        if fan_out is not None:
+            fan_out.metrics = self.metrics
+        with self._state_condition:
+            replaced, self._pending_fan_out = self._pending_fan_out, fan_out
+            self._fan_out_requested = True
+        if replaced is not None:
+            replaced.close()
+
+    def _apply_pending_fan_out(self) -> None:
+        """Swap in the requested fan-out between two frames"""
+        with self._state_condition:
+            if not self._fan_out_requested:
+                return
+            fan_out, self._pending_fan_out = self._pending_fan_out, None
+            self._fan_out_requested = False
+        previous, self.fan_out = self.fan_out, fan_out
+        self._clear_last_outputs()
+        if previous is not None:
+            previous.close()
+        _LOG.info(
+            "Video thread runs %s",
+            "a single model"
+            if self.fan_out is None
+            else f"{len(self.fan_out.branches)} models",
+        )
+
+    @property
+    def capture_fps(self) -> float:
+        """Achieved rate of decoded frames"""
+        return self.scheduler.capture_rate.rate
+
+    @property
+    def inference_fps(self) -> float:
+        """Achieved rate of model inferences"""
+        return self.scheduler.inference_rate.rate
+
+    @property
+    def display_fps(self) -> float:
+        """Achieved rate of frames delivered to the operation callback"""
+        return self.scheduler.display_rate.rate
 
     def stop(self) -> None:
         """Stop the running video thread"""
-        self.running = False
+        with self._state_condition:
+            self.running = False
+            self._state_condition.notify_all()
 
     def resume(self) -> None:
         """Resume running the thread and video capture"""
-        self.running = True
+        with self._state_condition:
+            self.running = True
+            self._state_condition.notify_all()
 
     def close_thread(self) -> None:
         """Irrecoverably closing the thread"""
-        self.is_stopped = True
+        with self._state_condition:
+            self.is_stopped = True
+            self._state_condition.notify_all()
@@ -0,0 +1,27 @@
+"""Array-backed container for model detections on a single image"""
+from typing import Optional
+from dataclasses import dataclass, field
+import numpy as np
+
+
+@dataclass
+class Detections:
+    """Detections of a computer vision model on a single image.
+
+    All arrays share the same first dimension ``N`` (number of detections).
+    Boxes are in pixel coordinates as ``(x1, y1, x2, y2)``. Masks are boolean
+    ``(N, H, W)`` arrays with the size of the input image, and keypoints are
+    ``(N, K, 2)`` pixel coordinates (or ``(N, K, 3)`` with a confidence).
+    """
+
+    boxes: np.ndarray = field(
+        default_factory=lambda: np.zeros((0, 4), dtype=np.float32)
+    )
+    scores: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.float32))
+    class_ids: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    masks: Optional[np.ndarray] = None
+    keypoints: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        """Number of detections"""
+        return len(self.boxes)
@@ -30,3 +30,6 @@ MAX_VELOCITY = 2.0  # m/s
 MILLI_TO_METER_FACTOR = 1 / 1000.0
 MAX_ANGLE = 360.0
 TOGGLE_SIZE = (100, 40)
+FEED_SIZE = (400, 380)  # width, height of the camera feed
+DISPLAY_PERIOD = 15  # ms between checks for a new camera feed frame
+CROWD_COUNT_RATE = 2.0  # frames per second run through the crowd counter
@@ -1,3 +1,4 @@
 """Retrieve drone modules"""
 from dronevis.drone_connect.drone import Drone
 from dronevis.drone_connect.demo_drone import DemoDrone
+from dronevis.drone_connect.async_drone import AsyncDrone
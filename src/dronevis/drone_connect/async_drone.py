@@ -0,0 +1,428 @@
+"""Drone control core built on asyncio datagram endpoints.
+
+A single event loop replaces the ``Command`` and ``Navdata`` threads: the AT
+command keepalive is a periodic task scheduled on absolute deadlines, navdata
+is received by a datagram protocol as soon as it arrives, and configurations
+are futures resolved by the ``command_ack`` bit of the drone state.
+"""
+from typing import Any, Callable, Iterable, List, Optional, Tuple, Union
+import asyncio
+import logging
+import random
+import threading
+import time
+
+from dronevis.drone_connect.at_encoder import (
+    CLEAR_ACK,
+    ATFrame,
+    ATTemplate,
+    as_template,
+    frame,
+)
+from dronevis.drone_connect.command import config_batches
+from dronevis.drone_connect.drone import Drone
+from dronevis.drone_connect.navdata_decode import (
+    DEFAULT_OPTIONS,
+    NavdataDecoder,
+    NavdataPacket,
+    OptionKey,
+)
+from dronevis.drone_connect.navdata_history import NavdataHistory
+from dronevis.config import general as cfg
+from dronevis.utils.metrics import MetricsRegistry
+
+_LOG = logging.getLogger(__name__)
+
+_KEEPALIVE = ATTemplate("AT*COMWDG=#ID#\r")
+
+
+class _CommandProtocol(asyncio.DatagramProtocol):
+    """Sender of AT commands (UDP 5556)"""
+
+    def error_received(self, exc: Exception) -> None:
+        _LOG.warning("Failed sending AT commands: %s", exc)
+
+
+class _NavdataProtocol(asyncio.DatagramProtocol):
+    """Receiver of navdata (UDP 5554)"""
+
+    def __init__(self, drone: "AsyncDrone") -> None:
+        self.drone = drone
+
+    def datagram_received(self, data: bytes, addr: Tuple[str, int]) -> None:
+        self.drone.handle_navdata(data, time.perf_counter())
+
+    def error_received(self, exc: Exception) -> None:
+        _LOG.warning("Failed receiving navdata: %s", exc)
+
+
+class AsyncDrone(Drone):
+    """Drone running its control core on an asyncio event loop.
+
+    The ``BaseDrone`` methods keep their blocking behaviour and run the core on
+    a background event loop, while asyncio applications can await ``start``,
+    ``configure`` and ``close`` on their own loop instead. Movement commands
+    only replace the command repeated by the keepalive, so they never block.
+
+    Like ``Drone``, navdata callbacks receive the nested dictionaries of
+    ``navdata_decode``, unless ``raw_packets`` is set, in which case they
+    receive the decoded ``NavdataPacket`` in the units sent by the drone.
+    """
+
+    keepalive_period = 0.03
+    config_timeout = 0.5
+    config_retries = 5
+    land_duration = 1.0
+    navdata_init = b"\x01\x00\x00\x00"
+
+    def __init__(
+        self,
+        ip_address: str = "192.168.1.1",
+        command_port: int = 5556,
+        data_port: int = 5554,
+        local_data_port: int = 5554,
+        options: Tuple[OptionKey, ...] = DEFAULT_OPTIONS,
+        history: Optional[NavdataHistory] = None,
+        raw_packets: bool = False,
+    ) -> None:
+        """Construct drone, without connecting
+
+        Args:
+            ip_address (str, optional): IP of the drone. Defaults to "192.168.1.1".
+            command_port (int, optional): AT commands port of the drone.
+            Defaults to 5556.
+            data_port (int, optional): Navdata port of the drone. Defaults to 5554.
+            local_data_port (int, optional): Local port receiving navdata, 0 binds a
+            free port. Defaults to 5554.
+            options (Tuple[OptionKey, ...], optional): Tags or names of the decoded
+            navdata options. Defaults to the demo, vision detect and GPS options.
+            history (Optional[NavdataHistory], optional): History storing every
+            decoded packet. Defaults to None.
+            raw_packets (bool, optional): Whether to pass ``NavdataPacket`` instances
+            to the callback instead of dictionaries. Defaults to False.
+        """
+        super().__init__(ip_address)
+        self.command_port = command_port
+        self.data_port = data_port
+        self.local_data_port = local_data_port
+        self.decoder = NavdataDecoder(options)
+        self.history = history
+        self.raw_packets = raw_packets
+        self.metrics = MetricsRegistry()
+        self.callback: Optional[Callable[[Any], Any]] = None
+        self.navdata: Optional[NavdataPacket] = None
+        self.com = self.command
+        self.session_id = "".join(random.sample("0123456789abcdef", 8))
+        self.profile_id = "".join(random.sample("0123456789abcdef", 8))
+        self.app_id = "".join(random.sample("0123456789abcdef", 8))
+
+        self._sequence = 1
+        self._keepalive_frame = frame(_KEEPALIVE, as_template(""))
+        self._command_transport: Optional[asyncio.DatagramTransport] = None
+        self._navdata_transport: Optional[asyncio.DatagramTransport] = None
+        self._keepalive: Optional[asyncio.Task] = None
+        self._config_lock: Optional[asyncio.Lock] = None
+        self._ack_waiters: List[Tuple[int, asyncio.Future]] = []
+        self._ids_configured = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+
+    # Asyncio API
+    async def start(self) -> None:
+        """Open the command and navdata endpoints, then start the keepalive"""
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        self._config_lock = asyncio.Lock()
+        self._command_transport, _ = await loop.create_datagram_endpoint(
+            _CommandProtocol, remote_addr=(self.ip_address, self.command_port)
+        )
+        self._navdata_transport, _ = await loop.create_datagram_endpoint(
+            lambda: _NavdataProtocol(self),
+            local_addr=("0.0.0.0", self.local_data_port),
+        )
+        # Ask the drone to send navdata to our port
+        self._navdata_transport.sendto(
+            self.navdata_init, (self.ip_address, self.data_port)
+        )
+        self._keepalive = loop.create_task(self._run_keepalive())
+        self.is_connected = True
+
+    async def configure(self, argument: str, value: str) -> bool:
+        """Set a configuration onto the drone, and wait for its ACK
+
+        Args:
+            argument (str): Configuration key, e.g. "general:navdata_demo"
+            value (str): Configuration value
+
+        Returns:
+            bool: Whether the drone acknowledged the configuration
+        """
+        return await self.configure_many([(argument, value)])
+
+    async def configure_many(self, settings: Iterable[Tuple[str, str]]) -> bool:
+        """Set configurations onto the drone, packed into as few datagrams as
+        possible, each waiting for a single ACK
+
+        Args:
+            settings (Iterable[Tuple[str, str]]): Configuration keys and values
+
+        Returns:
+            bool: Whether the drone acknowledged all configurations
+        """
+        assert self._config_lock is not None, "Please start the drone first"
+        ids_command = (
+            f'AT*CONFIG_IDS=#ID#,"{self.session_id}","{self.profile_id}",'
+            f'"{self.app_id}"\r'
+        )
+        async with self._config_lock:
+            if not self._ids_configured:
+                # Configurations are only applied within a session
+                self._ids_configured = True
+                for key, ids_value in (
+                    ("custom:session_id", self.session_id),
+                    ("custom:profile_id", self.profile_id),
+                    ("custom:application_id", self.app_id),
+                ):
+                    await self._send_config(
+                        [ids_command, f'AT*CONFIG=#ID#,"{key}","{ids_value}"\r']
+                    )
+            acknowledged = True
+            for batch in config_batches(settings, ids_command):
+                acknowledged &= await self._send_config(batch)
+            return acknowledged
+
+    def wait_for_ack(self, ack: bool = True) -> "asyncio.Future[None]":
+        """Get a future resolved once navdata shows the ``command_ack`` bit
+        set (or cleared)
+
+        Args:
+            ack (bool, optional): Awaited value of the bit. Defaults to True.
+
+        Returns:
+            asyncio.Future[None]: Future resolved on the event loop
+        """
+        assert self._loop is not None, "Please start the drone first"
+        future = self._loop.create_future()
+        navdata = self.navdata
+        if navdata is not None and navdata.drone_state.command_ack == int(ack):
+            future.set_result(None)
+        else:
+            self._ack_waiters.append((int(ack), future))
+        return future
+
+    async def close(self) -> None:
+        """Stop the keepalive and close the endpoints"""
+        self.is_connected = False
+        if self._keepalive is not None:
+            self._keepalive.cancel()
+            try:
+                await self._keepalive
+            except asyncio.CancelledError:
+                pass
+            self._keepalive = None
+        for transport in (self._command_transport, self._navdata_transport):
+            if transport is not None:
+                transport.close()
+        self._command_transport = self._navdata_transport = None
+        for _, future in self._ack_waiters:
+            future.cancel()
+        self._ack_waiters.clear()
+
+    def handle_navdata(self, packet: bytes, received_at: float) -> None:
+        """Decode a navdata packet, resolve ACK waiters, then call the callback
+
+        Args:
+            packet (bytes): Received packet
+            received_at (float): ``time.perf_counter()`` on reception
+        """
+        try:
+            navdata = self.decoder.decode(packet)
+        except IOError as err:
+            _LOG.debug("Dropped navdata packet: %s", err)
+            self.metrics.increment("navdata_dropped")
+            return
+        self.navdata = navdata
+        self.metrics.increment("navdata_packets")
+        if self.recorder is not None:
+            self.recorder.record_navdata(packet)
+
+        if self._ack_waiters:
+            ack = navdata.drone_state.command_ack
+            waiting = []
+            for expected, future in self._ack_waiters:
+                if future.done():
+                    continue
+                if expected == ack:
+                    future.set_result(None)
+                else:
+                    waiting.append((expected, future))
+            self._ack_waiters = waiting
+
+        if self.history is not None:
+            self.history.append(navdata)
+        callback = self.callback
+        if callback is not None:
+            self.metrics.observe("navdata_latency", time.perf_counter() - received_at)
+            callback(navdata if self.raw_packets else navdata.as_dict())
+
+    async def _send_config(self, commands: List[str]) -> bool:
+        """Send a batch of configurations until it is acknowledged, then
+        clear the ACK"""
+        for _ in range(self.config_retries + 1):
+            try:
+                if self.navdata is not None:
+                    # A pending ACK would be taken for the ACK of this batch
+                    await asyncio.wait_for(
+                        self.wait_for_ack(False), self.config_timeout
+                    )
+                self._send_at(*commands)
+                await asyncio.wait_for(self.wait_for_ack(True), self.config_timeout)
+            except asyncio.TimeoutError:
+                _LOG.debug("Configurations were not acknowledged")
+                self._send_at(CLEAR_ACK)
+                continue
+            self._send_at(CLEAR_ACK)
+            return True
+        _LOG.warning("Configurations failed: %s", commands)
+        return False
+
+    async def _run_keepalive(self) -> None:
+        """Send the watchdog reset along with the current command every
+        ``keepalive_period``, on absolute deadlines to avoid drifting"""
+        assert self._loop is not None
+        deadline = self._loop.time()
+        while True:
+            lateness = self._loop.time() - deadline
+            self.metrics.observe("keepalive_lateness", max(lateness, 0.0))
+            self._send_frame(self._keepalive_frame)
+            deadline += self.keepalive_period
+            if deadline < self._loop.time():
+                # Skip missed ticks instead of sending bursts
+                deadline = self._loop.time()
+            await asyncio.sleep(deadline - self._loop.time())
+
+    def _send_at(self, *commands: Union[str, ATTemplate]) -> None:
+        """Number AT commands, and send them in a single datagram"""
+        self._send_frame(
+            ATFrame(
+                *(
+                    command if isinstance(command, ATTemplate) else ATTemplate(command)
+                    for command in commands
+                )
+            )
+        )
+
+    def _send_frame(self, datagram: ATFrame) -> None:
+        """Number the AT commands of a frame, and send them in a datagram"""
+        transport = self._command_transport
+        if transport is None:
+            return
+        payload, self._sequence = datagram.encode(self._sequence)
+        transport.sendto(payload)
+        if self.recorder is not None:
+            self.recorder.record_command(payload)
+
+    # BaseDrone API
+    def command(self, command: Union[str, ATTemplate] = "") -> bool:
+        """Set the command repeated by the keepalive
+
+        Args:
+            command (Union[str, ATTemplate], optional): AT command with an ``#ID#``
+            placeholder. Defaults to "".
+
+        Returns:
+            bool: flag for valid sequence of operations
+        """
+        self._keepalive_frame = frame(_KEEPALIVE, as_template(command))
+        return True
+
+    def connect(self) -> None:
+        """Start the event loop in a background thread, then the control core
+
+        Raises:
+            ConnectionError: Cannot open the endpoints
+        """
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(
+            target=self._loop.run_forever, name="AsyncDrone", daemon=True
+        )
+        self._loop_thread.start()
+        try:
+            self._run(self.start())
+        except OSError as exc:
+            err_message = (
+                "Couldn't connect to the drone."
+                + "Make sure you are connected to the drone network."
+            )
+            _LOG.critical(err_message)
+            self._stop_loop()
+            raise ConnectionError(err_message) from exc
+
+    def set_config(self, **kwargs: bool) -> bool:
+        """Set configurations onto the drone, see possibles arguments with
+        ```list_config```
+
+        Raises:
+            AttributeError: raised when there is an invalid config
+
+        Returns:
+            bool: Whether all configurations were acknowledged
+        """
+        assert self.is_connected, "Please connect to the drone first"
+        for key_arg in kwargs:
+            if key_arg.lower() not in cfg.SUPPORTED_CONFIG:
+                err_message = f"The configuration key {key_arg} can't be found!"
+                _LOG.critical(err_message)
+                raise AttributeError(err_message)
+
+        settings: List[Tuple[str, str]] = []
+        for key_arg, value in kwargs.items():
+            settings.extend(cfg.SUPPORTED_CONFIG[key_arg.lower()](value))
+        return self._run(self.configure_many(settings))
+
+    def set_callback(self, callback: Optional[Callable] = None) -> None:
+        """Set the navdata callback, called on the event loop thread
+
+        Args:
+            callback (Optional[Callable], optional): Handler of decoded navdata.
+            Defaults to None (print navdata).
+
+        Raises:
+            TypeError: Provided callback is not callable
+        """
+        if callback is None:
+            callback = self._print_navdata
+        if not hasattr(callback, "__call__"):
+            err_message = "Callaback provided should be a function"
+            _LOG.critical(err_message)
+            raise TypeError(err_message)
+        self.callback = callback
+
+    def stop(self) -> None:
+        """Land, then stop the control core and the video"""
+        if self._loop is not None and self._loop_thread is not None:
+            if self.is_connected:
+                self.land()
+                time.sleep(self.land_duration)
+            self._run(self.close())
+            self._stop_loop()
+
+        if self.video_thread is not None:
+            self.video_thread.close_thread()
+            self.video_thread.join()
+
+        self.stop_recording()
+
+    def _run(self, coroutine) -> Any:
+        """Run a coroutine on the background event loop and wait for its result"""
+        assert self._loop is not None, "Please connect to the drone first"
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def _stop_loop(self) -> None:
+        """Stop and close the background event loop"""
+        assert self._loop is not None and self._loop_thread is not None
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join()
+        self._loop.close()
+        self._loop = None
+        self._loop_thread = None
@@ -0,0 +1,176 @@
+"""Encoder of AT commands from preformatted byte templates
+
+Commands are repeated every 30 ms with a new sequence number, so they are
+encoded once into byte templates with a ``%d`` field for their sequence number
+(``#ID#``). Commands sent together are joined into a frame, which formats the
+whole datagram with a single ``bytes`` formatting on every tick, instead of
+replacing, concatenating and encoding strings.
+"""
+from functools import lru_cache
+from typing import Tuple, Union
+import struct
+
+MAX_DATAGRAM_SIZE = 1024  # Largest AT commands datagram accepted by the drone
+SEQUENCE = "#ID#"
+
+# AT*REF arguments, bits 18, 20, 22, 24 and 28 are always set
+REF_BASE = 0b00010001010101000000000000000000
+REF_EMERGENCY = REF_BASE | 1 << 8
+REF_TAKEOFF = REF_BASE | 1 << 9
+
+# Floats of AT*PCMD are sent as the integers sharing their binary representation
+_PCMD_FLOATS = struct.Struct("=4f")
+_PCMD_INTEGERS = struct.Struct("=4i")
+
+
+class ATTemplate:
+    """AT command encoded once, with a field for its sequence number"""
+
+    __slots__ = ("command", "format", "numbered")
+
+    def __init__(self, command: str) -> None:
+        """Encode command
+
+        Args:
+            command (str): AT command, with an ``#ID#`` placeholder for its
+            sequence number (if it has one)
+        """
+        prefix, placeholder, suffix = command.partition(SEQUENCE)
+        self.command = command
+        self.numbered = bool(placeholder)
+        self.format = b"%d".join(
+            part.replace("%", "%%").encode()
+            for part in ((prefix, suffix) if placeholder else (prefix,))
+        )
+
+    def __str__(self) -> str:
+        return self.command
+
+    def __repr__(self) -> str:
+        return f"ATTemplate({self.command!r})"
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ATTemplate):
+            return self.command == other.command
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.command)
+
+    def encode(self, sequence: int) -> bytes:
+        """Get the command numbered with a sequence number
+
+        Args:
+            sequence (int): Sequence number
+
+        Returns:
+            bytes: Encoded command
+        """
+        if not self.numbered:
+            return self.format % ()
+        return self.format % sequence
+
+
+@lru_cache(maxsize=256)
+def template(command: str) -> ATTemplate:
+    """Get the (cached) template of an AT command
+
+    Args:
+        command (str): AT command with an ``#ID#`` placeholder
+
+    Returns:
+        ATTemplate: Template of the command
+    """
+    return ATTemplate(command)
+
+
+def as_template(command: Union[str, ATTemplate]) -> ATTemplate:
+    """Get the template of a command given as a string or a template"""
+    if isinstance(command, ATTemplate):
+        return command
+    return template(command)
+
+
+@lru_cache(maxsize=256)
+def pcmd(
+    left_right: float = 0.0,
+    front_back: float = 0.0,
+    up_down: float = 0.0,
+    angle_change: float = 0.0,
+) -> ATTemplate:
+    """Get the template of a progressive command, arguments are between -1 and 1
+
+    Args:
+        left_right (float, optional): Roll. Defaults to 0.0.
+        front_back (float, optional): Pitch. Defaults to 0.0.
+        up_down (float, optional): Vertical speed. Defaults to 0.0.
+        angle_change (float, optional): Yaw speed. Defaults to 0.0.
+
+    Returns:
+        ATTemplate: Template of ``AT*PCMD``
+    """
+    integers = _PCMD_INTEGERS.unpack(
+        _PCMD_FLOATS.pack(left_right, front_back, up_down, angle_change)
+    )
+    return ATTemplate("AT*PCMD=#ID#,1,%d,%d,%d,%d\r" % integers)
+
+
+TAKEOFF = ATTemplate(f"AT*REF=#ID#,{REF_TAKEOFF}\r")
+LAND = ATTemplate(f"AT*REF=#ID#,{REF_BASE}\r")
+EMERGENCY = ATTemplate(f"AT*REF=#ID#,{REF_EMERGENCY}\r")
+HOVER = ATTemplate("AT*PCMD=#ID#,0,0,0,0,0\r")
+FLAT_TRIM = ATTemplate("AT*FTRIM=#ID#\r")
+WATCHDOG = ATTemplate("AT*COMWDG\r")
+CLEAR_ACK = ATTemplate("AT*CTRL=#ID#,5,0\r")
+
+
+class ATFrame:
+    """AT commands sent in a single datagram, formatted at once"""
+
+    __slots__ = ("templates", "format", "numbered")
+
+    def __init__(self, *templates: ATTemplate) -> None:
+        """Join templates
+
+        Args:
+            templates (ATTemplate): Commands of the datagram
+
+        Raises:
+            ValueError: Commands don't fit in a datagram
+        """
+        self.templates = templates
+        self.format = b"".join(command.format for command in templates)
+        self.numbered = sum(command.numbered for command in templates)
+        # Largest datagram, once numbered with 10 digits sequence numbers
+        if len(self.format) + 8 * self.numbered > MAX_DATAGRAM_SIZE:
+            raise ValueError("AT commands don't fit in a datagram")
+
+    def encode(self, sequence: int) -> Tuple[bytes, int]:
+        """Number commands from a sequence number
+
+        Args:
+            sequence (int): Sequence number of the first numbered command
+
+        Returns:
+            Tuple[bytes, int]: Datagram, and the next sequence number
+        """
+        numbered = self.numbered
+        if numbered == 1:
+            return self.format % sequence, sequence + 1
+        return (
+            self.format % tuple(range(sequence, sequence + numbered)),
+            sequence + numbered,
+        )
+
+
+@lru_cache(maxsize=256)
+def frame(*templates: ATTemplate) -> ATFrame:
+    """Get the (cached) frame of commands sent together
+
+    Args:
+        templates (ATTemplate): Commands of the datagram
+
+    Returns:
+        ATFrame: Frame of the commands
+    """
+    return ATFrame(*templates)
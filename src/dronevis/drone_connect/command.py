@@ -1,4 +1,5 @@
 """Implementation for the thread resposible for sending commands"""
+from typing import Iterable, List, Optional, Tuple, Union
 import socket
 import threading
 import time
@@ -6,8 +7,64 @@ import random
 import logging
 from dataclasses import dataclass
 
+from dronevis.drone_connect.at_encoder import (
+    CLEAR_ACK,
+    MAX_DATAGRAM_SIZE,
+    WATCHDOG,
+    ATFrame,
+    ATTemplate,
+    as_template,
+    frame,
+)
+from dronevis.utils.metrics import MetricsRegistry
+from dronevis.utils.recording import SessionRecorder
+
 _LOG = logging.getLogger(__name__)
 
+_SEQUENCE_DIGITS = 10  # Room kept for the sequence number replacing "#ID#"
+
+
+def config_batches(
+    settings: Iterable[Tuple[str, str]],
+    ids_command: str,
+    max_size: int = MAX_DATAGRAM_SIZE,
+) -> List[List[str]]:
+    """Pack configurations into batches of AT commands fitting in a datagram
+
+    Each ``AT*CONFIG`` is preceded by ``ids_command`` (``AT*CONFIG_IDS``), as the
+    drone applies configurations within a session.
+
+    Args:
+        settings (Iterable[Tuple[str, str]]): Configuration keys and values
+        ids_command (str): Session identifiers command with an ``#ID#`` placeholder
+        max_size (int, optional): Size of datagrams once commands are numbered.
+        Defaults to MAX_DATAGRAM_SIZE.
+
+    Raises:
+        ValueError: A configuration doesn't fit in a datagram
+
+    Returns:
+        List[List[str]]: Batches of AT commands with ``#ID#`` placeholders
+    """
+    batches: List[List[str]] = []
+    batch: List[str] = []
+    size = 0
+    for argument, value in settings:
+        pair = [ids_command, f'AT*CONFIG=#ID#,"{argument}","{value}"\r']
+        pair_size = sum(len(command) - 4 + _SEQUENCE_DIGITS for command in pair)
+        if pair_size > max_size:
+            err_message = f"The configuration {argument} doesn't fit in a datagram"
+            _LOG.critical(err_message)
+            raise ValueError(err_message)
+        if size + pair_size > max_size:
+            batches.append(batch)
+            batch, size = [], 0
+        batch.extend(pair)
+        size += pair_size
+    if batch:
+        batches.append(batch)
+    return batches
+
 
 @dataclass
 class ThreadAttributes:
@@ -23,19 +80,30 @@ class ThreadAttributes:
 class Command(threading.Thread):
     """Command thread implementation for sending commands
     through a socket created between the drone and the sender.
+
+    The current command is sent along with the watchdog reset in a single
+    datagram every ``period``. Ticks are scheduled on deadlines of a monotonic
+    clock, so send times don't accumulate into the period, and their lateness
+    is recorded as the "heartbeat_jitter" stage of ``metrics``.
     """
 
     command_port: int = 5556
+    period: float = 0.03
+    max_datagram_size: int = MAX_DATAGRAM_SIZE
     session_id = "".join(random.sample("0123456789abcdef", 8))
     profile_id = "".join(random.sample("0123456789abcdef", 8))
     app_id = "".join(random.sample("0123456789abcdef", 8))
     is_configured = False
 
-    def __init__(self, ip: str = "192.168.1.1") -> None:
+    def __init__(
+        self, ip: str = "192.168.1.1", metrics: Optional[MetricsRegistry] = None
+    ) -> None:
         """Initialize thread instance
 
         Args:
             ip (str, optional): ip of the drone. Defaults to "192.168.1.1".
+            metrics (Optional[MetricsRegistry], optional): Registry of the heartbeat
+            metrics. Defaults to None (a new registry).
 
         Raises:
             ConnectionError: raise an error if user is not connected to the drone
@@ -44,7 +112,12 @@ class Command(threading.Thread):
 
         self.counter = 10  # Counter to issue AT command in order
         self.com = ""  # Last command to issue
+        self._heartbeat = frame(WATCHDOG, as_template(self.com))
         self.navdata_enabled = False  # If navdata is enabled or not (will check ACK)
+        self.metrics = metrics if metrics is not None else MetricsRegistry()
+        self.recorder: Optional[SessionRecorder] = None
+        # Serializes configurations, while the socket lock is only held for sending
+        self.config_lock = threading.Lock()
         # Create the UDP Socket
         try:
             _LOG.info("Connecting to the Drone ...")
@@ -68,7 +141,7 @@ class Command(threading.Thread):
         _LOG.info("Connected Successfully")
 
     # Usable commands
-    def command(self, command: str = "") -> bool:
+    def command(self, command: Union[str, ATTemplate] = "") -> bool:
         """Send a command to the AR.Drone
 
         Args:
@@ -77,7 +150,8 @@ class Command(threading.Thread):
         Returns:
             bool: flag for valid sequence of operations
         """
-        self.com = command
+        self._heartbeat = frame(WATCHDOG, as_template(command))
+        self.com = str(command)
         return True
 
     def configure(self, argument: str, value: str) -> bool:
@@ -87,6 +161,22 @@ class Command(threading.Thread):
             argument (str): keys for configs
             value (str): values for configs
 
+        Returns:
+            bool: flag for valid config operations
+        """
+        return self.configure_many([(argument, value)])
+
+    def configure_many(self, settings: Iterable[Tuple[str, str]]) -> bool:
+        """Set configurations onto the drone in batched transactions
+
+        Configurations are packed into as few datagrams as possible, and each
+        datagram waits for a single ACK (when navdata is enabled). The ACK is
+        cleared along with the next datagram, so ``n`` configurations fitting in
+        a datagram take one round trip instead of ``n``.
+
+        Args:
+            settings (Iterable[Tuple[str, str]]): Configuration keys and values
+
         Returns:
             bool: flag for valid config operations
         """
@@ -94,66 +184,32 @@ class Command(threading.Thread):
         if not self.is_configured:
             # Activate the config
             self.is_configured = True
-            self.configure("custom:session_id", self.session_id)
-            time.sleep(1)  # Wait a lot in order for file to be created
-            self.configure("custom:profile_id", self.profile_id)
-            time.sleep(1)
-            self.configure("custom:application_id", self.app_id)
-            time.sleep(1)
-        with self.thread_attr.socket_lock:
-            if self.navdata_enabled:
-                tries = 5
-            else:
-                tries = 0  # Only one try when no navdata (and wait)
-            while tries >= 0:
-                to_send = (
-                    "AT*CONFIG_IDS="
-                    + str(self.counter)
-                    + ',"'
-                    + self.session_id
-                    + '","'
-                    + self.profile_id
-                    + '","'
-                    + self.app_id
-                    + '"\r'
-                )
-                self.thread_attr.sock.send(to_send.encode())
-                if not self.navdata_enabled:
-                    time.sleep(0.15)
-                to_send = (
-                    "AT*CONFIG="
-                    + str(self.counter + 1)
-                    + ',"'
-                    + str(argument)
-                    + '","'
-                    + str(value)
-                    + '"\r'
-                )
-                _LOG.debug(to_send)
-                self.thread_attr.sock.send(to_send.encode())
-                self.counter = self.counter + 2
-                if self.navdata_enabled:  # Wait until we receive ACK if navadata enable
-                    self.thread_attr.ack = False  # not acknoledged first
-                    for _ in range(100):
-                        if self.thread_attr.ack:
-                            # print "OK"
-                            break
-                        time.sleep(0.5 / 100)  # Wait max 0.5 secs
-                    if self.thread_attr.ack:
-                        self.thread_attr.ack = False
-                        break
-
-                else:
-                    time.sleep(
-                        0.05
-                    )  # But if we don't have navdata, just wait a fixed period
-                tries -= 1
-            navdata_command_str = "AT*CTRL=" + str(self.counter) + ",5,0"
-            self.thread_attr.sock.send(navdata_command_str.encode())
-            self.counter = self.counter + 1
-        if tries >= 0 or not self.navdata_enabled:
-            return True
-        return False
+            for argument, value in (
+                ("custom:session_id", self.session_id),
+                ("custom:profile_id", self.profile_id),
+                ("custom:application_id", self.app_id),
+            ):
+                self.configure(argument, value)
+                time.sleep(1)  # Wait a lot in order for file to be created
+        ids_command = (
+            f'AT*CONFIG_IDS=#ID#,"{self.session_id}","{self.profile_id}",'
+            f'"{self.app_id}"\r'
+        )
+        # Batches after the first one start by clearing the previous ACK
+        clear_size = len(str(CLEAR_ACK)) - 4 + _SEQUENCE_DIGITS
+        batches = config_batches(
+            settings, ids_command, self.max_datagram_size - clear_size
+        )
+        acknowledged = True
+        # Heartbeats keep going while waiting, only sends hold the socket lock
+        with self.config_lock:
+            clear: List[Union[str, ATTemplate]] = []
+            for batch in batches:
+                acknowledged &= self._send_config_batch(clear + batch)
+                clear = [CLEAR_ACK]
+            if clear:
+                self._send_at(CLEAR_ACK)
+        return acknowledged
 
     # Internal functions
     def ack_command(self) -> bool:
@@ -178,18 +234,92 @@ class Command(threading.Thread):
 
     def run(self) -> None:
         """Send commands every 30ms"""
+        deadline = time.monotonic()
+        last_tick: Optional[float] = None
         while self.thread_attr.running:
-            com = self.com
-            # conf = self.continous_config
-            with self.thread_attr.socket_lock:
-                self.thread_attr.sock.send("AT*COMWDG\r".encode())
-                if com is not None:
-                    com = com.replace("#ID#", str(self.counter))
-                    self.thread_attr.sock.send(com.encode())
-                    self.counter += 1
-            time.sleep(0.03)
+            tick = time.monotonic()
+            self.metrics.observe("heartbeat_jitter", tick - deadline)
+            if last_tick is not None:
+                self.metrics.observe("heartbeat_period", tick - last_tick)
+            last_tick = tick
+            self._send_heartbeat()
+
+            deadline += self.period
+            late = time.monotonic() - deadline
+            if late > 0:
+                # Skip the missed ticks instead of sending a burst
+                missed = int(late // self.period) + 1
+                self.metrics.increment("heartbeat_missed", missed)
+                deadline += missed * self.period
+            time.sleep(max(deadline - time.monotonic(), 0.0))
         self.thread_attr.sock.close()
 
+    def _send_config_batch(self, commands: List[Union[str, ATTemplate]]) -> bool:
+        """Send a batch of configurations, until it is acknowledged when
+        navdata is enabled
+
+        Args:
+            commands (List[Union[str, ATTemplate]]): AT commands of the batch
+
+        Returns:
+            bool: flag whether the batch was acknowledged
+        """
+        tries = 5 if self.navdata_enabled else 0
+        for _ in range(tries + 1):
+            _LOG.debug(commands)
+            if not self.navdata_enabled:
+                self._send_at(*commands)
+                # If we don't have navdata, just wait a fixed period
+                time.sleep(0.05)
+                return True
+            self.thread_attr.ack = False  # not acknoledged first
+            self._send_at(*commands)
+            for _ in range(100):
+                if self.thread_attr.ack:  # Wait max 0.5 secs
+                    self.thread_attr.ack = False
+                    return True
+                time.sleep(0.5 / 100)
+        _LOG.warning("Configurations were not acknowledged")
+        return False
+
+    def _send_at(self, *commands: Union[str, ATTemplate]) -> None:
+        """Number AT commands with the next sequence numbers, then send them
+        in a single datagram
+
+        Args:
+            commands (Union[str, ATTemplate]): AT commands with an ``#ID#``
+            placeholder
+        """
+        datagram = ATFrame(
+            *(
+                command if isinstance(command, ATTemplate) else ATTemplate(command)
+                for command in commands
+            )
+        )
+        with self.thread_attr.socket_lock:
+            payload, self.counter = datagram.encode(self.counter)
+            self.thread_attr.sock.send(payload)
+        self._record(payload)
+
+    def _send_heartbeat(self) -> None:
+        """Send the watchdog reset and the current command in a single datagram"""
+        heartbeat = self._heartbeat
+        with self.thread_attr.socket_lock:
+            payload, self.counter = heartbeat.encode(self.counter)
+            try:
+                self.thread_attr.sock.send(payload)
+            except OSError as err:
+                _LOG.warning("Failed sending commands: %s", err)
+                self.metrics.increment("heartbeat_errors")
+                return
+        self._record(payload)
+
+    def _record(self, payload: bytes) -> None:
+        """Record a sent datagram if a session is being recorded"""
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record_command(payload)
+
     def reconnect(self) -> None:
         """Try to restart the socket"""
         with self.thread_attr.socket_lock:
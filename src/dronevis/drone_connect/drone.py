@@ -1,14 +1,16 @@
 """Implementation for real drone control"""
-from typing import Callable, Optional, List, Tuple
+from typing import Callable, Optional, List, Tuple, Union
 import logging
-import struct
 import time
 import socket
 
 from dronevis.abstract.base_drone import BaseDrone
+from dronevis.drone_connect import at_encoder
+from dronevis.drone_connect.at_encoder import ATTemplate
 from dronevis.drone_connect.video import VideoThread
 from dronevis.drone_connect.command import Command
 from dronevis.drone_connect.navdata import Navdata
+from dronevis.utils.recording import SessionRecorder
 from dronevis.config import general as cfg
 
 _LOG = logging.getLogger(__name__)
@@ -20,6 +22,7 @@ class Drone(BaseDrone):
 
     command_port = 5556
     data_port = 5554
+    telnet_port = 23
 
     def __init__(self, ip_address: str = "192.168.1.1") -> None:
         """Initialize ip and communication ports
@@ -31,7 +34,8 @@ class Drone(BaseDrone):
         self.video_thread: Optional[VideoThread] = None
         self.com_thread: Optional[Command] = None
         self.nav_thread: Optional[Navdata] = None
-        self.com: Optional[Callable[[str], bool]] = None
+        self.com: Optional[Callable[[Union[str, ATTemplate]], bool]] = None
+        self.recorder: Optional[SessionRecorder] = None
 
     def connect_video(
         self,
@@ -58,6 +62,7 @@ class Drone(BaseDrone):
             model_name,
             self.ip_address,
         )
+        self.video_thread.recorder = self.recorder
         self.video_thread.resume()
         _LOG.debug("Initialized video thread")
 
@@ -86,6 +91,7 @@ class Drone(BaseDrone):
             raise ConnectionError(err_message)
         try:
             self.com_thread = Command(self.ip_address)
+            self.com_thread.recorder = self.recorder
             self.com = self.com_thread.command  # Alias
             self.com_thread.start()
             self.is_connected = True
@@ -108,7 +114,7 @@ class Drone(BaseDrone):
             AttributeError: raised when there is an invalid config
 
         Returns:
-            bool: a flag that everything went fine
+            bool: a flag that all configurations were acknowledged
         """
         assert self.com_thread, "Please connect to the drone first"
 
@@ -119,14 +125,12 @@ class Drone(BaseDrone):
                 err_message = f"The configuration key {key_arg} can't be found!"
                 _LOG.critical(err_message)
                 raise AttributeError(err_message)
-        # Then set each config
+        # Then set all configs in batched transactions
         at_commands: List[Tuple[str, str]] = []
         for key_arg in kwargs:
             config_out = cfg.SUPPORTED_CONFIG[key_arg.lower()](kwargs[key_arg.lower()])
             at_commands.extend(config_out)
-        for at_command in at_commands:
-            self.com_thread.configure(at_command[0], at_command[1])
-        return True
+        return self.com_thread.configure_many(at_commands)
 
     def list_config(self) -> list:
         """List all possible configuration
@@ -143,11 +147,7 @@ class Drone(BaseDrone):
             bool: a flag for valid execution
         """
         assert self.com, "Please connect to the drone first"
-        return self.com(
-            "AT*REF=#ID#,"
-            + str(self._bin2dec("00010001010101000000001000000000"))
-            + "\r"
-        )
+        return self.com(at_encoder.TAKEOFF)
 
     def land(self) -> bool:
         """Land
@@ -156,11 +156,7 @@ class Drone(BaseDrone):
             bool: a flag for valid execution
         """
         assert self.com, "Please connect to the drone first"
-        return self.com(
-            "AT*REF=#ID#,"
-            + str(self._bin2dec("00010001010101000000000000000000"))
-            + "\r"
-        )
+        return self.com(at_encoder.LAND)
 
     def calibrate(self) -> bool:
         """Calibrate sensors
@@ -169,7 +165,7 @@ class Drone(BaseDrone):
             bool: a flag for valid execution
         """
         assert self.com, "Please connect to the drone first"
-        return self.com("AT*FTRIM=#ID#\r")
+        return self.com(at_encoder.FLAT_TRIM)
 
     def forward(self, speed: float = 0.2) -> bool:
         """Make the drone go forward, speed is between 0 and 1
@@ -277,23 +273,8 @@ class Drone(BaseDrone):
         Returns:
             bool: a flag for valid execution
         """
-        left_right_dec = self._float2dec(left_right)
-        forward_back_dec = self._float2dec(front_back)
-        up_down_dec = self._float2dec(up_down)
-        angle_change_dec = self._float2dec(angle_change)
-
         assert self.com, "Please connect to the drone first"
-        return self.com(
-            "AT*PCMD=#ID#,1,"
-            + str(left_right_dec)
-            + ","
-            + str(forward_back_dec)
-            + ","
-            + str(up_down_dec)
-            + ","
-            + str(angle_change_dec)
-            + "\r"
-        )
+        return self.com(at_encoder.pcmd(left_right, front_back, up_down, angle_change))
 
     def hover(self) -> bool:
         """Make the drone stationary
@@ -302,7 +283,7 @@ class Drone(BaseDrone):
             bool: a flag for valid execution
         """
         assert self.com, "Please connect to the drone first"
-        return self.com("AT*PCMD=#ID#,0,0,0,0,0\r")
+        return self.com(at_encoder.HOVER)
 
     def emergency(self) -> bool:
         """Enter in emergency mode
@@ -312,11 +293,7 @@ class Drone(BaseDrone):
         """
         # Release all lock to be sure command is issued
         assert self.com, "Please connect to the drone first"
-        return self.com(
-            "AT*REF=#ID#,"
-            + str(self._bin2dec("00010001010101000000000100000000"))
-            + "\r"
-        )
+        return self.com(at_encoder.EMERGENCY)
 
     def stop(self) -> None:
         """Stop the drone"""
@@ -334,6 +311,44 @@ class Drone(BaseDrone):
             self.video_thread.close_thread()
             self.video_thread.join()
 
+        self.stop_recording()
+
+    def start_recording(self, path: str, jpeg_quality: int = 90) -> SessionRecorder:
+        """Record sent commands, received navdata and video frames into a session
+        recording, which can be replayed without the drone
+
+        Args:
+            path (str): Path of the recording (``.dvrec``)
+            jpeg_quality (int, optional): JPEG quality of recorded frames. Defaults to 90.
+
+        Returns:
+            SessionRecorder: Recorder of the session
+        """
+        self.stop_recording()
+        self.recorder = SessionRecorder(path, jpeg_quality)
+        self._attach_recorder(self.recorder)
+        _LOG.info("Recording session into %s", path)
+        return self.recorder
+
+    def stop_recording(self) -> None:
+        """Stop recording the session, and close its recording"""
+        recorder = self.recorder
+        if recorder is None:
+            return
+        self._attach_recorder(None)
+        self.recorder = None
+        recorder.close()
+        _LOG.info("Stopped recording session")
+
+    def _attach_recorder(self, recorder: Optional[SessionRecorder]) -> None:
+        """Attach (or detach) a recorder to the running threads"""
+        for thread in (self.com_thread, self.nav_thread, self.video_thread):
+            if thread is not None:
+                thread.recorder = recorder
+        grabber = getattr(self.video_thread, "grabber", None)
+        if grabber is not None:
+            grabber.recorder = recorder
+
     def set_callback(self, callback=None):
         "Set the callback function"
         # Check if the argument is a function
@@ -349,6 +364,7 @@ class Drone(BaseDrone):
             assert self.com_thread, "Communication thread should be initialized first"
             # Initialize the navdata thread and navdata
             self.nav_thread = Navdata(self.com_thread, callback)
+            self.nav_thread.recorder = self.recorder
             # self.set_config(activate_navdata=True)
             self.nav_thread.start()
 
@@ -377,28 +393,6 @@ class Drone(BaseDrone):
         # Then normal state
         return self.land()
 
-    def _bin2dec(self, binay_str: str) -> int:
-        """Convert a binary number to an int
-
-        Args:
-            bin (str): binary string
-
-        Returns:
-            int: value of the result integer
-        """
-        return int(binay_str, 2)
-
-    def _float2dec(self, my_float: float) -> int:
-        """Convert a python float to an int
-
-        Args:
-            my_float (float): input float
-
-        Returns:
-            int: value of the result integer
-        """
-        return int(struct.unpack("=l", struct.pack("f", float(my_float)))[0])
-
     def _check_telnet(self) -> bool:
         """Check if we can connect to telnet
 
@@ -406,9 +400,8 @@ class Drone(BaseDrone):
             bool: flag whether there is a valid connection
         """
         sock: socket.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        connection_port = 23
         try:
-            sock.connect((self.ip_address, connection_port))
+            sock.connect((self.ip_address, self.telnet_port))
         except ConnectionError as _:
             _LOG.critical("No drone connection")
             return False
@@ -1,37 +1,100 @@
 """Implementation for navigation data thread"""
-from typing import Callable, Any, Dict
+from typing import Any, Callable, Iterable, Optional
+import selectors
 import threading
 import socket
 import time
 import logging
 
-from dronevis.drone_connect.navdata_decode import navdata_decode
+from dronevis.drone_connect.navdata_decode import (
+    DEFAULT_OPTIONS,
+    NavdataDecoder,
+    OptionKey,
+)
+from dronevis.drone_connect.navdata_history import NavdataHistory
 from dronevis.drone_connect.command import Command
+from dronevis.utils.metrics import MetricsRegistry
+from dronevis.utils.recording import SessionRecorder
 
 _LOG = logging.getLogger(__name__)
 
 
 class Navdata(threading.Thread):
-    "Manage the incoming data"
+    """Manage the incoming data.
+
+    The thread blocks on a selector until datagrams arrive, then drains every
+    queued datagram before waiting again, so bursts are not dropped and command
+    ACKs are handled as soon as they are received. The delay between receiving
+    a datagram and calling the callback is recorded as the "navdata_latency"
+    stage of ``metrics``.
+
+    Callbacks receive the nested dictionaries of ``navdata_decode`` (angles in
+    degrees, truncated velocities), unless ``raw_packets`` is set, in which case
+    they receive the decoded ``NavdataPacket`` in the units sent by the drone.
+    """
+
     data_port = 5554
+    local_data_port: Optional[int] = None  # Defaults to ``data_port``, 0 for any
     pocket_size = 1024 * 10
+    receive_buffer_size = 256 * 1024
 
     def __init__(
         self,
         communication: Command,
-        callback: Callable[[Dict[str, Dict[str, Any]]], None],
+        callback: Callable[[Any], None],
+        options: Iterable[OptionKey] = DEFAULT_OPTIONS,
+        verify_checksum: bool = False,
+        metrics: Optional[MetricsRegistry] = None,
+        history: Optional[NavdataHistory] = None,
+        raw_packets: bool = False,
     ) -> None:
-        "Create the navdata handler thread"
+        """Create the navdata handler thread
+
+        Args:
+            communication (Command): Command thread of the drone
+            callback (Callable[[Any], None]): Handler of decoded packets
+            options (Iterable[OptionKey], optional): Tags or names of the decoded
+            options. Defaults to the demo, vision detect and GPS options.
+            verify_checksum (bool, optional): Whether to drop packets with an invalid
+            checksum. Defaults to False.
+            metrics (Optional[MetricsRegistry], optional): Registry of the receive
+            metrics. Defaults to None (a new registry).
+            history (Optional[NavdataHistory], optional): History storing every
+            decoded packet before the callback. Defaults to None.
+            raw_packets (bool, optional): Whether to pass ``NavdataPacket`` instances
+            to the callback instead of dictionaries. Defaults to False.
+        """
         super().__init__()
         self.running = True
         self.com = communication
         self.ip_address = self.com.thread_attr.ip_address
         self.callback = callback
+        self.decoder = NavdataDecoder(options, verify_checksum)
+        self.metrics = metrics if metrics is not None else MetricsRegistry()
+        self.history = history
+        self.raw_packets = raw_packets
+        self.recorder: Optional[SessionRecorder] = None
+        self.last_sequence: Optional[int] = None
         self.socket_lock = threading.Lock()
         # Initialize the server
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.sock.bind(("0.0.0.0".encode(), self.data_port))
+        self.sock.setsockopt(
+            socket.SOL_SOCKET, socket.SO_RCVBUF, self.receive_buffer_size
+        )
+        local_port = (
+            self.data_port if self.local_data_port is None else self.local_data_port
+        )
+        self.sock.bind(("0.0.0.0".encode(), local_port))
         self.sock.setblocking(False)
+        # Datagrams are received into a single buffer and decoded in place
+        self._buffer = bytearray(self.pocket_size)
+        self._view = memoryview(self._buffer)
+        # Wake the selector up when stopping
+        self._wakeup_recv, self._wakeup_send = socket.socketpair()
+        self._wakeup_recv.setblocking(False)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self.sock, selectors.EVENT_READ)
+        self._selector.register(self._wakeup_recv, selectors.EVENT_READ)
 
     def change_callback(self, new_callback: Callable) -> bool:
         """Change the callback function
@@ -49,29 +112,86 @@ class Navdata(threading.Thread):
         self.callback = new_callback
         return True
 
+    def subscribe(self, *options: OptionKey) -> None:
+        """Start decoding navdata options, e.g. ``subscribe("altitude", 22)``
+
+        Args:
+            options (OptionKey): Tags or names of the options
+        """
+        self.decoder.subscribe(*options)
+
+    def unsubscribe(self, *options: OptionKey) -> None:
+        """Stop decoding navdata options
+
+        Args:
+            options (OptionKey): Tags or names of the options
+        """
+        self.decoder.unsubscribe(*options)
+
     def run(self) -> None:
         """Start the data handler"""
         self.com.activate_navdata(activate=True)  # Tell com thread that we are here
         # Initialize the drone to send the data
         self.sock.sendto("\x01\x00\x00\x00".encode(), (self.ip_address, self.data_port))
-        time.sleep(0.05)
         while self.running:
-            with self.socket_lock:
-                try:
-                    rep, _ = self.sock.recvfrom(self.pocket_size)
-                except socket.error:
-                    time.sleep(0.05)
+            for key, _ in self._selector.select():
+                if key.fileobj is self.sock:
+                    self._drain()
                 else:
-                    decoded_rep = navdata_decode(rep)
-                    if decoded_rep["drone_state"]["command_ack"] == 1:
-                        self.com.ack_command()
-                    assert self.callback is None, "Please set a callback"
-                    self.callback(decoded_rep)
-
-                time.sleep(0.05)
+                    self._wakeup_recv.recv(64)
+        self._selector.close()
+        self._wakeup_recv.close()
+        self._wakeup_send.close()
         self.com.activate_navdata(activate=False)  # Tell com thread that we are out
         self.sock.close()
 
+    def _drain(self) -> None:
+        """Receive and handle every queued datagram"""
+        datagrams = 0
+        with self.socket_lock:
+            while self.running:
+                try:
+                    size = self.sock.recv_into(self._buffer)
+                except (BlockingIOError, InterruptedError):
+                    break
+                except OSError as err:
+                    _LOG.warning("Failed receiving navdata: %s", err)
+                    break
+                received_at = time.perf_counter()
+                datagrams += 1
+                recorder = self.recorder
+                if recorder is not None:
+                    recorder.record_navdata(self._view[:size])
+                self._handle(self._view[:size], received_at)
+        self.metrics.increment("navdata_packets", datagrams)
+        self.metrics.set_gauge("navdata_burst", datagrams)
+
+    def _handle(self, packet: memoryview, received_at: float) -> None:
+        """Decode a datagram, acknowledge commands, then call the callback"""
+        try:
+            decoded_rep = self.decoder.decode(packet)
+        except IOError as err:
+            _LOG.debug("Dropped navdata packet: %s", err)
+            self.metrics.increment("navdata_dropped")
+            return
+        finally:
+            packet.release()
+
+        if self.last_sequence is not None:
+            lost = decoded_rep.sequence - self.last_sequence - 1
+            if lost > 0:
+                self.metrics.increment("navdata_lost", lost)
+        self.last_sequence = decoded_rep.sequence
+
+        if decoded_rep.drone_state.command_ack == 1:
+            self.com.ack_command()
+        if self.history is not None:
+            self.history.append(decoded_rep)
+        callback = self.callback
+        if callback is not None:
+            self.metrics.observe("navdata_latency", time.perf_counter() - received_at)
+            callback(decoded_rep if self.raw_packets else decoded_rep.as_dict())
+
     def reconnect(self) -> bool:
         """Try to send another packet to reactivate navdata
 
@@ -84,4 +204,7 @@ class Navdata(threading.Thread):
     def stop(self) -> None:
         "Stop the communication"
         self.running = False
-        time.sleep(0.05)
+        try:
+            self._wakeup_send.send(b"\x00")
+        except OSError:
+            pass  # Already stopped
@@ -1,151 +1,648 @@
-"""Utilties for decoding packets resposible for navigation data"""
-from typing import Dict, Union, Any
+"""Utilties for decoding packets resposible for navigation data
+
+Packets gathered from UDP 5554 are a header followed by option blocks,
+each one is ``(tag, size, data)``, and end with a checksum option. Options are
+decoded with precompiled ``struct.Struct`` layouts straight from the received
+buffer (``bytes``, ``bytearray`` or ``memoryview``), without splitting the
+packet into lists or slicing a copy of each option.
+
+Options are looked up in the ``NAVDATA_OPTIONS`` registry. A ``NavdataDecoder``
+only parses the options it is subscribed to, and skips the others by their size.
+"""
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Type, Union
 import logging
 import struct
 
+import numpy as np
+
 _LOG = logging.getLogger(__name__)
 
+Buffer = Union[bytes, bytearray, memoryview]
+OptionKey = Union[int, str]
 
-def _drone_status_decode(packet) -> Dict[str, bool]:
-    "Decode the block which contains Drone Status"
-    # NavData packet has been splited let's go decode it
-    drone_state = {}  # It's in block[0]'s second 32bits int = block[0][1]
-    # fmt: off
-    drone_state['flying']              = packet       & 1
-    drone_state['video_on']            = packet>>1    & 1
-    drone_state['vision_on']           = packet>>2    & 1
-    drone_state['angle_algo']          = packet>>3    & 1
-    drone_state['altitude_algo']       = packet>>4    & 1
-    drone_state['user_feedback']       = packet>>5    & 1
-    drone_state['command_ack']         = packet>>6    & 1
-    drone_state['fw_ok']               = packet>>7    & 1
-    drone_state['fw_new']              = packet>>8    & 1
-    drone_state['fw_update']           = packet>>9    & 1
-    drone_state['navdata_demo']        = packet>>10   & 1
-    drone_state['navdata_bootstrap']   = packet>>11   & 1
-    drone_state['motor_status']        = packet>>12   & 1
-    drone_state['com_lost']            = packet>>13   & 1
-    drone_state['vbat_low']            = packet>>15   & 1
-    drone_state['user_emergency']      = packet>>16   & 1
-    drone_state['timer_elapsed']       = packet>>17   & 1
-    drone_state['too_much_angle']      = packet>>19   & 1
-    drone_state['ultrasound_ok']       = packet>>21   & 1
-    drone_state['cutout']              = packet>>22   & 1
-    drone_state['pic_version_ok']      = packet>>23   & 1
-    drone_state['atcodec_thread_on']   = packet>>24   & 1
-    drone_state['navdata_thread_on']   = packet>>25   & 1
-    drone_state['video_thread_on']     = packet>>26   & 1
-    drone_state['acq_thread_on']       = packet>>27   & 1
-    drone_state['ctrl_watchdog']       = packet>>28   & 1
-    drone_state['adc_watchdog']        = packet>>29   & 1
-    drone_state['com_watchdog']        = packet>>30   & 1
-    drone_state['emergency']           = packet>>31   & 1
-    return drone_state
-
-
-def _navdata_demo_decode(packet) -> Dict[str, float]:
-    "Decode the navdata_demo which is data about the flight"
-    navdata_demo = {}
-    if packet[0] != 0:
-        err_message = "Packet isn't navdata-demo packet"
-        _LOG.critical(err_message)
-        raise IOError(err_message)
-    navdata_demo["ctrl_state"] = struct.unpack_from("=I", packet[2], 0)[0]
-    navdata_demo["battery_percentage"] = struct.unpack_from("=I", packet[2], 4)[0]
-    navdata_demo["theta"] = int(struct.unpack_from("=f", packet[2], 8)[0] / 1000)
-    navdata_demo["phi"] = int(struct.unpack_from("=f", packet[2], 12)[0] / 1000)
-    navdata_demo["psi"] = struct.unpack_from("=f", packet[2], 16)[0]
-    navdata_demo["altitude"] = struct.unpack_from("=i", packet[2], 20)[0]
-    navdata_demo["vx"] = int(struct.unpack_from("=f", packet[2], 24)[0])
-    navdata_demo["vy"] = int(struct.unpack_from("=f", packet[2], 28)[0])
-    navdata_demo["vz"] = int(struct.unpack_from("=f", packet[2], 32)[0])
-    return navdata_demo
-
-
-def _vision_detect_decode(packet) -> Dict[str, int]:
-    "Decode the vision detection packet, packet is (id=16, size, data)"
-    if packet[0] != 16:
-        err_message = "Packet isn't vision-demo packet"
+NAVDATA_HEADER = 0x55667788
+CHECKSUM_TAG = 0xFFFF
+
+_HEADER = struct.Struct("=IIII")  # header, drone_state, sequence, vision_flag
+_OPTION_HEADER = struct.Struct("=HH")  # tag, size (including tag and size)
+_CHECKSUM = struct.Struct("=I")
+
+# Bit index of each flag in the drone state
+DRONE_STATE_BITS: Dict[str, int] = {
+    "flying": 0,
+    "video_on": 1,
+    "vision_on": 2,
+    "angle_algo": 3,
+    "altitude_algo": 4,
+    "user_feedback": 5,
+    "command_ack": 6,
+    "fw_ok": 7,
+    "fw_new": 8,
+    "fw_update": 9,
+    "navdata_demo": 10,
+    "navdata_bootstrap": 11,
+    "motor_status": 12,
+    "com_lost": 13,
+    "vbat_low": 15,
+    "user_emergency": 16,
+    "timer_elapsed": 17,
+    "too_much_angle": 19,
+    "ultrasound_ok": 21,
+    "cutout": 22,
+    "pic_version_ok": 23,
+    "atcodec_thread_on": 24,
+    "navdata_thread_on": 25,
+    "video_thread_on": 26,
+    "acq_thread_on": 27,
+    "ctrl_watchdog": 28,
+    "adc_watchdog": 29,
+    "com_watchdog": 30,
+    "emergency": 31,
+}
+
+
+def _field_getitem(record: tuple, key: Union[str, int]) -> Any:
+    """Look up fields of option records by name, like the dictionaries
+    returned by ``navdata_decode``, or by position like tuples"""
+    if isinstance(key, str):
+        try:
+            return getattr(record, key)
+        except AttributeError:
+            raise KeyError(key) from None
+    return tuple.__getitem__(record, key)
+
+
+class NavdataDemo(NamedTuple):
+    """Option 0: flight state. Angles are in millidegrees, altitude in millimeters
+    and velocities in millimeters per second"""
+
+    ctrl_state: int
+    battery_percentage: int
+    theta: float
+    phi: float
+    psi: float
+    altitude: int
+    vx: float
+    vy: float
+    vz: float
+
+    __getitem__ = _field_getitem
+
+
+class VisionDetect(NamedTuple):
+    """Option 16: number of detected tags, and the first detected tag"""
+
+    nb_detected: int
+    xc: int
+    yc: int
+    width: int
+    height: int
+    distance: int
+
+    __getitem__ = _field_getitem
+
+
+class GPSInfo(NamedTuple):
+    """Option 27: GPS position of the drone"""
+
+    latitude: float
+    longitude: float
+    elevation: float
+    hdop: float
+    data_available: int
+    zero_validated: int
+    wpt_validated: int
+
+    __getitem__ = _field_getitem
+
+
+class NavdataTime(NamedTuple):
+    """Option 1: drone clock, 11 bits of seconds and 21 bits of microseconds"""
+
+    time: int
+
+    __getitem__ = _field_getitem
+
+    @property
+    def seconds(self) -> float:
+        """Drone clock in seconds"""
+        return (self.time >> 21) + (self.time & 0x1FFFFF) / 1e6
+
+
+class RawMeasures(NamedTuple):
+    """Option 2: raw readings of the accelerometers, gyroscopes, battery
+    and ultrasound sensor"""
+
+    raw_acc_x: int
+    raw_acc_y: int
+    raw_acc_z: int
+    raw_gyro_x: int
+    raw_gyro_y: int
+    raw_gyro_z: int
+    raw_gyro_110_x: int
+    raw_gyro_110_y: int
+    vbat_raw: int
+    us_debut_echo: int
+    us_fin_echo: int
+    us_association_echo: int
+    us_distance_echo: int
+    us_courbe_temps: int
+    us_courbe_valeur: int
+    us_courbe_ref: int
+    flag_echo_ini: int
+    nb_echo: int
+    sum_echo: int
+    alt_temp_raw: int
+    gradient: int
+
+    __getitem__ = _field_getitem
+
+
+class PhysMeasures(NamedTuple):
+    """Option 3: calibrated accelerations (mg), angular rates (deg/s),
+    sensor temperatures and reference voltages"""
+
+    accs_temp: float
+    gyro_temp: int
+    phys_acc_x: float
+    phys_acc_y: float
+    phys_acc_z: float
+    phys_gyro_x: float
+    phys_gyro_y: float
+    phys_gyro_z: float
+    alim3v3: int
+    vref_epson: int
+    vref_idg: int
+
+    __getitem__ = _field_getitem
+
+
+class Altitude(NamedTuple):
+    """Option 10: altitude estimation (millimeters) of the vision, ultrasound
+    and observer"""
+
+    altitude_vision: int
+    altitude_vz: float
+    altitude_ref: int
+    altitude_raw: int
+    obs_acc_z: float
+    obs_alt: float
+    obs_x1: float
+    obs_x2: float
+    obs_x3: float
+    obs_state: int
+    est_vb1: float
+    est_vb2: float
+    est_state: int
+
+    __getitem__ = _field_getitem
+
+
+class PressureRaw(NamedTuple):
+    """Option 21: raw readings of the barometer"""
+
+    up: int
+    ut: int
+    temperature_meas: int
+    pression_meas: int
+
+    __getitem__ = _field_getitem
+
+
+class Magneto(NamedTuple):
+    """Option 22: magnetometer readings and headings"""
+
+    mx: int
+    my: int
+    mz: int
+    magneto_raw_x: float
+    magneto_raw_y: float
+    magneto_raw_z: float
+    magneto_rectified_x: float
+    magneto_rectified_y: float
+    magneto_rectified_z: float
+    magneto_offset_x: float
+    magneto_offset_y: float
+    magneto_offset_z: float
+    heading_unwrapped: float
+    heading_gyro_unwrapped: float
+    heading_fusion_unwrapped: float
+    magneto_calibration_ok: int
+    magneto_state: int
+    magneto_radius: float
+    error_mean: float
+    error_var: float
+
+    __getitem__ = _field_getitem
+
+
+class WindSpeed(NamedTuple):
+    """Option 23: wind estimation"""
+
+    wind_speed: float
+    wind_angle: float
+    wind_compensation_theta: float
+    wind_compensation_phi: float
+    state_x1: float
+    state_x2: float
+    state_x3: float
+    state_x4: float
+    state_x5: float
+    state_x6: float
+    magneto_debug1: float
+    magneto_debug2: float
+    magneto_debug3: float
+
+    __getitem__ = _field_getitem
+
+
+class KalmanPressure(NamedTuple):
+    """Option 24: altitude filter fusing the barometer and ultrasound sensor"""
+
+    offset_pressure: float
+    est_z: float
+    est_zdot: float
+    est_bias_pwm: float
+    est_biais_pression: float
+    offset_us: float
+    prediction_us: float
+    cov_alt: float
+    cov_pwm: float
+    cov_vitesse: float
+    effet_sol: int
+    somme_inno: float
+    rejet_us: int
+    u_multisinus: float
+    gaz_altitude: float
+    flag_multisinus: int
+    flag_multisinus_debut: int
+
+    __getitem__ = _field_getitem
+
+
+class NavdataOption(NamedTuple):
+    """Registry entry of a navdata option"""
+
+    name: str
+    layout: struct.Struct
+    record: Type[tuple]
+
+
+# Options are decoded by tag, layouts exclude the option tag and size
+NAVDATA_OPTIONS: Dict[int, NavdataOption] = {}
+
+
+def register_navdata_option(
+    tag: int, name: str, layout: str, record: Type[tuple]
+) -> NavdataOption:
+    """Register the layout of a navdata option. Decoders pick up new options
+    when they subscribe to them.
+
+    Args:
+        tag (int): Option tag
+        name (str): Option name used by ``NavdataPacket``
+        layout (str): ``struct`` format of the option data (without tag and size)
+        record (Type[tuple]): NamedTuple with a field per value of the layout
+
+    Raises:
+        ValueError: Layout doesn't match the record fields
+
+    Returns:
+        NavdataOption: Registered option
+    """
+    compiled = struct.Struct(layout)
+    num_values = len(compiled.unpack(bytes(compiled.size)))
+    if num_values != len(record._fields):  # type: ignore[attr-defined]
+        err_message = f"Layout of option {name} doesn't match {record.__name__}"
         _LOG.critical(err_message)
-        raise IOError(err_message)
-    # Have to check if there isn't tag and size first
-    vision_detect = {}
-    vision_detect["nb_detected"] = struct.unpack_from("=I", packet[2][0:20])[0]
-    vision_detect["xc"] = struct.unpack_from("=I", packet[2][20:36])[0]
-    vision_detect["yc"] = struct.unpack_from("=I", packet[2][36:52])[0]
-    vision_detect["width"] = struct.unpack_from("=I", packet[2][52:68])[0]
-    vision_detect["height"] = struct.unpack_from("=I", packet[2][68:84])[0]
-    vision_detect["distance"] = struct.unpack_from("=I", packet[2][84:100])[0]
-    return vision_detect
-
-
-def _gps_decode(packet) -> Dict[str, Union[float, bool]]:
-    "Decode data about the GPS"
-    gps_info = {}
-    if packet[0] != 27:
-        raise IOError("Packet isn't navdata-demo packet")
-    unpacked = struct.unpack_from("=ddddBBB", packet[2], 0)
-    gps_info["latitude"] = unpacked[0]
-    gps_info["longitude"] = unpacked[1]
-    gps_info["elevation"] = unpacked[2]
-    gps_info["hdop"] = unpacked[3]
-    gps_info["data_available"] = unpacked[4]
-    gps_info["zero_validated"] = unpacked[5]
-    gps_info["wpt_validated"] = unpacked[6]
-    return gps_info
-
-
-def navdata_decode(packet) -> Dict[str, Dict[str, Any]]:
-    "Split then decodes the navdata packet gathered from UDP 5554"
-    position = 0
-    offset = 0
-    block = []
-    block.append(list(struct.unpack_from("=IIII", packet, position)))
-    offset += struct.calcsize("=IIII")
-    i = 1
-
-    while True:
+        raise ValueError(err_message)
+    option = NavdataOption(name, compiled, record)
+    NAVDATA_OPTIONS[tag] = option
+    return option
+
+
+register_navdata_option(0, "navdata_demo", "=IIfffifff", NavdataDemo)
+register_navdata_option(1, "time", "=I", NavdataTime)
+register_navdata_option(2, "raw_measures", "=3H3h2hI9HIih", RawMeasures)
+register_navdata_option(3, "phys_measures", "=fH3f3fIII", PhysMeasures)
+register_navdata_option(10, "altitude", "=ifiiff3fI2fI", Altitude)
+# First values of the (nb_detected, type[4], xc[4], yc[4], ...) arrays
+register_navdata_option(16, "vision_detect", "=I16xI12xI12xI12xI12xI", VisionDetect)
+register_navdata_option(21, "pressure_raw", "=ihii", PressureRaw)
+register_navdata_option(22, "magneto", "=3h3f3f3f3fBI3f", Magneto)
+register_navdata_option(23, "wind_speed", "=13f", WindSpeed)
+register_navdata_option(24, "kalman_pressure", "=10fifi2f2i", KalmanPressure)
+register_navdata_option(27, "gps_info", "=ddddBBB", GPSInfo)
+
+# Options decoded by default, which are the ones used by the GUI
+DEFAULT_OPTIONS = (0, 16, 27)
+
+
+def option_tag(option: OptionKey) -> int:
+    """Get the tag of a registered option
+
+    Args:
+        option (OptionKey): Option tag or name
+
+    Raises:
+        ValueError: Option is not registered
+
+    Returns:
+        int: Option tag
+    """
+    if isinstance(option, int) and option in NAVDATA_OPTIONS:
+        return option
+    for tag, registered in NAVDATA_OPTIONS.items():
+        if registered.name == option:
+            return tag
+    err_message = f"Navdata option {option} is not supported"
+    _LOG.critical(err_message)
+    raise ValueError(err_message)
+
+
+def navdata_checksum(packet: Buffer, end: Optional[int] = None) -> int:
+    """Compute the navdata checksum, which is the sum of the packet bytes
+    (vectorized with numpy)
+
+    Args:
+        packet (Buffer): Navdata packet
+        end (Optional[int], optional): Number of summed bytes, i.e. the offset
+        of the checksum option. Defaults to None (the whole packet).
+
+    Returns:
+        int: 32 bits checksum
+    """
+    count = len(packet) if end is None else end
+    data = np.frombuffer(packet, dtype=np.uint8, count=count)
+    return int(data.sum(dtype=np.uint64)) & 0xFFFFFFFF
+
+
+class DroneState:
+    """Drone state flags packed in a 32 bits integer. Flags are read on access,
+    as attributes (``state.flying``) or by name (``state["flying"]``)"""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: int) -> None:
+        """Construct drone state
+
+        Args:
+            value (int): Drone state field of the navdata header
+        """
+        self.value = value
+
+    def __getattr__(self, name: str) -> int:
+        """Get a flag by name"""
         try:
-            current_block = list(
-                struct.unpack_from("=HH", packet, offset)
-            )  # Separate Option ID & Size of option int
-            offset += struct.calcsize("=HH")
-            block.append(current_block)
-        except struct.error:
-            break
-        block[i].append(
-            packet[offset : offset - struct.calcsize("=HH") + int(block[i][1])]
+            bit = DRONE_STATE_BITS[name]
+        except KeyError:
+            raise AttributeError(name) from None
+        return self.value >> bit & 1
+
+    def __getitem__(self, name: str) -> int:
+        """Get a flag by name"""
+        return self.value >> DRONE_STATE_BITS[name] & 1
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, DroneState):
+            return self.value == other.value
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"DroneState({self.value:#010x})"
+
+    def as_dict(self) -> Dict[str, int]:
+        """Get all flags as a dictionary"""
+        value = self.value
+        return {name: value >> bit & 1 for name, bit in DRONE_STATE_BITS.items()}
+
+
+class NavdataPacket:
+    """Decoded navdata packet. Options are looked up by name, and the packet
+    can be indexed like the dictionary returned by ``navdata_decode``
+    (``packet["navdata_demo"]["altitude"]``)"""
+
+    __slots__ = (
+        "header",
+        "drone_state",
+        "sequence",
+        "vision_flag",
+        "options",
+        "checksum",
+    )
+
+    def __init__(
+        self, header: int, drone_state: int, sequence: int, vision_flag: int
+    ) -> None:
+        """Construct packet from its header"""
+        self.header = header
+        self.drone_state = DroneState(drone_state)
+        self.sequence = sequence
+        self.vision_flag = vision_flag
+        self.options: Dict[str, tuple] = {}
+        self.checksum: Optional[int] = None
+
+    def __getitem__(self, name: str) -> Any:
+        """Get the drone state or an option by name"""
+        if name == "drone_state":
+            return self.drone_state
+        return self.options[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name == "drone_state" or name in self.options
+
+    def __repr__(self) -> str:
+        return (
+            f"NavdataPacket(sequence={self.sequence}, "
+            f"drone_state={self.drone_state!r}, options={self.options!r})"
         )
-        offset += block[i][1] - struct.calcsize("=HH")
-        i = i + 1
-    # block[0]      is (header, drone_state, sequence_number, vision_flag)
-    # block[1:-1]   is Option0, Option1 ...
-    # block[-1]     is checksum
-
-    # Decode the drone state
-    drone_state = _drone_status_decode(block[0][1])
-    vision_detect = {}
-    navdata_demo = {}
-    gps_info = {}
-
-    for i in range(1, len(block)):
-        if block[i] != []:
-            # Vision detection option
-            if block[i][0] == 16:
-                vision_detect = _vision_detect_decode(block[i])
-            # Option0: Navdata_demo(useful data)
-            elif block[i][0] == 0:
-                navdata_demo = _navdata_demo_decode(block[i])
-            # GPS Info
-            elif block[i][0] == 27:
-                gps_info = _gps_decode(block[i])
-            # Checksum option
-            elif block[i][0] == 65535:
-                pass
-
-    navdata: Dict[str, Dict[str, Any]] = {}
-    navdata["drone_state"] = drone_state
-    navdata["vision_detect"] = vision_detect
-    navdata["navdata_demo"] = navdata_demo
-    navdata["gps_info"] = gps_info
-    return navdata
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """Get an option by name, or ``default`` if it was not received"""
+        return self.options.get(name, default)
+
+    def as_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Convert packet to the nested dictionaries of ``navdata_decode``, with
+        angles of ``navdata_demo`` in degrees, and truncated velocities"""
+        navdata: Dict[str, Dict[str, Any]] = {
+            "drone_state": self.drone_state.as_dict(),
+            "vision_detect": {},
+            "navdata_demo": {},
+            "gps_info": {},
+        }
+        for name, record in self.options.items():
+            navdata[name] = record._asdict()  # type: ignore[attr-defined]
+        demo = navdata["navdata_demo"]
+        if demo:
+            demo["theta"] = int(demo["theta"] / 1000)
+            demo["phi"] = int(demo["phi"] / 1000)
+            for key in ("vx", "vy", "vz"):
+                demo[key] = int(demo[key])
+        return navdata
+
+
+class NavdataDecoder:
+    """Decode navdata packets gathered from UDP 5554 into typed records.
+
+    Only subscribed options are parsed, the other ones are skipped by their size
+    like unknown options. Options which are too short for their layout are
+    skipped as well. Subscriptions can be changed while another thread decodes.
+    """
+
+    def __init__(
+        self,
+        options: Iterable[OptionKey] = DEFAULT_OPTIONS,
+        verify_checksum: bool = False,
+    ) -> None:
+        """Construct decoder
+
+        Args:
+            options (Iterable[OptionKey], optional): Tags or names of subscribed
+            options. Defaults to the demo, vision detect and GPS options.
+            verify_checksum (bool, optional): Whether to drop packets with an invalid
+            or missing checksum. Defaults to False.
+        """
+        self.verify_checksum = verify_checksum
+        self._options: Dict[int, NavdataOption] = {}
+        self.subscribe(*options)
+
+    @property
+    def subscribed(self) -> Dict[int, str]:
+        """Names of the subscribed options by tag"""
+        return {tag: option.name for tag, option in self._options.items()}
+
+    def subscribe(self, *options: OptionKey) -> None:
+        """Start decoding options
+
+        Args:
+            options (OptionKey): Tags or names of the options
+        """
+        subscribed = dict(self._options)
+        for option in options:
+            tag = option_tag(option)
+            subscribed[tag] = NAVDATA_OPTIONS[tag]
+        self._options = subscribed
+
+    def unsubscribe(self, *options: OptionKey) -> None:
+        """Stop decoding options
+
+        Args:
+            options (OptionKey): Tags or names of the options
+        """
+        subscribed = dict(self._options)
+        for option in options:
+            subscribed.pop(option_tag(option), None)
+        self._options = subscribed
+
+    def decode(self, packet: Buffer) -> NavdataPacket:
+        """Decode a navdata packet
+
+        Args:
+            packet (Buffer): Received packet
+
+        Raises:
+            IOError: Packet is shorter than the navdata header, or its checksum
+            is invalid (only if ``verify_checksum`` is set)
+
+        Returns:
+            NavdataPacket: Decoded packet
+        """
+        if len(packet) < _HEADER.size:
+            err_message = "Packet is too short for a navdata packet"
+            _LOG.critical(err_message)
+            raise IOError(err_message)
+
+        navdata = NavdataPacket(*_HEADER.unpack_from(packet, 0))
+        subscribed = self._options
+        options = navdata.options
+        unpack_option_header = _OPTION_HEADER.unpack_from
+        option_header_size = _OPTION_HEADER.size
+        end = len(packet)
+        offset = _HEADER.size
+        while offset + option_header_size <= end:
+            tag, size = unpack_option_header(packet, offset)
+            if size < option_header_size or offset + size > end:
+                _LOG.debug("Malformed navdata option %d of size %d", tag, size)
+                break
+            data_offset = offset + option_header_size
+            if tag == CHECKSUM_TAG:
+                if size >= option_header_size + _CHECKSUM.size:
+                    navdata.checksum = _CHECKSUM.unpack_from(packet, data_offset)[0]
+                break
+            option = subscribed.get(tag)
+            if option is not None:
+                name, layout, record = option
+                if size - option_header_size >= layout.size:
+                    # Layouts match the record fields (checked on registration),
+                    # so skip the checks of ``_make``
+                    options[name] = tuple.__new__(
+                        record, layout.unpack_from(packet, data_offset)
+                    )
+            offset += size
+
+        if self.verify_checksum and (
+            navdata.checksum is None
+            or navdata.checksum != navdata_checksum(packet, offset)
+        ):
+            raise IOError(f"Invalid checksum of navdata packet {navdata.sequence}")
+        return navdata
+
+
+_DEFAULT_DECODER = NavdataDecoder()
+
+
+def decode_navdata(packet: Buffer) -> NavdataPacket:
+    """Decode the default options (demo, vision detect and GPS) of a navdata
+    packet gathered from UDP 5554 into a typed record
+
+    Args:
+        packet (Buffer): Received packet
+
+    Raises:
+        IOError: Packet is shorter than the navdata header
+
+    Returns:
+        NavdataPacket: Decoded packet
+    """
+    return _DEFAULT_DECODER.decode(packet)
+
+
+def encode_navdata(
+    drone_state: int,
+    sequence: int,
+    options: Dict[str, tuple],
+    vision_flag: int = 0,
+) -> bytes:
+    """Encode a navdata packet the way the drone sends it, which is useful for
+    simulating the drone and for testing
+
+    Args:
+        drone_state (int): Drone state flags
+        sequence (int): Sequence number of the packet
+        options (Dict[str, tuple]): Registered option records by name, e.g.
+        ``{"navdata_demo": NavdataDemo(...)}``
+        vision_flag (int, optional): Vision flag of the header. Defaults to 0.
+
+    Returns:
+        bytes: Encoded packet ending with its checksum
+    """
+    packet = bytearray(_HEADER.pack(NAVDATA_HEADER, drone_state, sequence, vision_flag))
+    for name, record in options.items():
+        tag = option_tag(name)
+        layout = NAVDATA_OPTIONS[tag].layout
+        packet += _OPTION_HEADER.pack(tag, _OPTION_HEADER.size + layout.size)
+        packet += layout.pack(*record)
+    checksum = navdata_checksum(packet)
+    packet += _OPTION_HEADER.pack(CHECKSUM_TAG, _OPTION_HEADER.size + _CHECKSUM.size)
+    packet += _CHECKSUM.pack(checksum)
+    return bytes(packet)
+
+
+def _drone_status_decode(packet: int) -> Dict[str, int]:
+    "Decode the block which contains Drone Status"
+    return DroneState(packet).as_dict()
+
+
+def navdata_decode(packet: Buffer) -> Dict[str, Dict[str, Any]]:
+    "Split then decodes the navdata packet gathered from UDP 5554"
+    return decode_navdata(packet).as_dict()
@@ -0,0 +1,177 @@
+"""Fixed-capacity history of navigation data backed by numpy arrays"""
+from typing import Any, Dict, List, Optional, Tuple
+import time
+
+import numpy as np
+
+# Columns of the default history, as (option name, field name)
+DEFAULT_FIELDS: Dict[str, Tuple[str, str]] = {
+    "battery_percentage": ("navdata_demo", "battery_percentage"),
+    "theta": ("navdata_demo", "theta"),
+    "phi": ("navdata_demo", "phi"),
+    "psi": ("navdata_demo", "psi"),
+    "altitude": ("navdata_demo", "altitude"),
+    "vx": ("navdata_demo", "vx"),
+    "vy": ("navdata_demo", "vy"),
+    "vz": ("navdata_demo", "vz"),
+}
+
+
+class NavdataHistory:
+    """Ring buffer of navdata samples with monotonic timestamps.
+
+    Each sample is stored as a row of floats (``NaN`` for fields of options
+    which were not received). Rows are written twice, at their slot and at the
+    same slot of a mirrored copy, so the latest ``n`` samples are always
+    contiguous: appending is O(1), and ``latest``, ``last`` and ``between``
+    return views without copying.
+
+    The history has a single writer (the navdata callback) and lock-free readers.
+    Returned views are overwritten once the writer wraps around the capacity,
+    hence readers which keep them longer should copy them.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 4096,
+        fields: Optional[Dict[str, Tuple[str, str]]] = None,
+    ) -> None:
+        """Allocate history
+
+        Args:
+            capacity (int, optional): Number of stored samples. Defaults to 4096
+            (about 20s of full navdata at 200 Hz).
+            fields (Optional[Dict[str, Tuple[str, str]]], optional): Column names
+            mapped to the ``(option, field)`` holding their values. Defaults to
+            None (``DEFAULT_FIELDS``).
+        """
+        assert capacity > 0, "Capacity must be a positive number of samples"
+        self.capacity = capacity
+        self.fields = dict(DEFAULT_FIELDS if fields is None else fields)
+        self._columns = {name: index for index, name in enumerate(self.fields)}
+        # Fields grouped by option, so each option is looked up once per sample
+        self._options: Dict[str, List[Tuple[int, str]]] = {}
+        for index, (option, field) in enumerate(self.fields.values()):
+            self._options.setdefault(option, []).append((index, field))
+        self._timestamps = np.zeros(2 * capacity, dtype=np.float64)
+        self._values = np.full((2 * capacity, len(self.fields)), np.nan)
+        self._count = 0
+
+    @property
+    def columns(self) -> List[str]:
+        """Names of the stored fields, in column order"""
+        return list(self.fields)
+
+    def __len__(self) -> int:
+        """Number of stored samples"""
+        return min(self._count, self.capacity)
+
+    @property
+    def count(self) -> int:
+        """Number of samples appended since the last ``clear``, which keeps growing
+        once the capacity is reached, so readers can tell when new samples arrived"""
+        return self._count
+
+    def append(self, navdata: Any, timestamp: Optional[float] = None) -> None:
+        """Store a navdata sample
+
+        Args:
+            navdata (Any): Decoded navdata (``NavdataPacket`` or nested dictionaries)
+            timestamp (Optional[float], optional): Monotonic time of the sample.
+            Defaults to None (``time.monotonic()``).
+        """
+        row = [np.nan] * len(self.fields)
+        for option, fields in self._options.items():
+            record = navdata.get(option)
+            if record:
+                for index, field in fields:
+                    try:
+                        row[index] = record[field]
+                    except KeyError:
+                        pass  # e.g. the demo drone sends no angles
+
+        slot = self._count % self.capacity
+        when = time.monotonic() if timestamp is None else timestamp
+        self._values[slot] = row
+        self._values[slot + self.capacity] = row
+        self._timestamps[slot] = when
+        self._timestamps[slot + self.capacity] = when
+        # Publish the sample only once it is written
+        self._count += 1
+
+    def latest(self) -> Tuple[float, np.ndarray]:
+        """Get the latest sample
+
+        Raises:
+            IndexError: History is empty
+
+        Returns:
+            Tuple[float, np.ndarray]: Timestamp and a view of the values row
+        """
+        count = self._count
+        if count == 0:
+            raise IndexError("Navdata history is empty")
+        slot = (count - 1) % self.capacity + self.capacity
+        return float(self._timestamps[slot]), self._values[slot]
+
+    def latest_value(self, name: str) -> float:
+        """Get the latest value of a field (``NaN`` if the history is empty)"""
+        count = self._count
+        if count == 0:
+            return float("nan")
+        slot = (count - 1) % self.capacity + self.capacity
+        return float(self._values[slot, self._columns[name]])
+
+    def between(
+        self, start: float, end: float, name: Optional[str] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the samples with timestamps in ``[start, end]``
+
+        Args:
+            start (float): Monotonic start time
+            end (float): Monotonic end time
+            name (Optional[str], optional): Field to select. Defaults to None
+            (all columns).
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Views of the timestamps, and of the values
+            (a column if ``name`` is set, rows otherwise)
+        """
+        timestamps, values = self._stored()
+        first = np.searchsorted(timestamps, start, side="left")
+        last = np.searchsorted(timestamps, end, side="right")
+        if name is not None:
+            values = values[:, self._columns[name]]
+        return timestamps[first:last], values[first:last]
+
+    def last(
+        self, seconds: float, name: Optional[str] = None, now: Optional[float] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the samples of the last ``seconds``, e.g. ``last(10, "altitude")``
+
+        Args:
+            seconds (float): Length of the window
+            name (Optional[str], optional): Field to select. Defaults to None
+            (all columns).
+            now (Optional[float], optional): End of the window. Defaults to None
+            (``time.monotonic()``).
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Views of the timestamps and values
+        """
+        end = time.monotonic() if now is None else now
+        return self.between(end - seconds, end, name)
+
+    def clear(self) -> None:
+        """Forget all samples"""
+        self._count = 0
+
+    def _stored(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Views of all stored samples in chronological order"""
+        count = self._count
+        size = min(count, self.capacity)
+        stop = (count - 1) % self.capacity + self.capacity + 1 if count else 0
+        return (
+            self._timestamps[stop - size : stop],
+            self._values[stop - size : stop],
+        )
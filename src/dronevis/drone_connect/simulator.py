@@ -0,0 +1,665 @@
+"""Local AR.Drone 2.0 protocol simulator
+
+Serves the drone protocol on local sockets, so the real client stack (``Drone``,
+``Command``, ``Navdata`` and ``VideoThread``) can be run, benchmarked and
+soak-tested without hardware:
+
+- UDP 5556: AT commands (``AT*REF``, ``AT*PCMD``, ``AT*CONFIG``, ``AT*CTRL``,
+  ``AT*COMWDG``...) update a simple flight model.
+- UDP 5554: binary navdata streamed to the client which sent the init packet.
+  Only the demo option is sent until ``general:navdata_demo`` is set to FALSE,
+  then every registered option is sent.
+- TCP 5555: MJPEG test pattern (concatenated JPEG frames).
+- TCP 23: telnet prompt.
+
+Packet loss, latency and jitter are applied to both UDP directions, and the
+navdata and video rates are configurable.
+
+Usage
+------------------
+    $ python -m dronevis.drone_connect.simulator [--options]
+
+On a single host, the client can't bind the navdata port of the simulator.
+Hence, either bind the simulator to another address, or let the client receive
+navdata on any free port, e.g. ``Navdata.local_data_port = 0``. Ports of the
+client are set with ``Command.command_port``, ``Navdata.data_port``,
+``VideoThread.video_port`` and ``Drone.telnet_port``.
+"""
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from dataclasses import dataclass
+import argparse
+import heapq
+import itertools
+import logging
+import random
+import re
+import selectors
+import socket
+import struct
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from dronevis.drone_connect.navdata_decode import (
+    DRONE_STATE_BITS,
+    NAVDATA_OPTIONS,
+    NavdataDemo,
+    NavdataTime,
+    encode_navdata,
+)
+from dronevis.utils.metrics import MetricsRegistry
+
+_LOG = logging.getLogger(__name__)
+
+_CONFIG = re.compile(r'(\d+),"([^"]*)","([^"]*)"')
+# Floats of AT*PCMD are received as the integers sharing their binary representation
+_PCMD_INTEGERS = struct.Struct("=4i")
+_PCMD_FLOATS = struct.Struct("=4f")
+_EMERGENCY_BIT = 1 << 8
+_TAKEOFF_BIT = 1 << 9
+_TELNET_PROMPT = b"\r\n\r\nBusyBox v1.14.0 () built-in shell (ash)\r\n# "
+
+
+@dataclass
+class SimulatorConfig:
+    """Addresses, rates and link quality of the simulator"""
+
+    host: str = "127.0.0.1"
+    command_port: int = 5556
+    navdata_port: int = 5554
+    video_port: int = 5555
+    telnet_port: int = 23
+    navdata_rate: float = 200.0  # Packets per second (15 in demo mode on the drone)
+    video_fps: float = 30.0
+    frame_size: Tuple[int, int] = (640, 360)
+    jpeg_quality: int = 80
+    loss: float = 0.0  # Probability of dropping a UDP datagram
+    latency: float = 0.0  # One way delay of UDP datagrams in seconds
+    jitter: float = 0.0  # Uniform random delay added to the latency
+    watchdog_timeout: float = 0.25
+    seed: Optional[int] = None
+
+
+class LinkModel:
+    """Lossy link delaying datagrams"""
+
+    def __init__(
+        self,
+        loss: float = 0.0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        """Initialize link
+
+        Args:
+            loss (float, optional): Probability of dropping a datagram. Defaults to 0.
+            latency (float, optional): Delay in seconds. Defaults to 0.
+            jitter (float, optional): Maximum random delay added to the latency.
+            Defaults to 0.
+            seed (Optional[int], optional): Seed of the random generator.
+            Defaults to None.
+        """
+        assert 0.0 <= loss <= 1.0, "Loss should be a probability"
+        assert latency >= 0.0 and jitter >= 0.0, "Delays should be positive"
+        self.loss = loss
+        self.latency = latency
+        self.jitter = jitter
+        self._random = random.Random(seed)
+
+    def delivery_time(self, now: float) -> Optional[float]:
+        """Get the delivery time of a datagram sent at ``now``
+
+        Args:
+            now (float): Monotonic sending time
+
+        Returns:
+            Optional[float]: Monotonic delivery time, None if the datagram is lost
+        """
+        if self.loss and self._random.random() < self.loss:
+            return None
+        return now + self.latency + self._random.uniform(0.0, self.jitter)
+
+
+class FlightModel:
+    """State of the simulated drone, updated by AT commands"""
+
+    takeoff_altitude = 1000  # mm
+    climb_speed = 700.0  # mm/s when taking off and landing
+    max_speed = 2000.0  # mm/s at full pitch or roll
+    max_vertical_speed = 1000.0  # mm/s at full gaz
+    max_yaw_speed = 100.0  # degrees/s at full yaw
+    max_angle = 12000.0  # millidegrees at full pitch or roll
+
+    def __init__(self) -> None:
+        self.flying = False
+        self.landing = False
+        self.emergency = False
+        self.ack = False
+        self.navdata_demo = True
+        self.altitude = 0.0
+        self.battery = 100.0
+        self.psi = 0.0
+        self.controls = (0.0, 0.0, 0.0, 0.0)  # roll, pitch, gaz, yaw
+        self.configs: Dict[str, str] = {}
+        self.last_sequence = 0
+        self.last_command = time.monotonic()
+        self._last_ref = 0
+
+    def apply(self, command: str, now: float) -> bool:
+        """Apply an AT command
+
+        Args:
+            command (str): AT command without its trailing carriage return
+            now (float): Monotonic reception time
+
+        Returns:
+            bool: Whether the command was applied (false for stale sequences)
+        """
+        self.last_command = now
+        name, _, arguments = command.partition("=")
+        if not arguments:  # e.g. "AT*COMWDG"
+            return True
+        sequence_text, _, values = arguments.partition(",")
+        try:
+            sequence = int(sequence_text)
+            # The drone drops commands older than the last one, unless
+            # numbering restarts
+            if sequence <= self.last_sequence and sequence != 1:
+                return False
+            self.last_sequence = sequence
+            self._dispatch(name, arguments, values)
+        except (ValueError, struct.error):
+            _LOG.debug("Malformed AT command %s", command)
+            return False
+        return True
+
+    def _dispatch(self, name: str, arguments: str, values: str) -> None:
+        """Apply the arguments of an AT command"""
+        if name == "AT*REF":
+            self._reference(int(values))
+        elif name == "AT*PCMD":
+            flag, *integers = (int(value) for value in values.split(",")[:5])
+            if flag & 1:
+                self.controls = _PCMD_FLOATS.unpack(_PCMD_INTEGERS.pack(*integers))
+            else:
+                self.controls = (0.0, 0.0, 0.0, 0.0)
+        elif name == "AT*CONFIG":
+            match = _CONFIG.fullmatch(arguments)
+            if match is not None:
+                key, value = match.group(2), match.group(3)
+                self.configs[key] = value
+                if key == "general:navdata_demo":
+                    self.navdata_demo = value.upper() == "TRUE"
+                self.ack = True
+        elif name == "AT*CTRL" and values == "5,0":
+            self.ack = False
+
+    def _reference(self, value: int) -> None:
+        """Apply the takeoff, land and emergency flags of ``AT*REF``"""
+        if value == self._last_ref:
+            return
+        self._last_ref = value
+        if value & _EMERGENCY_BIT:
+            # Toggle emergency, which cuts the motors
+            self.emergency = not self.emergency
+            if self.emergency:
+                self.flying = self.landing = False
+                self.altitude = 0.0
+        elif value & _TAKEOFF_BIT:
+            if not self.emergency and not self.flying:
+                self.flying, self.landing = True, False
+        elif self.flying:
+            self.landing = True
+
+    def step(self, elapsed: float) -> None:
+        """Integrate the flight over ``elapsed`` seconds"""
+        if not self.flying:
+            return
+        ceiling = float(self.configs.get("control:altitude_max", 3000))
+        if self.landing:
+            self.altitude -= self.climb_speed * elapsed
+            if self.altitude <= 0:
+                self.altitude = 0.0
+                self.flying = self.landing = False
+            return
+        gaz, yaw = self.controls[2], self.controls[3]
+        if self.altitude < self.takeoff_altitude and not gaz:
+            self.altitude += self.climb_speed * elapsed
+        self.altitude += gaz * self.max_vertical_speed * elapsed
+        self.altitude = min(max(self.altitude, 0.0), ceiling)
+        self.psi = (self.psi + yaw * self.max_yaw_speed * elapsed + 180) % 360 - 180
+        self.battery = max(self.battery - elapsed / 10, 0.0)
+
+    def drone_state(self, now: float, watchdog_timeout: float) -> int:
+        """Get the drone state flags"""
+        flags = {
+            "flying": self.flying,
+            "video_on": True,
+            "command_ack": self.ack,
+            "fw_ok": True,
+            "navdata_demo": self.navdata_demo,
+            "vbat_low": self.battery < 20,
+            "atcodec_thread_on": True,
+            "navdata_thread_on": True,
+            "video_thread_on": True,
+            "com_watchdog": now - self.last_command > watchdog_timeout,
+            "emergency": self.emergency,
+        }
+        state = 0
+        for name, flag in flags.items():
+            if flag:
+                state |= 1 << DRONE_STATE_BITS[name]
+        return state
+
+    def navdata(self, sequence: int, now: float, watchdog_timeout: float) -> bytes:
+        """Encode a navdata packet of the current state"""
+        roll, pitch, gaz, _ = self.controls
+        if self.landing:
+            ctrl_state = 8
+        elif self.flying:
+            ctrl_state = 3 if any(self.controls) else 4
+        else:
+            ctrl_state = 2
+        options: Dict[str, tuple] = {
+            "navdata_demo": NavdataDemo(
+                ctrl_state << 16,
+                int(self.battery),
+                pitch * self.max_angle,
+                roll * self.max_angle,
+                self.psi * 1000,
+                int(self.altitude),
+                -pitch * self.max_speed if self.flying else 0.0,
+                roll * self.max_speed if self.flying else 0.0,
+                gaz * self.max_vertical_speed if self.flying else 0.0,
+            )
+        }
+        if not self.navdata_demo:
+            seconds, fraction = divmod(now, 1.0)
+            options["time"] = NavdataTime(
+                (int(seconds) & 0x7FF) << 21 | int(fraction * 1e6)
+            )
+            for option in NAVDATA_OPTIONS.values():
+                if option.name not in options:
+                    options[option.name] = _zero_record(option.name)
+        return encode_navdata(
+            self.drone_state(now, watchdog_timeout), sequence, options
+        )
+
+
+_ZERO_RECORDS: Dict[str, tuple] = {}
+
+
+def _zero_record(name: str) -> tuple:
+    """Get a record of a registered option with every field set to zero"""
+    record = _ZERO_RECORDS.get(name)
+    if record is None:
+        option = next(opt for opt in NAVDATA_OPTIONS.values() if opt.name == name)
+        record = option.layout.unpack(bytes(option.layout.size))
+        _ZERO_RECORDS[name] = record
+    return record
+
+
+def draw_test_pattern(index: int, width: int, height: int) -> np.ndarray:
+    """Draw a moving test pattern
+
+    Args:
+        index (int): Frame index
+        width (int): Frame width
+        height (int): Frame height
+
+    Returns:
+        np.ndarray: BGR frame
+    """
+    gradient = np.linspace(0, 255, width, dtype=np.uint8)
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    frame[:] = gradient[None, :, None]
+    frame[:, :, 1] = np.roll(gradient, index * 4)[None, :]
+    size = height // 4
+    left = (index * 8) % max(width - size, 1)
+    top = height // 2 - size // 2
+    frame[top : top + size, left : left + size] = (0, 0, 255)
+    cv2.putText(
+        frame,
+        f"dronevis simulator {index}",
+        (10, 30),
+        cv2.FONT_HERSHEY_SIMPLEX,
+        0.8,
+        (255, 255, 255),
+        2,
+    )
+    return frame
+
+
+class DroneSimulator:
+    """Simulated AR.Drone 2.0 serving the drone protocol on local sockets.
+
+    A single thread handles both UDP ports: it applies AT commands, streams
+    navdata at ``navdata_rate`` on absolute deadlines, and delivers the
+    datagrams delayed by the link model. Another thread accepts TCP clients,
+    each served by a thread of its own.
+
+    Received, applied, stale and dropped commands, sent and dropped navdata
+    packets, and sent video frames are counted in ``metrics``.
+    """
+
+    def __init__(
+        self,
+        config: Optional[SimulatorConfig] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ) -> None:
+        """Bind the simulator sockets
+
+        Args:
+            config (Optional[SimulatorConfig], optional): Configuration of the
+            simulator. Defaults to None (default configuration). Ports set to
+            0 are bound to free ports, see ``ports``.
+            metrics (Optional[MetricsRegistry], optional): Registry of the
+            simulator metrics. Defaults to None (a new registry).
+        """
+        self.config = config if config is not None else SimulatorConfig()
+        self.metrics = metrics if metrics is not None else MetricsRegistry()
+        self.flight = FlightModel()
+        self.link = LinkModel(
+            self.config.loss, self.config.latency, self.config.jitter, self.config.seed
+        )
+        self.navdata_client: Optional[Tuple[str, int]] = None
+        self._running = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        # Datagrams waiting for their delivery time, as (time, order, action)
+        self._pending: List[Tuple[float, int, Callable[[], None]]] = []
+        self._order = itertools.count()
+
+        host = self.config.host
+        self.command_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.command_sock.bind((host, self.config.command_port))
+        self.navdata_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.navdata_sock.bind((host, self.config.navdata_port))
+        self.video_sock = self._listen(host, self.config.video_port)
+        self.telnet_sock = self._listen(host, self.config.telnet_port)
+        for sock in (self.command_sock, self.navdata_sock):
+            sock.setblocking(False)
+        self._wakeup_recv, self._wakeup_send = socket.socketpair()
+        self._wakeup_recv.setblocking(False)
+
+    @staticmethod
+    def _listen(host: str, port: int) -> socket.socket:
+        """Open a listening TCP socket"""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host, port))
+        sock.listen()
+        sock.setblocking(False)
+        return sock
+
+    @property
+    def ports(self) -> Dict[str, int]:
+        """Bound ports, by service"""
+        return {
+            "command": self.command_sock.getsockname()[1],
+            "navdata": self.navdata_sock.getsockname()[1],
+            "video": self.video_sock.getsockname()[1],
+            "telnet": self.telnet_sock.getsockname()[1],
+        }
+
+    def start(self) -> "DroneSimulator":
+        """Start serving"""
+        self._running.set()
+        for target, name in (
+            (self._serve_udp, "udp"),
+            (self._serve_tcp, "tcp"),
+        ):
+            thread = threading.Thread(
+                target=target, name=f"DroneSimulator-{name}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        _LOG.info("Drone simulator serving on %s %s", self.config.host, self.ports)
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the sockets"""
+        if not self._running.is_set():
+            return
+        self._running.clear()
+        self._wakeup_send.send(b"\x00")
+        for thread in self._threads:
+            thread.join(timeout=2)
+        self._threads.clear()
+        for sock in (
+            self.command_sock,
+            self.navdata_sock,
+            self.video_sock,
+            self.telnet_sock,
+            self._wakeup_recv,
+            self._wakeup_send,
+        ):
+            sock.close()
+
+    def __enter__(self) -> "DroneSimulator":
+        return self.start()
+
+    def __exit__(self, *_) -> None:
+        self.stop()
+
+    # UDP
+    def _serve_udp(self) -> None:
+        """Receive commands, stream navdata and deliver delayed datagrams"""
+        selector = selectors.DefaultSelector()
+        selector.register(self.command_sock, selectors.EVENT_READ)
+        selector.register(self.navdata_sock, selectors.EVENT_READ)
+        selector.register(self._wakeup_recv, selectors.EVENT_READ)
+        period = 1.0 / self.config.navdata_rate
+        next_navdata = last_step = time.monotonic()
+        sequence = 0
+        while self._running.is_set():
+            now = time.monotonic()
+            timeout = next_navdata - now
+            if self._pending:
+                timeout = min(timeout, self._pending[0][0] - now)
+            for key, _ in selector.select(max(timeout, 0.0)):
+                if key.fileobj is self.command_sock:
+                    self._receive_commands()
+                elif key.fileobj is self.navdata_sock:
+                    self._receive_navdata_init()
+
+            now = time.monotonic()
+            while self._pending and self._pending[0][0] <= now:
+                heapq.heappop(self._pending)[2]()
+            if now >= next_navdata:
+                with self._lock:
+                    self.flight.step(now - last_step)
+                last_step = now
+                if self.navdata_client is not None:
+                    sequence += 1
+                    with self._lock:
+                        packet = self.flight.navdata(
+                            sequence, now, self.config.watchdog_timeout
+                        )
+                    self._transmit(packet, self.navdata_client)
+                next_navdata += period
+                if next_navdata < now:
+                    # Skip missed packets instead of sending bursts
+                    next_navdata = now + period
+        selector.close()
+
+    def _delay(self, action: Callable[[], None], counter: str) -> None:
+        """Run an action on delivery of a datagram, unless it is lost"""
+        now = time.monotonic()
+        delivery = self.link.delivery_time(now)
+        if delivery is None:
+            self.metrics.increment(counter)
+        elif delivery <= now:
+            action()
+        else:
+            heapq.heappush(self._pending, (delivery, next(self._order), action))
+
+    def _receive_commands(self) -> None:
+        """Receive every queued AT commands datagram"""
+        while True:
+            try:
+                datagram = self.command_sock.recv(4096)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as err:
+                _LOG.warning("Failed receiving commands: %s", err)
+                return
+            self._delay(
+                lambda data=datagram: self._apply(data), "simulator_commands_dropped"
+            )
+
+    def _apply(self, datagram: bytes) -> None:
+        """Apply the AT commands of a datagram"""
+        now = time.monotonic()
+        with self._lock:
+            for command in datagram.decode(errors="replace").split("\r"):
+                if not command:
+                    continue
+                self.metrics.increment("simulator_commands")
+                if not self.flight.apply(command, now):
+                    self.metrics.increment("simulator_commands_stale")
+
+    def _receive_navdata_init(self) -> None:
+        """Stream navdata to the sender of the init packet"""
+        while True:
+            try:
+                _, address = self.navdata_sock.recvfrom(64)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as err:
+                _LOG.warning("Failed receiving navdata init: %s", err)
+                return
+            if address != self.navdata_client:
+                _LOG.info("Streaming navdata to %s", address)
+            self.navdata_client = address
+
+    def _transmit(self, packet: bytes, address: Tuple[str, int]) -> None:
+        """Send a navdata packet through the link"""
+
+        def send() -> None:
+            try:
+                self.navdata_sock.sendto(packet, address)
+                self.metrics.increment("simulator_navdata")
+            except OSError as err:
+                _LOG.debug("Failed sending navdata: %s", err)
+
+        self._delay(send, "simulator_navdata_dropped")
+
+    # TCP
+    def _serve_tcp(self) -> None:
+        """Accept video and telnet clients"""
+        selector = selectors.DefaultSelector()
+        selector.register(self.video_sock, selectors.EVENT_READ, self._stream_video)
+        selector.register(self.telnet_sock, selectors.EVENT_READ, self._telnet)
+        selector.register(self._wakeup_recv, selectors.EVENT_READ)
+        while self._running.is_set():
+            for key, _ in selector.select():
+                if key.data is None:
+                    continue
+                try:
+                    client, address = key.fileobj.accept()  # type: ignore[union-attr]
+                except (BlockingIOError, InterruptedError):
+                    continue
+                _LOG.info("Accepted %s", address)
+                client.setblocking(True)
+                threading.Thread(target=key.data, args=(client,), daemon=True).start()
+        selector.close()
+
+    def _stream_video(self, client: socket.socket) -> None:
+        """Send JPEG frames of the test pattern at ``video_fps``"""
+        width, height = self.config.frame_size
+        params = [int(cv2.IMWRITE_JPEG_QUALITY), self.config.jpeg_quality]
+        period = 1.0 / self.config.video_fps
+        deadline = time.monotonic()
+        with client:
+            for index in itertools.count():
+                if not self._running.is_set():
+                    return
+                _, jpeg = cv2.imencode(
+                    ".jpg", draw_test_pattern(index, width, height), params
+                )
+                try:
+                    client.sendall(jpeg.tobytes())
+                except OSError:
+                    return
+                self.metrics.increment("simulator_frames")
+                deadline += period
+                time.sleep(max(deadline - time.monotonic(), 0.0))
+
+    def _telnet(self, client: socket.socket) -> None:
+        """Answer with a shell prompt until the client leaves"""
+        client.settimeout(0.5)
+        with client:
+            try:
+                client.sendall(_TELNET_PROMPT)
+                while self._running.is_set():
+                    try:
+                        data = client.recv(1024)
+                    except socket.timeout:
+                        continue
+                    if not data:
+                        return
+                    client.sendall(b"# ")
+            except OSError:
+                return
+
+
+def main(arguments: Optional[Sequence[str]] = None) -> None:
+    """Run the simulator until interrupted"""
+    defaults = SimulatorConfig()
+    parser = argparse.ArgumentParser(description="AR.Drone 2.0 protocol simulator")
+    parser.add_argument("--host", default=defaults.host)
+    parser.add_argument("--command-port", type=int, default=defaults.command_port)
+    parser.add_argument("--navdata-port", type=int, default=defaults.navdata_port)
+    parser.add_argument("--video-port", type=int, default=defaults.video_port)
+    parser.add_argument("--telnet-port", type=int, default=defaults.telnet_port)
+    parser.add_argument(
+        "--navdata-rate",
+        type=float,
+        default=defaults.navdata_rate,
+        help="navdata packets per second",
+    )
+    parser.add_argument("--video-fps", type=float, default=defaults.video_fps)
+    parser.add_argument(
+        "--loss", type=float, default=defaults.loss, help="UDP loss probability"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=defaults.latency, help="UDP delay (s)"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=defaults.jitter, help="UDP jitter (s)"
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--stats", type=float, default=5.0, help="period of the statistics (s)"
+    )
+    args = parser.parse_args(arguments)
+    logging.basicConfig(level=logging.INFO)
+
+    config = SimulatorConfig(
+        host=args.host,
+        command_port=args.command_port,
+        navdata_port=args.navdata_port,
+        video_port=args.video_port,
+        telnet_port=args.telnet_port,
+        navdata_rate=args.navdata_rate,
+        video_fps=args.video_fps,
+        loss=args.loss,
+        latency=args.latency,
+        jitter=args.jitter,
+        seed=args.seed,
+    )
+    with DroneSimulator(config) as simulator:
+        try:
+            while True:
+                time.sleep(args.stats)
+                _LOG.info("%s", simulator.metrics.snapshot()["counters"])
+        except KeyboardInterrupt:
+            _LOG.info("Stopping the simulator")
+
+
+if __name__ == "__main__":
+    main()
@@ -24,6 +24,7 @@ from dronevis.utils.general import library_ontro, gui_parse, init_logger
 from dronevis.drone_connect import DemoDrone, Drone
 from dronevis.abstract.base_drone import BaseDrone
 from dronevis.ui.drone_gui import DroneVisGui
+from dronevis.models.model_factory import ModelFactory
 
 
 _LOG = logging.getLogger(__name__)
@@ -34,6 +35,13 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
 
     args = gui_parse(argv)
     init_logger(level=args.logger_level)
+    memory_budget = args.model_memory_budget
+    ModelFactory.configure_cache(
+        max_cached_models=args.model_cache_size,
+        memory_budget=None if memory_budget is None else int(memory_budget * 1e6),
+    )
+    if args.prewarm:
+        ModelFactory.prewarm(args.prewarm)
 
     if args.drone == "demo":
         drone: BaseDrone = DemoDrone()
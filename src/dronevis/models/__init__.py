@@ -1,49 +1,73 @@
-"""Retrieve models imports for information hiding software priciple"""
-from dronevis.abstract.noop_model import NOOPModel
-from dronevis.models.faster_rcnn_torch import FasterRCNN
-from dronevis.models.face_detection import FaceDetectModel
-from dronevis.models.pose_mediapipe import PoseSegEstimation
-from dronevis.models.ssd_torch import SSD
-from dronevis.models.yolov5_torch import YOLOv5
-from dronevis.models.gesture_recognition import GestureRecognition
-from dronevis.models.yolov8 import (
-    YOLOv8Detection,
-    YOLOv8Segmentation,
-    YOLOv8Pose,
-    YOLOv8Faces,
-)
-from dronevis.models.depth_estimation import DepthEstimator
-from dronevis.models.action_recognition import ActionRecognizer
-from dronevis.models.croud_count import CrowdCounter
-from dronevis.models.road_segmentation import RoadSegmentation, LaneDetection
-from dronevis.models.haar_face_detection import HaarFaceDetection
-from dronevis.models.cnn_face_detection import CNNFaceDetection
-from dronevis.models.dnn_face_detection import DNNFaceDetection
-from dronevis.models.hog_face_detection import HOGFaceDetection
-
-
-models_list = {
-    "None": NOOPModel,
-    "SSD": SSD,
-    "Face": FaceDetectModel,
-    "YOLOv5": YOLOv5,
-    "Faster R-CNN": FasterRCNN,
-    "Pose": PoseSegEstimation,
-    "Segment": PoseSegEstimation,
-    "Pose+Segment": PoseSegEstimation,
-    "YOLOv8Detect": YOLOv8Detection,
-    "YOLOv8Pose": YOLOv8Pose,
-    "YOLOv8Segment": YOLOv8Segmentation,
-    "YOLOv8Track": YOLOv8Detection,
-    "YOLOv8Faces": YOLOv8Faces,
-    "ActionGoogle": ActionRecognizer,
-    "ActionFacebook": ActionRecognizer,
-    "ActionMCG": ActionRecognizer,
-    "DepthEstimator": DepthEstimator,
-    "RoadSegmentation": RoadSegmentation,
-    "LaneDetection": LaneDetection,
-    "HaarFaceDetector": HaarFaceDetection,
-    "HOGFaceDetector": HOGFaceDetection,
-    "CNNFaceDetector": CNNFaceDetection,
-    "DNNFaceDetector": DNNFaceDetection,
+"""Retrieve models imports for information hiding software priciple
+
+Models are registered by their import paths, and each model module is only
+imported when the model is created (or its class is accessed from this package).
+Hence, importing ``dronevis`` does not pay the import cost of torch, ultralytics,
+mediapipe, transformers or dlib.
+"""
+from typing import Any, Dict, List
+import importlib
+
+
+models_list: Dict[str, str] = {
+    "None": "dronevis.abstract.noop_model:NOOPModel",
+    "SSD": "dronevis.models.ssd_torch:SSD",
+    "Face": "dronevis.models.face_detection:FaceDetectModel",
+    "YOLOv5": "dronevis.models.yolov5_torch:YOLOv5",
+    "Faster R-CNN": "dronevis.models.faster_rcnn_torch:FasterRCNN",
+    "Pose": "dronevis.models.pose_mediapipe:PoseSegEstimation",
+    "Segment": "dronevis.models.pose_mediapipe:PoseSegEstimation",
+    "Pose+Segment": "dronevis.models.pose_mediapipe:PoseSegEstimation",
+    "YOLOv8Detect": "dronevis.models.yolov8:YOLOv8Detection",
+    "YOLOv8Pose": "dronevis.models.yolov8:YOLOv8Pose",
+    "YOLOv8Segment": "dronevis.models.yolov8:YOLOv8Segmentation",
+    "YOLOv8Track": "dronevis.models.yolov8:YOLOv8Detection",
+    "YOLOv8Faces": "dronevis.models.yolov8:YOLOv8Faces",
+    "ActionGoogle": "dronevis.models.action_recognition:ActionRecognizer",
+    "ActionFacebook": "dronevis.models.action_recognition:ActionRecognizer",
+    "ActionMCG": "dronevis.models.action_recognition:ActionRecognizer",
+    "DepthEstimator": "dronevis.models.depth_estimation:DepthEstimator",
+    "RoadSegmentation": "dronevis.models.road_segmentation:RoadSegmentation",
+    "LaneDetection": "dronevis.models.road_segmentation:LaneDetection",
+    "HaarFaceDetector": "dronevis.models.haar_face_detection:HaarFaceDetection",
+    "HOGFaceDetector": "dronevis.models.hog_face_detection:HOGFaceDetection",
+    "CNNFaceDetector": "dronevis.models.cnn_face_detection:CNNFaceDetection",
+    "DNNFaceDetector": "dronevis.models.dnn_face_detection:DNNFaceDetection",
 }
+
+_MODEL_CLASSES: Dict[str, str] = {
+    import_path.split(":")[1]: import_path for import_path in models_list.values()
+}
+_MODEL_CLASSES.update(
+    {
+        "GestureRecognition": "dronevis.models.gesture_recognition:GestureRecognition",
+        "CrowdCounter": "dronevis.models.croud_count:CrowdCounter",
+    }
+)
+
+
+def import_model_class(import_path: str) -> Any:
+    """Import a model class from its import path
+
+    Args:
+        import_path (str): Path formatted as ``"package.module:ClassName"``
+
+    Returns:
+        Any: Model class
+    """
+    module_name, class_name = import_path.split(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def __getattr__(name: str) -> Any:
+    """Import model classes on first access, e.g. ``from dronevis.models import SSD``"""
+    if name not in _MODEL_CLASSES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    model_class = import_model_class(_MODEL_CLASSES[name])
+    globals()[name] = model_class
+    return model_class
+
+
+def __dir__() -> List[str]:
+    """List the lazily imported model classes along with the module attributes"""
+    return sorted(list(globals()) + list(_MODEL_CLASSES))
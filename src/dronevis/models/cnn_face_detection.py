@@ -7,7 +7,7 @@ import dlib
 import cv2
 import numpy as np
 
-from dronevis.abstract import CVModel
+from dronevis.abstract import CVModel, Detections
 from dronevis.config.general import MODELS_URLS
 from dronevis.utils.general import download_file, write_fps
 
@@ -45,25 +45,40 @@ class CNNFaceDetection(CVModel):
         Returns:
             np.ndarray: Image withe face annotations
         """
+        return self.render(image, self.detect(image))
+
+    def detect(self, image: np.ndarray) -> Detections:
+        """Run model inference on the image without drawing the faces
+
+        Args:
+            image (np.ndarray): Input image
+
+        Returns:
+            Detections: Face boxes along with their detection confidences
+        """
         if self.net is None:
             _LOG.error("Model is not loaded. Loading default model...")
             self.load_model()
             assert self.net, "Model could not be loaded"
 
         processed_image = self.transform_img(image)
-        green_color = (0, 255, 0)
-        thickness = 2
         bboxes = self.net(processed_image, 0)
-        for bbox in bboxes:
-            cv2.rectangle(
-                image,
-                (bbox.rect.left(), bbox.rect.top()),
-                (bbox.rect.right(), bbox.rect.bottom()),
-                green_color,
-                thickness,
-            )
-
-        return image
+        return Detections(
+            boxes=np.array(
+                [
+                    [
+                        bbox.rect.left(),
+                        bbox.rect.top(),
+                        bbox.rect.right(),
+                        bbox.rect.bottom(),
+                    ]
+                    for bbox in bboxes
+                ],
+                dtype=np.float32,
+            ).reshape(-1, 4),
+            scores=np.array([bbox.confidence for bbox in bboxes], dtype=np.float32),
+            class_ids=np.zeros(len(bboxes), dtype=np.int64),
+        )
 
     def detect_webcam(
         self,
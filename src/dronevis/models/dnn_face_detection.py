@@ -6,7 +6,7 @@ import time
 import cv2
 import numpy as np
 
-from dronevis.abstract import CVModel
+from dronevis.abstract import CVModel, Detections
 from dronevis.utils.general import download_file, write_fps
 from dronevis.config.general import MODELS_URLS
 
@@ -74,6 +74,17 @@ class DNNFaceDetection(CVModel):
         Returns:
             np.ndarray: Predicted image
         """
+        return self.render(image, self.detect(image))
+
+    def detect(self, image: np.ndarray) -> Detections:
+        """Run model inference on the image without drawing the faces
+
+        Args:
+            image (np.ndarray): Image to predict on
+
+        Returns:
+            Detections: Face boxes with confidence above the model confidence
+        """
         if self.net is None:
             _LOG.warning("Model not loaded. Loading model weights...")
             self.load_model()
@@ -90,24 +101,15 @@ class DNNFaceDetection(CVModel):
         )
 
         self.net.setInput(blob)
-        detections = self.net.forward()
-
-        green_color = (0, 255, 0)
-        thickness = 2
-
-        for i in range(detections.shape[2]):
-            confidence = detections[0, 0, i, 2]
-            if confidence > 0.5:
-                x1_cor = int(detections[0, 0, i, 3] * image.shape[1])
-                y1_cor = int(detections[0, 0, i, 4] * image.shape[0])
-                x2_cor = int(detections[0, 0, i, 5] * image.shape[1])
-                y2_cor = int(detections[0, 0, i, 6] * image.shape[0])
-
-                cv2.rectangle(
-                    image, (x1_cor, y1_cor), (x2_cor, y2_cor), green_color, thickness
-                )
-
-        return image
+        outputs = self.net.forward()[0, 0]
+        outputs = outputs[outputs[:, 2] > self.confidence]
+        height, width = image.shape[:2]
+        boxes = outputs[:, 3:7] * np.array([width, height, width, height])
+        return Detections(
+            boxes=boxes.astype(np.int32).astype(np.float32),
+            scores=outputs[:, 2].astype(np.float32),
+            class_ids=np.zeros(len(outputs), dtype=np.int64),
+        )
 
     def detect_webcam(
         self,
@@ -6,7 +6,7 @@ import cv2
 import mediapipe as mp
 import numpy as np
 
-from dronevis.abstract import CVModel
+from dronevis.abstract import CVModel, Detections
 from dronevis.utils.general import write_fps
 
 
@@ -56,6 +56,39 @@ class FaceDetectModel(CVModel):
 
         return image
 
+    def detect(self, image: np.ndarray) -> Detections:
+        """Run model inference on input image without drawing the faces
+
+        Args:
+            image (np.ndarray): input image (assumed to be non-transformed)
+
+        Returns:
+            Detections: face boxes, scores and the six face keypoints
+            (eyes, nose tip, mouth, and ear tragions)
+        """
+        height, width = image.shape[:2]
+        results = self.face_detection.process(image)
+        faces = results.detections or []
+        boxes = np.zeros((len(faces), 4), dtype=np.float32)
+        keypoints = np.zeros((len(faces), 6, 2), dtype=np.float32)
+        for i, face in enumerate(faces):
+            location = face.location_data
+            bbox = location.relative_bounding_box
+            boxes[i] = [
+                bbox.xmin,
+                bbox.ymin,
+                bbox.xmin + bbox.width,
+                bbox.ymin + bbox.height,
+            ]
+            keypoints[i] = [(point.x, point.y) for point in location.relative_keypoints]
+        scale = np.array([width, height], dtype=np.float32)
+        return Detections(
+            boxes=boxes * np.tile(scale, 2),
+            scores=np.array([face.score[0] for face in faces], dtype=np.float32),
+            class_ids=np.zeros(len(faces), dtype=np.int64),
+            keypoints=keypoints * scale,
+        )
+
     def detect_webcam(
         self,
         video_index: Union[int, str] = 0,
@@ -6,7 +6,7 @@ import time
 import cv2
 import numpy as np
 
-from dronevis.abstract import CVModel
+from dronevis.abstract import CVModel, Detections
 from dronevis.utils.general import write_fps
 
 _LOG = logging.getLogger(__name__)
@@ -49,14 +49,15 @@ class HaarFaceDetection(CVModel):
         img_grey = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
         return img_grey
 
-    def predict(self, image: np.ndarray) -> np.ndarray:
-        """Run model inference on the image
+    def detect(self, image: np.ndarray) -> Detections:
+        """Run model inference on the image without drawing the faces.
+        Haar cascades do not score their detections, hence all scores are ones.
 
         Args:
             image (np.ndarray): Input image
 
         Returns:
-            np.ndarray: Image withe face annotations
+            Detections: Face boxes
         """
         if self.net is None:
             _LOG.info("Model not loaded. Loading default model")
@@ -71,16 +72,24 @@ class HaarFaceDetection(CVModel):
             minSize=self.min_size,
         )
 
-        for x_cor, y_cor, width, height in faces:
-            cv2.rectangle(
-                image,
-                pt1=(x_cor, y_cor),
-                pt2=(x_cor + width, y_cor + height),
-                color=(0, 255, 0),
-                thickness=2,
-            )
+        boxes = np.asarray(faces, dtype=np.float32).reshape(-1, 4)
+        boxes[:, 2:] += boxes[:, :2]
+        return Detections(
+            boxes=boxes,
+            scores=np.ones(len(boxes), dtype=np.float32),
+            class_ids=np.zeros(len(boxes), dtype=np.int64),
+        )
+
+    def predict(self, image: np.ndarray) -> np.ndarray:
+        """Run model inference on the image
 
-        return image
+        Args:
+            image (np.ndarray): Input image
+
+        Returns:
+            np.ndarray: Image withe face annotations
+        """
+        return self.render(image, self.detect(image))
 
     def detect_webcam(self, video_index: Union[int, str] = 0, window_name="Haar Face"):
         cap = cv2.VideoCapture(video_index)
@@ -7,7 +7,7 @@ import dlib
 import numpy as np
 import cv2
 
-from dronevis.abstract import CVModel
+from dronevis.abstract import CVModel, Detections
 from dronevis.utils.general import write_fps
 
 _LOG = logging.getLogger(__name__)
@@ -28,33 +28,43 @@ class HOGFaceDetection(CVModel):
         """Run image transformation"""
         return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
 
-    def predict(self, image: np.ndarray) -> np.ndarray:
-        """Run model inference on the image
+    def detect(self, image: np.ndarray) -> Detections:
+        """Run model inference on the image without drawing the faces
 
         Args:
             image (np.ndarray): Input image
 
         Returns:
-            np.ndarray: Image withe face annotations
+            Detections: Face boxes along with their detection scores
         """
         if self.net is None:
             _LOG.warning("Model is not loaded. Loading default model...")
             self.load_model()
             assert self.net, "Model could not be loaded"
 
-        green_color = (0, 255, 0)
-        thickness = 2
-        bboxes = self.net(image, 0)
-        for bbox in bboxes:
-            cv2.rectangle(
-                image,
-                (bbox.left(), bbox.top()),
-                (bbox.right(), bbox.bottom()),
-                green_color,
-                thickness,
-            )
-
-        return image
+        bboxes, scores, _ = self.net.run(image, 0)
+        return Detections(
+            boxes=np.array(
+                [
+                    [bbox.left(), bbox.top(), bbox.right(), bbox.bottom()]
+                    for bbox in bboxes
+                ],
+                dtype=np.float32,
+            ).reshape(-1, 4),
+            scores=np.asarray(scores, dtype=np.float32),
+            class_ids=np.zeros(len(bboxes), dtype=np.int64),
+        )
+
+    def predict(self, image: np.ndarray) -> np.ndarray:
+        """Run model inference on the image
+
+        Args:
+            image (np.ndarray): Input image
+
+        Returns:
+            np.ndarray: Image withe face annotations
+        """
+        return self.render(image, self.detect(image))
 
     def detect_webcam(
         self, video_index: Tuple[int, str] = 0, window_name="HOG Face Detection"
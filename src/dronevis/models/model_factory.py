@@ -1,19 +1,208 @@
 """Model Factory Implementation"""
-from dronevis.models import models_list
+from typing import Any, Dict, List, Optional, Sequence
+from collections import OrderedDict
+import threading
+import logging
+
+from dronevis.models import models_list, import_model_class
+
+_LOG = logging.getLogger(__name__)
+
+
+def model_memory(model: Any) -> int:
+    """Estimate the memory held by the weights of a model instance
+
+    Every attribute of the model exposing ``parameters`` (e.g. ``torch.nn.Module``)
+    is counted along with its buffers. Models without any are estimated as zero.
+
+    Args:
+        model (Any): Loaded model instance
+
+    Returns:
+        int: Estimated size in bytes
+    """
+    total_bytes = 0
+    for attribute in vars(model).values():
+        if not callable(getattr(attribute, "parameters", None)):
+            continue
+        tensors = list(attribute.parameters())
+        if callable(getattr(attribute, "buffers", None)):
+            tensors += list(attribute.buffers())
+        total_bytes += sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+    return total_bytes
 
 
-# pylint: disable=too-few-public-methods
 class ModelFactory:
-    """Factory class for creating models"""
+    """Factory class for creating models
+
+    Models are looked up by name in ``models_list``, which maps each name to
+    the import path of its class. The model module is only imported on creation.
+
+    Loaded models are kept in an LRU cache, hence switching back to a recent model
+    does not reload its weights. The cache holds at most ``max_cached_models``
+    models, and least recently used models are evicted once the estimated size
+    of the cached weights exceeds ``memory_budget`` bytes (if set).
+    """
 
     models_list = models_list
+    max_cached_models = 4
+    memory_budget: Optional[int] = None
+
+    _cache: "OrderedDict[str, Any]" = OrderedDict()
+    _cache_sizes: Dict[str, int] = {}
+    _loading_locks: Dict[str, threading.Lock] = {}
+    _cache_lock = threading.Lock()
 
     @staticmethod
-    def create_model(model_name: str):
-        """Get model from model name"""
+    def get_model_class(model_name: str):
+        """Import model class from model name"""
         if model_name not in models_list:
             raise ValueError(f"Model {model_name} is not supported")
-        model_class = models_list[model_name]
+        return import_model_class(models_list[model_name])
+
+    @classmethod
+    def create_model(cls, model_name: str, use_cache: bool = True):
+        """Get model from model name
+
+        Args:
+            model_name (str): Name of the model in ``models_list``
+            use_cache (bool, optional): Whether to reuse (and keep) a loaded instance
+            from the model cache. Defaults to True.
+        """
+        if not use_cache or cls.max_cached_models == 0:
+            return cls._load_model(model_name)
+
+        with cls._cache_lock:
+            if model_name not in models_list:
+                raise ValueError(f"Model {model_name} is not supported")
+            loading_lock = cls._loading_locks.setdefault(model_name, threading.Lock())
+
+        # Loading is serialized per model, so a model being prewarmed is
+        # awaited instead of being loaded twice
+        with loading_lock:
+            with cls._cache_lock:
+                if model_name in cls._cache:
+                    cls._cache.move_to_end(model_name)
+                    _LOG.debug("Model %s retrieved from cache", model_name)
+                    return cls._cache[model_name]
+
+            model = cls._load_model(model_name)
+            size = model_memory(model)
+            with cls._cache_lock:
+                cls._cache[model_name] = model
+                cls._cache_sizes[model_name] = size
+                cls._evict()
+            return model
+
+    @classmethod
+    def prewarm(
+        cls,
+        model_names: Sequence[str],
+        background: bool = True,
+    ) -> Optional[threading.Thread]:
+        """Load models into the cache ahead of time
+
+        Args:
+            model_names (Sequence[str]): Names of models to load in order
+            background (bool, optional): Whether to load the models in a daemon thread.
+            Defaults to True.
+
+        Returns:
+            Optional[threading.Thread]: The loading thread, if run in the background
+        """
+        for model_name in model_names:
+            if model_name not in models_list:
+                raise ValueError(f"Model {model_name} is not supported")
+
+        def load_models() -> None:
+            for model_name in model_names:
+                try:
+                    cls.create_model(model_name)
+                # pylint: disable=broad-exception-caught
+                except Exception as error:
+                    _LOG.error("Could not prewarm model %s: %s", model_name, error)
+                else:
+                    _LOG.info("Prewarmed model %s", model_name)
+
+        if not background:
+            load_models()
+            return None
+
+        thread = threading.Thread(target=load_models, name="ModelPrewarm", daemon=True)
+        thread.start()
+        return thread
+
+    @classmethod
+    def configure_cache(
+        cls,
+        max_cached_models: Optional[int] = None,
+        memory_budget: Optional[int] = None,
+    ) -> None:
+        """Set the model cache limits, and evict models exceeding them
+
+        Args:
+            max_cached_models (Optional[int], optional): Max number of cached models.
+            Defaults to None (unchanged).
+            memory_budget (Optional[int], optional): Max estimated bytes of cached
+            weights. Defaults to None (unchanged).
+        """
+        if max_cached_models is not None:
+            if max_cached_models < 0:
+                raise ValueError("Max cached models must be a non-negative integer")
+            cls.max_cached_models = max_cached_models
+
+        if memory_budget is not None:
+            if memory_budget < 0:
+                raise ValueError("Memory budget must be a non-negative number of bytes")
+            cls.memory_budget = memory_budget
+
+        with cls._cache_lock:
+            cls._evict(keep_latest=False)
+
+    @classmethod
+    def cached_models(cls) -> List[str]:
+        """Names of the cached models from least to most recently used"""
+        with cls._cache_lock:
+            return list(cls._cache)
+
+    @classmethod
+    def cache_memory(cls) -> int:
+        """Estimated bytes held by the weights of the cached models"""
+        with cls._cache_lock:
+            return sum(cls._cache_sizes.values())
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Drop all cached models"""
+        with cls._cache_lock:
+            cls._cache.clear()
+            cls._cache_sizes.clear()
+
+    @classmethod
+    def _evict(cls, keep_latest: bool = True) -> None:
+        """Drop least recently used models until the cache is within its limits.
+        Must be called while holding the cache lock.
+
+        Args:
+            keep_latest (bool, optional): Whether to keep the most recently used model
+            even if it exceeds the limits on its own. Defaults to True.
+        """
+        min_models = 1 if keep_latest else 0
+        while len(cls._cache) > min_models and (
+            len(cls._cache) > cls.max_cached_models
+            or (
+                cls.memory_budget is not None
+                and sum(cls._cache_sizes.values()) > cls.memory_budget
+            )
+        ):
+            model_name, _ = cls._cache.popitem(last=False)
+            cls._cache_sizes.pop(model_name)
+            _LOG.info("Model %s evicted from cache", model_name)
+
+    @classmethod
+    def _load_model(cls, model_name: str):
+        """Construct model from model name and load its weights"""
+        model_class = cls.get_model_class(model_name)
         if model_name == "Segment":
             model = model_class(is_seg=True)  # type: ignore
 
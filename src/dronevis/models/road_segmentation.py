@@ -1,5 +1,6 @@
 """Implementation of road segmentation and lane detection models"""
 from typing import Optional
+from abc import abstractmethod
 import time
 import zipfile
 import os
@@ -9,6 +10,7 @@ import numpy as np
 import cv2
 
 from dronevis.abstract.abstract_model import CVModel
+from dronevis.abstract.detections import Detections
 from dronevis.utils.general import device, write_fps, download_file
 from dronevis.config.general import MODELS_URLS
 
@@ -115,46 +117,131 @@ class YOLOP(CVModel):
         image_arr = image.detach().cpu().squeeze(0).permute(1, 2, 0).numpy()
         return image_arr[:, :, 0]
 
+    @abstractmethod
+    def segment(self, image: np.ndarray, threshold: float) -> np.ndarray:
+        """Run inference and get the segmentation mask at the model size
+
+        Args:
+            image (np.ndarray): Source image
+            threshold (float): Threshold for the segmentation
+
+        Returns:
+            np.ndarray: Boolean mask of shape (size, size)
+        """
+
+    @abstractmethod
+    def overlay(self, image: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """Color the segmented pixels of an image (in-place)
+
+        Args:
+            image (np.ndarray): Image to draw on
+            mask (np.ndarray): Boolean mask with the same size as the image
+
+        Returns:
+            np.ndarray: Same image with the segmentation drawn
+        """
+
+    def detect_mask(self, image: np.ndarray, threshold: float) -> Detections:
+        """Run inference and get the segmentation as a single detection with
+        a mask of the same size as the source image
+
+        Args:
+            image (np.ndarray): Source image
+            threshold (float): Threshold for the segmentation
+
+        Returns:
+            Detections: Segmentation mask and the box around it, or no detections
+            if nothing is segmented
+        """
+        height, width = image.shape[:2]
+        mask = self.segment(image, threshold).astype(np.uint8)
+        mask = cv2.resize(mask, (width, height), interpolation=cv2.INTER_NEAREST)
+        rows, cols = np.nonzero(mask)
+        if not len(rows):
+            return Detections(masks=np.zeros((0, height, width), dtype=bool))
+        return Detections(
+            boxes=np.array(
+                [[cols.min(), rows.min(), cols.max(), rows.max()]], dtype=np.float32
+            ),
+            scores=np.ones(1, dtype=np.float32),
+            class_ids=np.zeros(1, dtype=np.int64),
+            masks=mask[None].astype(bool),
+        )
+
+    def render(self, image: np.ndarray, detections: Detections) -> np.ndarray:
+        """Draw the segmentation returned by ``detect`` on the image (in-place)"""
+        if detections.masks is not None:
+            for mask in detections.masks:
+                self.overlay(image, mask)
+        return image
+
 
 class RoadSegmentation(YOLOP):
     """Implementation of road segmentation model"""
 
-    def predict(self, image: np.ndarray, threshold: float = 0.7) -> np.ndarray:
-        """Run inference for road segmentation
+    def segment(self, image: np.ndarray, threshold: float = 0.7) -> np.ndarray:
+        """Run inference and get the road mask at the model size
 
         Args:
-            image (ndarray): Source image
+            image (np.ndarray): Source image
             threshold (float, optional): Threshold for road segmentation. Defaults to 0.7.
 
         Returns:
-            ndarray: Road segmentation
+            np.ndarray: Boolean road mask of shape (size, size)
         """
         if self.net is None:
             self.load_model()
             assert self.net, "Model not loaded properly"
 
-        color_overlay_increase = 80
         image_tensor = self.transform_img(image)
         _, segmentation, _ = self.net(image_tensor)
-        pred_img = self.postprocess(segmentation)
-        image = cv2.resize(image, (self.size, self.size))
-        mask = pred_img < threshold
+        return self.postprocess(segmentation) < threshold
+
+    def overlay(self, image: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """Brighten the green channel of road pixels (in-place)"""
+        color_overlay_increase = 80
         image[:, :, 1][mask] += color_overlay_increase
         return image
 
+    def detect(self, image: np.ndarray, threshold: float = 0.7) -> Detections:
+        """Run inference for road segmentation without drawing it
+
+        Args:
+            image (ndarray): Source image
+            threshold (float, optional): Threshold for road segmentation. Defaults to 0.7.
+
+        Returns:
+            Detections: Road mask
+        """
+        return self.detect_mask(image, threshold)
+
+    def predict(self, image: np.ndarray, threshold: float = 0.7) -> np.ndarray:
+        """Run inference for road segmentation
+
+        Args:
+            image (ndarray): Source image
+            threshold (float, optional): Threshold for road segmentation. Defaults to 0.7.
+
+        Returns:
+            ndarray: Road segmentation
+        """
+        mask = self.segment(image, threshold)
+        image = cv2.resize(image, (self.size, self.size))
+        return self.overlay(image, mask)
+
 
 class LaneDetection(YOLOP):
     """Implementation of lane detection model"""
 
-    def predict(self, image: np.ndarray, threshold: float = 0.6) -> np.ndarray:
-        """Run inference for lane detection
+    def segment(self, image: np.ndarray, threshold: float = 0.6) -> np.ndarray:
+        """Run inference and get the lane mask at the model size
 
         Args:
-            image (ndarray): Source image
+            image (np.ndarray): Source image
             threshold (float, optional): Threshold for lane detection. Defaults to 0.6.
 
         Returns:
-            ndarray: Lane detection
+            np.ndarray: Boolean lane mask of shape (size, size)
         """
         if self.net is None:
             self.load_model()
@@ -162,10 +249,37 @@ class LaneDetection(YOLOP):
 
         image_tensor = self.transform_img(image)
         _, _, lane_detection = self.net(image_tensor)
-        pred_img = self.postprocess(lane_detection)
-        image = cv2.resize(image, (self.size, self.size))
-        mask = pred_img < threshold
+        return self.postprocess(lane_detection) < threshold
+
+    def overlay(self, image: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """Paint lane pixels in green (in-place)"""
         image[:, :, 0][mask] = 0
         image[:, :, 1][mask] = 255
         image[:, :, 2][mask] = 0
         return image
+
+    def detect(self, image: np.ndarray, threshold: float = 0.6) -> Detections:
+        """Run inference for lane detection without drawing it
+
+        Args:
+            image (ndarray): Source image
+            threshold (float, optional): Threshold for lane detection. Defaults to 0.6.
+
+        Returns:
+            Detections: Lanes mask
+        """
+        return self.detect_mask(image, threshold)
+
+    def predict(self, image: np.ndarray, threshold: float = 0.6) -> np.ndarray:
+        """Run inference for lane detection
+
+        Args:
+            image (ndarray): Source image
+            threshold (float, optional): Threshold for lane detection. Defaults to 0.6.
+
+        Returns:
+            ndarray: Lane detection
+        """
+        mask = self.segment(image, threshold)
+        image = cv2.resize(image, (self.size, self.size))
+        return self.overlay(image, mask)
@@ -1,5 +1,5 @@
 """Implementation of CVModel for YOLOv5 used for object detection"""
-from typing import Union
+from typing import List, Optional, Union
 import time
 import logging
 import torch
@@ -7,7 +7,8 @@ import cv2
 import numpy as np
 
 from dronevis.utils.general import write_fps
-from dronevis.abstract import CVModel
+from dronevis.abstract import CVModel, Detections
+from dronevis.utils.drawing import draw_detections
 
 _LOG = logging.getLogger(__name__)
 
@@ -61,6 +62,40 @@ class YOLOv5(CVModel):
             assert self.net
         return self.net(image).render()[0]
 
+    def detect(self, image: np.ndarray) -> Detections:
+        """Run model inference on input image without rendering the detections
+
+        Args:
+            image (np.ndarray): input image
+
+        Returns:
+            Detections: bounding boxes, confidence scores and class ids
+        """
+        if self.net is None:
+            _LOG.warning("Model not loaded. Loading default model...")
+            self.load_model()
+            assert self.net
+        predictions = self.net(image).xyxy[0].cpu().numpy()
+        return Detections(
+            boxes=predictions[:, :4].astype(np.float32),
+            scores=predictions[:, 4].astype(np.float32),
+            class_ids=predictions[:, 5].astype(np.int64),
+        )
+
+    @property
+    def class_names(self) -> Optional[List[str]]:
+        """Class names of the loaded model indexed by class ids"""
+        if self.net is None:
+            return None
+        names = self.net.names
+        if isinstance(names, dict):
+            names = [names[i] for i in sorted(names)]
+        return names
+
+    def render(self, image: np.ndarray, detections: Detections) -> np.ndarray:
+        """Draw detections along with their class names on the image (in-place)"""
+        return draw_detections(image, detections, class_names=self.class_names)
+
     def detect_webcam(
         self,
         video_index: Union[str, int] = 0,
@@ -1,5 +1,5 @@
 """Yolov8 model implementation"""
-from typing import Optional, Union
+from typing import List, Optional, Union
 import logging
 import time
 from abc import abstractmethod
@@ -9,6 +9,8 @@ from ultralytics import YOLO
 import cv2
 
 from dronevis.abstract.abstract_model import CVModel
+from dronevis.abstract.detections import Detections
+from dronevis.utils.drawing import draw_detections
 from dronevis.utils.general import write_fps, download_file
 from dronevis.config.general import MODELS_URLS
 
@@ -57,6 +59,57 @@ class YOLOv8(CVModel):
         Returns:
             np.ndarray: Predicted image with bounding boxes drawn.
         """
+        result = self._infer(image, confidence, track)
+        return result.plot(conf=self.show_conf, labels=self.show_labels)
+
+    def detect(
+        self,
+        image: np.ndarray,
+        confidence: float = 0.5,
+        track: bool = False,
+    ) -> Detections:
+        """Run model inference on the provided image without rendering the results
+
+        Args:
+            image (np.ndarray): Input image for inference
+            confidence (float, optional): Confidence score representing what is threshold to
+            be considered for detection. Defaults to 0.5.
+            track (bool, optional): Whether to track the objects or not. Defaults to False.
+
+        Returns:
+            Detections: Bounding boxes, scores and class ids, along with the masks
+            for segmentation models and the keypoints for pose models.
+        """
+        result = self._infer(image, confidence, track)
+        detections = Detections(
+            boxes=result.boxes.xyxy.cpu().numpy().astype(np.float32),
+            scores=result.boxes.conf.cpu().numpy().astype(np.float32),
+            class_ids=result.boxes.cls.cpu().numpy().astype(np.int64),
+        )
+        if result.masks is not None:
+            height, width = image.shape[:2]
+            masks = np.zeros((len(result.masks.xy), height, width), dtype=np.uint8)
+            for mask, polygon in zip(masks, result.masks.xy):
+                cv2.fillPoly(mask, [polygon.astype(np.int32)], 1)
+            detections.masks = masks.astype(bool)
+        if result.keypoints is not None:
+            detections.keypoints = result.keypoints.data.cpu().numpy()
+        return detections
+
+    @property
+    def class_names(self) -> Optional[List[str]]:
+        """Class names of the loaded model indexed by class ids"""
+        if self.net is None:
+            return None
+        return [self.net.names[i] for i in sorted(self.net.names)]
+
+    def render(self, image: np.ndarray, detections: Detections) -> np.ndarray:
+        """Draw detections on the image (in-place)"""
+        names = self.class_names if self.show_labels else None
+        return draw_detections(image, detections, class_names=names)
+
+    def _infer(self, image: np.ndarray, confidence: float, track: bool):
+        """Run (or track with) the model on a single image and get its results"""
         if self.net is None:
             _LOG.warning("Model is not loaded. Loading default model...")
             self.load_model()
@@ -74,7 +127,7 @@ class YOLOv8(CVModel):
                 stream=False,
                 conf=confidence,
             )
-        return results[0].plot(conf=self.show_conf, labels=self.show_labels)
+        return results[0]
 
     def detect_webcam(
         self,
@@ -11,7 +11,7 @@ from rich import print as rprint
 
 from dronevis import __version__
 from dronevis.abstract.base_drone import BaseDrone
-
+from dronevis.models import models_list
 
 _LOG = logging.getLogger(__name__)
 
@@ -43,8 +43,9 @@ class DroneCli:
             "--mode",
             type=str,
             default="cli",
-            choices=["cli", "test"],
-            help="whether to run full CLI or just run a simple drone test",
+            choices=["cli", "test", "headless"],
+            help="whether to run full CLI, just run a simple drone test, or run a model"
+            + " on a video source without any display",
         )
         parser.add_argument(
             "--drone",
@@ -62,7 +63,58 @@ class DroneCli:
             help="Level for logger",
         )
 
+        headless = parser.add_argument_group("headless mode")
+        headless.add_argument(
+            "--model",
+            type=str,
+            default="None",
+            choices=list(models_list),
+            help="model to run on the video source",
+        )
+        headless.add_argument(
+            "--source",
+            type=str,
+            help="camera index, video file, or stream URL",
+        )
+        headless.add_argument(
+            "--jsonl",
+            type=str,
+            help="path of a JSON lines log of detections",
+        )
+        headless.add_argument(
+            "--video-out",
+            dest="video_out",
+            type=str,
+            help="path of an encoded video of the rendered frames",
+        )
+        headless.add_argument(
+            "--metrics-port",
+            dest="metrics_port",
+            type=int,
+            help="port of an HTTP endpoint serving metrics on /metrics",
+        )
+        headless.add_argument(
+            "--realtime",
+            action="store_true",
+            help="pace video files by their frame rate instead of running at full speed",
+        )
+        headless.add_argument(
+            "--batch-size",
+            dest="batch_size",
+            type=int,
+            default=1,
+            help="max frames per inference for models supporting batches",
+        )
+        headless.add_argument(
+            "--max-frames",
+            dest="max_frames",
+            type=int,
+            help="stop after processing this number of frames",
+        )
+
         args = parser.parse_args(arguments)
+        if args.mode == "headless" and args.source is None:
+            parser.error("--source is required in headless mode")
         return args
 
     def print_available_control(self) -> None:
@@ -1,5 +1,5 @@
 """GUI implmentation"""
-from typing import Optional, List
+from typing import Any, NamedTuple, Optional, Tuple
 
 from tkinter import Tk, StringVar, HORIZONTAL, LEFT
 from tkinter.ttk import Style, Frame, Label, Progressbar, OptionMenu
@@ -11,34 +11,43 @@ import cv2
 import numpy as np
 from PIL import Image, ImageTk
 
+from dronevis import models
 from dronevis.models import models_list
 from dronevis.drone_connect import DemoDrone
+from dronevis.drone_connect.navdata_history import NavdataHistory
 from dronevis.abstract.base_drone import BaseDrone
-from dronevis.utils.general import axis_config
 from dronevis.config import gui as cfg
+from dronevis.utils.auxiliary import AuxiliaryModelRunner
+from dronevis.utils.mailbox import Mailbox
 from dronevis.ui.gui_components import (
+    AltitudePlot,
     ImageBWButton,
     MainButton,
     DataFrame,
     ToggleButton,
 )
 from dronevis.ui.gesture_recognition_thread import GestureThread
-from dronevis.models import CrowdCounter
 
 _LOG = logging.getLogger(__name__)
-CROWD_TOCKS = 5
+
+
+class CrowdCount(NamedTuple):
+    """Result of the crowd counter"""
+
+    count: int
+    density_map: np.ndarray
 
 
 @dataclass
 class GUIOpt:
     """GUI attributes"""
 
-    axis: Optional[plt.Axes] = None
-    navdata: Optional[dict] = None
+    history: NavdataHistory = field(default_factory=NavdataHistory)
+    plot: Optional[AltitudePlot] = None
     plot_job: Optional[str] = None
-    data: List[int] = field(default_factory=lambda: [0])
-    index: List[float] = field(default_factory=lambda: [0.0])
-    scatter: Optional[FigureCanvasTkAgg] = None
+    feed: Mailbox[np.ndarray] = field(default_factory=Mailbox)
+    feed_image: Optional[ImageTk.PhotoImage] = None
+    display_job: Optional[str] = None
 
 
 @dataclass
@@ -59,8 +68,6 @@ class GUIFrames:
 class DroneVisGui:
     """Implementation for the library GUI using Tkinter"""
 
-    mid_point = int((cfg.GUI_X_LIMIT / cfg.INDEX_STEP) // 2)
-
     def __init__(
         self,
         drone: Optional[BaseDrone] = None,
@@ -104,67 +111,51 @@ class DroneVisGui:
         self.init_frames()
         self.connect_key_passes()
         self.gesture_thread: Optional[GestureThread] = None
-        self.is_crowdcount = False
-        self.crowd_model = CrowdCounter()
-        self.crowd_tick = 0
+        self.crowd_runner: AuxiliaryModelRunner[CrowdCount] = AuxiliaryModelRunner(
+            load_crowd_counter, count_crowd, cfg.CROWD_COUNT_RATE, name="crowd"
+        )
         _LOG.debug("Main frames initialized")
 
     def handle_navdata(self) -> None:
-        """Handle incomming navdata and convert them to suitable format"""
-        if self.opt.navdata is None:
+        """Show the latest navdata in a suitable format"""
+        history = self.opt.history
+        if not history or np.isnan(history.latest_value("battery_percentage")):
             return
 
-        navdata = self.opt.navdata
-
         # Battery comes in percentage format
-        battery_percentage = int(navdata["navdata_demo"]["battery_percentage"])
+        battery_percentage = int(history.latest_value("battery_percentage"))
         self.frms.pb_battery["value"] = battery_percentage
         self.lbl_battery_percentage["text"] = f"{battery_percentage}%"
 
         # Velocity comes in mm/s format
-        vel_x = navdata["navdata_demo"]["vx"] * cfg.MILLI_TO_METER_FACTOR
+        vel_x = history.latest_value("vx") * cfg.MILLI_TO_METER_FACTOR
         vx_text = f"{abs(vel_x):0.2f} m\\s"
         self.frms.frm_nav_vx.cpb.change(to_angle(abs(vel_x), cfg.MAX_VELOCITY), vx_text)
 
-        vel_y = navdata["navdata_demo"]["vy"] * cfg.MILLI_TO_METER_FACTOR
+        vel_y = history.latest_value("vy") * cfg.MILLI_TO_METER_FACTOR
         vy_text = f"{abs(vel_y):0.2f} m\\s"
         self.frms.frm_nav_vy.cpb.change(to_angle(abs(vel_y), cfg.MAX_VELOCITY), vy_text)
 
-        vel_z = navdata["navdata_demo"]["vz"] * cfg.MILLI_TO_METER_FACTOR
+        vel_z = history.latest_value("vz") * cfg.MILLI_TO_METER_FACTOR
         vz_text = f"{abs(vel_z):0.2f} m\\s"
         self.frms.frm_nav_vz.cpb.change(to_angle(abs(vel_z), cfg.MAX_VELOCITY), vz_text)
 
-        # Elevation comes in mm format
-        elevation = int(navdata["navdata_demo"]["altitude"] * cfg.MILLI_TO_METER_FACTOR)
-        self.opt.data.append(elevation)
-        last_index = self.opt.index[-1]
-        self.opt.index.append(last_index + cfg.INDEX_STEP)
-
     def on_plot(self) -> None:
         """Handles heights points and graph them"""
 
-        # Convert incoming navdata to suitable format
-        self.handle_navdata()
-
-        # Initialize axis if not exist
-        if self.opt.axis is None or self.opt.scatter is None:
+        # Initialize the graph if not exist
+        if self.opt.plot is None:
             # Initialize a figure instance
             figure3 = plt.figure(figsize=(5, 4), dpi=90)
 
             # Set background color to MAIN COLOR
             figure3.set_facecolor(cfg.MAIN_COLOR)
 
-            # Create a subplot instance stored in self.axis
-            self.opt.axis = figure3.add_subplot(111)
-
-            # Plot data on created axis
-            self.opt.axis.plot(self.opt.index, self.opt.data, color="g", linewidth=2)
-
-            # Create a tkinter widget with axis object
-            self.opt.scatter = FigureCanvasTkAgg(figure3, self.frm_nav_h)
+            # Create a tkinter widget with the figure
+            scatter = FigureCanvasTkAgg(figure3, self.frm_nav_h)
 
             # Place the plotting-tkiner widget
-            self.opt.scatter.get_tk_widget().grid(
+            scatter.get_tk_widget().grid(
                 row=0,
                 column=0,
                 sticky="nsew",
@@ -172,24 +163,12 @@ class DroneVisGui:
                 padx=5,
             )
 
-            # Set configurations for the axis
-            axis_config(self.opt.axis)
-
-        else:
-            # if number of points exceeded the width of the graph
-            if len(self.opt.index) > self.mid_point * 2:
-                # shifting data to left
-                first_point = self.opt.index[self.mid_point]
-                self.opt.index = self.opt.index[self.mid_point :]
-                self.opt.index = [i - first_point for i in self.opt.index]
-                self.opt.data = self.opt.data[self.mid_point :]
-                self.opt.axis.clear()
-                self.opt.scatter.draw()
-
-            # plot updated data and reset configs
-            self.opt.axis.plot(self.opt.index, self.opt.data, color="g", linewidth=2)
-            axis_config(self.opt.axis)
-            self.opt.scatter.draw()
+            # Create the height graph on the figure
+            self.opt.plot = AltitudePlot(scatter, self.opt.history)
+
+        # Redraw the graph and navdata only once new navdata arrived
+        if self.opt.plot.update():
+            self.handle_navdata()
 
         # recursive call to the plot function to run each 51 ms
         self.opt.plot_job = self.window.after(ms=51, func=self.on_plot)
@@ -299,7 +278,7 @@ class DroneVisGui:
         btn_control_gesture.grid(row=1, column=0)
         lbl_control_crowd = Label(frm_fine_control, text="Crowd")
         btn_control_gesture = ToggleButton(
-            frm_fine_control, self.on_crowd, self.on_crowd
+            frm_fine_control, self.on_crowd, self.off_crowd
         )
         lbl_control_crowd.grid(row=0, column=1)
         btn_control_gesture.grid(row=1, column=1)
@@ -611,17 +590,18 @@ class DroneVisGui:
         )
 
     def on_crowd(self) -> None:
-        """Start crowd control"""
-        self.is_crowdcount = True
+        """Start crowd counting (the model is loaded in the background the first
+        time)"""
+        self.crowd_runner.enable()
 
     def off_crowd(self) -> None:
-        """Stop crowd control"""
-        self.is_crowdcount = False
+        """Stop crowd counting"""
+        self.crowd_runner.disable()
 
     def on_gesture(self) -> None:
         """Open gesture control"""
         self.models_choice.set("None")
-        self.is_crowdcount = False
+        self.off_crowd()
         self.on_stream()
         if self.gesture_thread:
             self.gesture_thread.resume()
@@ -652,7 +632,7 @@ class DroneVisGui:
         self.drone.set_callback(self.on_navdata)
 
     def on_navdata(self, navdata: dict):
-        """Callback handler to retrieve navdata from drone instance
+        """Callback handler to store navdata from drone instance
 
         Args:
             navdata (dict): navigation data dictionary
@@ -660,7 +640,7 @@ class DroneVisGui:
         if not self.drone.is_connected:
             return
 
-        self.opt.navdata = navdata
+        self.opt.history.append(navdata)
 
     def on_stream(self):
         """Event handler for pressing on stream button"""
@@ -687,30 +667,48 @@ class DroneVisGui:
         self.drone.video_thread.change_model(self.models_choice.get())
 
     def update_frame(self, output_image: np.ndarray, frame: np.ndarray) -> None:
-        """Update camera feed output_image
+        """Prepare a camera feed frame, invoked by the video thread
+
+        The frame is converted for display here, then posted to the feed mailbox,
+        which is emptied by ``on_display`` on the Tk thread. The input frame is
+        offered to the crowd counter, which runs on its own thread.
 
         Args:
             output_image (np.ndarray): output_image data
             frame (np.ndarray): frame data
         """
-        if self.is_crowdcount and self.crowd_tick % CROWD_TOCKS == 0:
-            density_map = self.crowd_model.predict(frame)
-            et_count = int(np.sum(density_map))
-            self.frms.lbl_count["text"] = str(et_count)
-
-        self.crowd_tick += 1
-
-        output_image = cv2.cvtColor(output_image, cv2.COLOR_BGR2RGB)
-        output_image = cv2.resize(output_image, (400, 380))
-        output_image = Image.fromarray(output_image)
-        output_image = ImageTk.PhotoImage(output_image)
-        self.camera_feed.configure(image=output_image)
-        self.camera_feed.image = output_image
+        self.crowd_runner.submit(frame)
+        self.opt.feed.post(to_display(output_image, cfg.FEED_SIZE))
+
+    def on_display(self) -> None:
+        """Show the newest camera feed frame (superseded frames are skipped), and
+        the newest crowd count"""
+        display = self.opt.feed.take()
+        if display is not None:
+            image = Image.fromarray(display)
+            photo = self.opt.feed_image
+            if photo is None or (photo.width(), photo.height()) != image.size:
+                photo = ImageTk.PhotoImage(image)
+                self.camera_feed.configure(image=photo)
+                self.camera_feed.image = photo
+                self.opt.feed_image = photo
+            else:
+                photo.paste(image)
+
+        crowd = self.crowd_runner.results.take()
+        if crowd is not None:
+            self.frms.lbl_count["text"] = str(crowd.count)
+
+        # recursive call to the display function
+        self.opt.display_job = self.window.after(
+            ms=cfg.DISPLAY_PERIOD, func=self.on_display
+        )
 
     def __call__(self) -> None:
         """Run the GUI window"""
-        empty_frame = np.zeros((400, 380, 3), dtype=np.uint8)
-        self.update_frame(empty_frame, empty_frame)
+        width, height = cfg.FEED_SIZE
+        self.opt.feed.post(np.zeros((height, width, 3), np.uint8))
+        self.on_display()
         self.on_stream()
         self.window.mainloop()
 
@@ -727,9 +725,13 @@ class DroneVisGui:
         if self.gesture_thread:
             self.gesture_thread.stop()
 
+        self.crowd_runner.stop()
         self.drone.stop()
         self.window.after_cancel(self.opt.plot_job)
         self.opt.plot_job = None
+        if self.opt.display_job is not None:
+            self.window.after_cancel(self.opt.display_job)
+            self.opt.display_job = None
         plt.close()
         self.window.destroy()
         _LOG.info("GUI closed")
@@ -739,6 +741,34 @@ def idle() -> None:
     """Idle function"""
 
 
+def load_crowd_counter() -> Any:
+    """Create the crowd counter, and load its weights"""
+    crowd_model = models.CrowdCounter()
+    crowd_model.load_model()
+    return crowd_model
+
+
+def count_crowd(crowd_model: Any, frame: np.ndarray) -> CrowdCount:
+    """Estimate the crowd count of a frame from its density map"""
+    density_map = crowd_model.predict(frame)
+    return CrowdCount(int(np.sum(density_map)), density_map)
+
+
+def to_display(image: np.ndarray, size: Tuple[int, int]) -> np.ndarray:
+    """Convert a BGR image to an RGB image for display
+
+    Args:
+        image (np.ndarray): BGR image
+        size (Tuple[int, int]): Displayed width and height
+
+    Returns:
+        np.ndarray: RGB image of the displayed size
+    """
+    # Scale first, so only the displayed pixels are converted
+    image = cv2.resize(image, size)
+    return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+
 def to_angle(value: float, max_value: float) -> float:
     """Convert a value ration to an angle"""
     angle = (value / max_value) * cfg.MAX_ANGLE
@@ -1,9 +1,11 @@
 """Implementation of a tkinter circular progress bar for the GUI"""
 import os
 import inspect
-from typing import Tuple, Callable
+from typing import Any, Optional, Tuple, Callable
 from tkinter import Canvas, Button, messagebox
 from tkinter.ttk import Label, Frame
+from matplotlib.backend_bases import FigureCanvasBase
+import numpy as np
 from PIL import Image, ImageTk, ImageOps
 
 import dronevis
@@ -15,7 +17,11 @@ from dronevis.config.gui import (
     BUTTON_COLOR,
     FONT_COLOR,
     TOGGLE_SIZE,
+    GUI_X_LIMIT,
+    MILLI_TO_METER_FACTOR,
 )
+from dronevis.drone_connect.navdata_history import NavdataHistory
+from dronevis.utils.general import axis_config
 
 
 class CircularProgressbar:
@@ -283,3 +289,68 @@ class ToggleButton(Button):
             image (ImageTk.PhotoImage): new image
         """
         self["image"] = image
+
+
+class AltitudePlot:
+    """Height graph of the last ``GUI_X_LIMIT`` seconds of navdata.
+
+    The graph holds a single animated line, whose data is copied into
+    fixed-size buffers. Axes, ticks and legend are rendered once into a cached
+    background (again on each full draw, e.g. after a resize), then each update
+    restores the background, draws the line over it, and blits the axis.
+    """
+
+    def __init__(self, canvas: FigureCanvasBase, history: NavdataHistory) -> None:
+        """Create the axis and its line on the figure of a canvas
+
+        Args:
+            canvas (FigureCanvasBase): Canvas of the figure, e.g. ``FigureCanvasTkAgg``
+            history (NavdataHistory): History of the plotted navdata
+        """
+        self.canvas = canvas
+        self.history = history
+        self.axis = canvas.figure.add_subplot(111)
+        (self.line,) = self.axis.plot([], [], color="g", linewidth=2, animated=True)
+        axis_config(self.axis)
+        self._times = np.zeros(history.capacity)
+        self._altitude = np.zeros(history.capacity)
+        self._background: Optional[Any] = None
+        self._plotted = -1  # history count of the drawn line
+        canvas.mpl_connect("draw_event", self._on_draw)
+
+    def _on_draw(self, _) -> None:
+        """Cache the background rendered by a full draw, then draw the line on it"""
+        self._background = self.canvas.copy_from_bbox(self.axis.bbox)
+        self.axis.draw_artist(self.line)
+
+    def _set_data(self) -> None:
+        """Copy the altitude window ending at the latest sample into the line"""
+        size = 0
+        if self.history.count:
+            end, _ = self.history.latest()
+            start = end - GUI_X_LIMIT
+            timestamps, altitude = self.history.between(start, end, "altitude")
+            size = len(timestamps)
+            np.subtract(timestamps, start, out=self._times[:size])
+            np.multiply(altitude, MILLI_TO_METER_FACTOR, out=self._altitude[:size])
+        self.line.set_data(self._times[:size], self._altitude[:size])
+
+    def update(self) -> bool:
+        """Redraw the line if new navdata arrived since the last update
+
+        Returns:
+            bool: Whether the graph was redrawn
+        """
+        count = self.history.count
+        if count == self._plotted:
+            return False
+        self._plotted = count
+        self._set_data()
+
+        if self._background is None:
+            self.canvas.draw()
+            return True
+        self.canvas.restore_region(self._background)
+        self.axis.draw_artist(self.line)
+        self.canvas.blit(self.axis.bbox)
+        return True
@@ -0,0 +1,147 @@
+"""Side pipeline running an auxiliary model on frames of the main video pipeline"""
+from typing import Any, Callable, Generic, Optional, TypeVar
+import logging
+import threading
+import time
+
+import numpy as np
+
+from dronevis.utils.mailbox import Mailbox
+from dronevis.utils.metrics import MetricsRegistry
+
+_LOG = logging.getLogger(__name__)
+
+Result = TypeVar("Result")
+
+
+class AuxiliaryModelRunner(threading.Thread, Generic[Result]):
+    """Run a model on its own worker thread, beside the main video pipeline.
+
+    The main pipeline hands every frame to ``submit``, which returns at once:
+    frames are only copied at the configured ``rate`` while the runner is
+    enabled, and a frame still waiting for the worker is replaced by a newer
+    one. Results are posted to the ``results`` mailbox, for consumers (e.g. a
+    GUI event loop) to take at their own pace.
+
+    The model is created by ``load_model`` on the worker, once the runner is
+    first enabled, so a runner which is never enabled costs neither the model
+    imports nor its weights.
+    """
+
+    def __init__(
+        self,
+        load_model: Callable[[], Any],
+        process: Callable[[Any, np.ndarray], Result],
+        rate: float = 2.0,
+        name: str = "auxiliary",
+        metrics: Optional[MetricsRegistry] = None,
+    ) -> None:
+        """Construct runner, without starting its worker
+
+        Args:
+            load_model (Callable[[], Any]): Create the model, with its weights loaded
+            process (Callable[[Any, np.ndarray], Result]): Run the model on a frame
+            rate (float, optional): Maximum number of processed frames per second.
+            Defaults to 2.0.
+            name (str, optional): Name prefixing the metrics. Defaults to "auxiliary".
+            metrics (Optional[MetricsRegistry], optional): Registry of the timings and
+            counters. Defaults to None (a new registry).
+        """
+        assert rate > 0, "Rate must be a positive number of frames per second"
+        super().__init__(name=f"{name}-runner", daemon=True)
+        self.load_model = load_model
+        self.process = process
+        self.period = 1 / rate
+        self.metrics = metrics if metrics is not None else MetricsRegistry()
+        self.model: Optional[Any] = None
+        self.results: Mailbox[Result] = Mailbox()
+        self.enabled = False
+        self.running = True
+        self._name = name
+        self._frames: Mailbox[np.ndarray] = Mailbox()
+        self._next_frame = 0.0
+        self._condition = threading.Condition()
+
+    def enable(self) -> None:
+        """Start processing submitted frames, starting the worker (which loads the
+        model) on first use"""
+        with self._condition:
+            self.enabled = True
+            self._next_frame = 0.0
+            self._condition.notify()
+        if not self.is_alive() and self.running:
+            self.start()
+
+    def disable(self) -> None:
+        """Stop processing frames, the loaded model is kept for the next enable"""
+        with self._condition:
+            self.enabled = False
+        self._frames.take()
+        self.results.take()
+
+    def submit(self, frame: np.ndarray) -> bool:
+        """Offer a frame of the main pipeline, without waiting
+
+        Args:
+            frame (np.ndarray): Frame of the main pipeline
+
+        Returns:
+            bool: Whether the frame was accepted
+        """
+        if not self.enabled:
+            return False
+        now = time.monotonic()
+        if now < self._next_frame:
+            return False
+        self._next_frame = now + self.period
+        self._frames.post(frame.copy())
+        with self._condition:
+            self._condition.notify()
+        return True
+
+    def run(self) -> None:
+        """Load the model, then process the newest submitted frames"""
+        if not self._load():
+            return
+        while True:
+            with self._condition:
+                frame = self._frames.take()
+                while self.running and (frame is None or not self.enabled):
+                    self._condition.wait()
+                    frame = self._frames.take()
+                if not self.running:
+                    break
+            try:
+                with self.metrics.time(f"{self._name}_inference"):
+                    result = self.process(self.model, frame)
+            except Exception as err:  # pylint: disable=broad-except
+                _LOG.error("Auxiliary model %s failed: %s", self._name, err)
+                self.metrics.increment(f"{self._name}_errors")
+                continue
+            if self.enabled:
+                self.results.post(result)
+                self.metrics.increment(f"{self._name}_results")
+
+    def _load(self) -> bool:
+        """Create the model, and disable the runner if it fails"""
+        start = time.perf_counter()
+        try:
+            self.model = self.load_model()
+        except Exception as err:  # pylint: disable=broad-except
+            _LOG.error("Couldn't load auxiliary model %s: %s", self._name, err)
+            self.enabled = False
+            self.running = False
+            return False
+        _LOG.info(
+            "Loaded auxiliary model %s in %.2fs",
+            self._name,
+            time.perf_counter() - start,
+        )
+        return True
+
+    def stop(self) -> None:
+        """Stop the worker once it finished its current frame"""
+        with self._condition:
+            self.running = False
+            self.enabled = False
+            self._condition.notify()
@@ -0,0 +1,56 @@
+"""Lightweight drawing utilities for structured detections"""
+from typing import Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from dronevis.abstract.detections import Detections
+
+GREEN_COLOR = (0, 255, 0)
+
+
+def draw_detections(
+    image: np.ndarray,
+    detections: Detections,
+    class_names: Optional[Sequence[str]] = None,
+    color: Tuple[int, int, int] = GREEN_COLOR,
+    thickness: int = 2,
+) -> np.ndarray:
+    """Draw masks, boxes and keypoints of detections in-place on an image
+
+    Args:
+        image (np.ndarray): ``uint8`` BGR image to draw on
+        detections (Detections): Detections to be drawn
+        class_names (Optional[Sequence[str]], optional): Names indexed by class id.
+        If provided, the name and score are written above each box. Defaults to None.
+        color (Tuple[int, int, int], optional): BGR color. Defaults to green.
+        thickness (int, optional): Thickness of box lines. Defaults to 2.
+
+    Returns:
+        np.ndarray: Same image with detections drawn
+    """
+    if detections.masks is not None:
+        tint = np.array(color, dtype=np.uint16)
+        for mask in detections.masks:
+            image[mask] = ((image[mask] + tint) // 2).astype(np.uint8)
+
+    for i, box in enumerate(detections.boxes.astype(np.int32)):
+        cv2.rectangle(image, (box[0], box[1]), (box[2], box[3]), color, thickness)
+        if class_names is not None:
+            cv2.putText(
+                img=image,
+                text=f"{class_names[detections.class_ids[i]]} {detections.scores[i]:.2f}",
+                org=(int(box[0]), int(box[1] - 5)),
+                fontFace=cv2.FONT_HERSHEY_SIMPLEX,
+                fontScale=0.6,
+                color=color,
+                thickness=thickness,
+                lineType=cv2.LINE_AA,
+            )
+
+    if detections.keypoints is not None:
+        for instance in detections.keypoints.astype(np.int32):
+            for point in instance:
+                cv2.circle(image, (point[0], point[1]), 3, color, -1)
+
+    return image
@@ -0,0 +1,247 @@
+"""Fan-out of decoded frames to several models, and composition of their outputs"""
+from typing import TYPE_CHECKING, Any, List, Optional, Sequence, Tuple, Union
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+import logging
+import time
+
+import cv2
+import numpy as np
+
+from dronevis.abstract.detections import Detections
+from dronevis.models.model_factory import ModelFactory
+from dronevis.utils.drawing import draw_detections
+from dronevis.utils.metrics import MetricsRegistry
+
+if TYPE_CHECKING:
+    # Shared memory needs Python 3.8, hence it is only imported for process branches
+    from dronevis.utils.shared_inference import SharedMemoryBackend
+
+_LOG = logging.getLogger(__name__)
+
+THREAD = "thread"  # for backends releasing the GIL (torch, OpenCV, onnxruntime)
+PROCESS = "process"  # for backends holding the GIL
+BACKENDS = (THREAD, PROCESS)
+
+ModelOutput = Union[Detections, np.ndarray]
+
+
+@dataclass
+class ModelBranch:
+    """Model of a fan-out, along with its rate limit, backend and latest output"""
+
+    model_name: str
+    rate: Optional[float] = None  # inferences per second, None runs on every frame
+    backend: str = THREAD
+    model: Any = None  # instance of thread branches
+    backend_pool: Optional["SharedMemoryBackend"] = None  # workers of process branches
+    output: Optional[ModelOutput] = None
+    next_run: float = 0.0
+
+    def is_due(self, now: float) -> bool:
+        """Whether the rate limit allows an inference"""
+        return self.rate is None or now >= self.next_run
+
+
+def infer(model: Any, frame: np.ndarray) -> ModelOutput:
+    """Get the detections of a model, or its output image if it can't detect.
+    Models only producing images may draw on their input, hence they get a copy
+    of the shared frame."""
+    if model.supports_detect:
+        return model.detect(frame)
+    return model.predict(frame.copy())
+
+
+class OverlayCompositor:
+    """Merge the outputs of several models on their frame.
+
+    Output images (e.g. depth maps) are alpha-blended over the frame first,
+    then detections are drawn on top, so boxes, masks and keypoints stay crisp.
+    """
+
+    def __init__(self, alpha: float = 0.5) -> None:
+        """Construct compositor
+
+        Args:
+            alpha (float, optional): Opacity of output images. Defaults to 0.5.
+        """
+        assert 0 <= alpha <= 1, "Alpha must be between 0 and 1"
+        self.alpha = alpha
+
+    def compose(self, frame: np.ndarray, branches: Sequence[ModelBranch]) -> np.ndarray:
+        """Draw the latest outputs of branches on a copy of the frame
+
+        Args:
+            frame (np.ndarray): BGR frame
+            branches (Sequence[ModelBranch]): Branches of the fan-out
+
+        Returns:
+            np.ndarray: Composed image
+        """
+        canvas = frame.copy()
+        for branch in branches:
+            if isinstance(branch.output, np.ndarray):
+                self._blend(canvas, branch.output)
+        for branch in branches:
+            if not isinstance(branch.output, Detections):
+                continue
+            if branch.model is not None:
+                canvas = branch.model.render(canvas, branch.output)
+            else:
+                assert branch.backend_pool is not None
+                class_names = branch.backend_pool.class_names
+                canvas = draw_detections(canvas, branch.output, class_names)
+        return canvas
+
+    def _blend(self, canvas: np.ndarray, image: np.ndarray) -> None:
+        """Blend an output image in-place over the canvas"""
+        if image.ndim == 2:
+            image = cv2.cvtColor(image.astype(np.uint8), cv2.COLOR_GRAY2BGR)
+        if image.shape[:2] != canvas.shape[:2]:
+            image = cv2.resize(image, (canvas.shape[1], canvas.shape[0]))
+        cv2.addWeighted(
+            canvas, 1 - self.alpha, image.astype(canvas.dtype), self.alpha, 0, canvas
+        )
+
+
+class ModelFanOut:
+    """Run several models on each decoded frame.
+
+    The frame is decoded once, then shared read-only with the models due for
+    an inference: branches with the ``thread`` backend run in a thread pool,
+    and each branch with the ``process`` backend in its own worker processes,
+    which receive the frame through shared memory (see ``SharedMemoryBackend``).
+    Each branch has its own rate limit, and the
+    latest output of the branches which are not due is reused. The outputs are
+    merged by the compositor.
+
+    Inference timings of the branches are recorded in ``metrics`` as the
+    ``model_<name>`` stages.
+    """
+
+    def __init__(
+        self,
+        branches: Sequence[ModelBranch],
+        thread_workers: Optional[int] = None,
+        process_workers: Optional[int] = None,
+        compositor: Optional[OverlayCompositor] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ) -> None:
+        """Load the models of thread branches, and start the workers of process
+        branches
+
+        Args:
+            branches (Sequence[ModelBranch]): Models to run on each frame
+            thread_workers (Optional[int], optional): Size of the thread pool.
+            Defaults to None (one per thread branch).
+            process_workers (Optional[int], optional): Number of worker processes of
+            each process branch. Defaults to None (one).
+            compositor (Optional[OverlayCompositor], optional): Merger of the outputs.
+            Defaults to None (``OverlayCompositor()``).
+            metrics (Optional[MetricsRegistry], optional): Registry of the timings.
+            Defaults to None (a new registry).
+
+        Raises:
+            ValueError: Unknown model or backend
+        """
+        for branch in branches:
+            if branch.model_name not in ModelFactory.models_list:
+                err_message = f"Model {branch.model_name} is not supported"
+                _LOG.critical(err_message)
+                raise ValueError(err_message)
+            if branch.backend not in BACKENDS:
+                err_message = f"Backend {branch.backend} is not one of {BACKENDS}"
+                _LOG.critical(err_message)
+                raise ValueError(err_message)
+
+        self.branches = list(branches)
+        self.compositor = compositor if compositor is not None else OverlayCompositor()
+        self.metrics = metrics if metrics is not None else MetricsRegistry()
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._jobs: List[Future] = []
+
+        threaded = [branch for branch in self.branches if branch.backend == THREAD]
+        for branch in threaded:
+            if branch.model is None:
+                # Cached instances may be running on other threads
+                branch.model = ModelFactory.create_model(
+                    branch.model_name, use_cache=False
+                )
+        if threaded:
+            self._threads = ThreadPoolExecutor(
+                max_workers=thread_workers or len(threaded),
+                thread_name_prefix="FanOut",
+            )
+        for branch in self.branches:
+            if branch.backend == PROCESS and branch.backend_pool is None:
+                # pylint: disable-next=import-outside-toplevel
+                from dronevis.utils.shared_inference import SharedMemoryBackend
+
+                branch.backend_pool = SharedMemoryBackend(
+                    branch.model_name, process_workers or 1
+                )
+
+    def process(self, frame: np.ndarray) -> np.ndarray:
+        """Run the due models on a frame, then compose their latest outputs
+
+        Args:
+            frame (np.ndarray): Decoded BGR frame
+
+        Returns:
+            np.ndarray: Composed image
+        """
+        shared = frame.view()
+        shared.flags.writeable = False
+        now = time.monotonic()
+        jobs: List[Tuple[ModelBranch, Future, float]] = []
+        for branch in self.branches:
+            if not branch.is_due(now):
+                continue
+            if branch.rate is not None:
+                # Keep the cadence, unless the branch fell a whole period behind
+                period = 1 / branch.rate
+                late = now - branch.next_run >= period
+                branch.next_run = (now if late else branch.next_run) + period
+            start = time.perf_counter()
+            if branch.backend == THREAD:
+                assert self._threads is not None
+                job = self._threads.submit(infer, branch.model, shared)
+            else:
+                assert branch.backend_pool is not None
+                job = branch.backend_pool.submit(shared)
+            jobs.append((branch, job, start))
+        self._jobs = [job for _, job, _ in jobs]
+
+        for branch, job, start in jobs:
+            try:
+                output = job.result()
+            # pylint: disable=broad-exception-caught
+            except Exception as error:
+                _LOG.error("Model %s failed: %s", branch.model_name, error)
+                self.metrics.increment("fan_out_errors")
+                continue
+            branch.output = output
+            self.metrics.observe(
+                f"model_{branch.model_name}", time.perf_counter() - start
+            )
+        return self.compositor.compose(frame, self.branches)
+
+    def close(self) -> None:
+        """Cancel the inferences which did not start, then shut the worker
+        threads and processes down"""
+        for job in self._jobs:
+            job.cancel()
+        self._jobs = []
+        if self._threads is not None:
+            self._threads.shutdown(wait=True)
+            self._threads = None
+        for branch in self.branches:
+            if branch.backend_pool is not None:
+                branch.backend_pool.close()
+                branch.backend_pool = None
+
+    def __enter__(self) -> "ModelFanOut":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
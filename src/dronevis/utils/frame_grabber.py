@@ -0,0 +1,214 @@
+"""Capture thread that decouples frame decoding from model inference"""
+from typing import Deque, List, Optional, Tuple
+from collections import deque
+import threading
+import logging
+import time
+
+import cv2
+import numpy as np
+
+from dronevis.utils.frame_scheduler import RateCounter
+from dronevis.utils.metrics import MetricsRegistry
+from dronevis.utils.recording import SessionRecorder
+
+_LOG = logging.getLogger(__name__)
+
+
+class FrameGrabber(threading.Thread):
+    """Read frames from a video capture as fast as the source produces them,
+    and keep only the newest decoded frame (latest-frame-wins).
+
+    Consumers call ``read`` to take the newest frame. Any frame that gets
+    replaced before it was read is dropped and counted in ``dropped_frames``,
+    so the consumer never works on stale frames buffered by OpenCV/FFmpeg.
+
+    With a ``queue_size`` larger than one, the newest ``queue_size`` frames are
+    kept, so a batching consumer can take all of them at once with ``read_batch``.
+
+    For throughput testing on recorded footage, ``realtime`` pacing and
+    ``drop_frames`` can be turned off, hence every frame is decoded as fast as
+    possible and the grabber waits for the consumer when the queue is full.
+
+    The capture must not be released while the grabber may be blocked in
+    ``read`` (e.g. on a stalled stream), hence ``stop(release_capture=True)``
+    hands its release over to the grabber once it exits.
+    """
+
+    def __init__(
+        self,
+        cap: cv2.VideoCapture,
+        rate_counter: Optional[RateCounter] = None,
+        queue_size: int = 1,
+        metrics: Optional[MetricsRegistry] = None,
+        realtime: bool = True,
+        drop_frames: bool = True,
+        recorder: Optional[SessionRecorder] = None,
+    ) -> None:
+        """Construct grabber thread
+
+        Args:
+            cap (cv2.VideoCapture): Opened video capture to read frames from
+            rate_counter (Optional[RateCounter], optional): Counter ticked for each
+            decoded frame. Defaults to None.
+            queue_size (int, optional): Number of newest frames to keep. Defaults to 1.
+            metrics (Optional[MetricsRegistry], optional): Registry recording the
+            ``capture`` stage and the ``dropped_frames`` counter. Defaults to None.
+            realtime (bool, optional): Whether to pace recorded footage by its native
+            frame rate. Defaults to True.
+            drop_frames (bool, optional): Whether to drop the oldest frame when the
+            queue is full, otherwise wait for the consumer. Defaults to True.
+            recorder (Optional[SessionRecorder], optional): Recorder of every decoded
+            frame. Defaults to None.
+        """
+        assert queue_size >= 1, "Queue size must be a positive integer"
+        super().__init__(daemon=True)
+        self.cap = cap
+        self.rate_counter = rate_counter
+        self.metrics = metrics
+        self.recorder = recorder
+        self.running = True
+        self.captured_frames = 0
+        self.dropped_frames = 0
+        self._is_ended = False
+        self._is_exited = False
+        self._release_on_exit = False
+        self._frames: Deque[np.ndarray] = deque()
+        self.queue_size = queue_size
+        self.drop_frames = drop_frames
+        self._condition = threading.Condition()
+
+        # Recorded footage is decoded faster than real-time, hence it is paced
+        # by its native frame rate. Live streams block on `read` by themselves.
+        self._frame_period = 0.0
+        if realtime and self.cap.get(cv2.CAP_PROP_FRAME_COUNT) > 0:
+            source_fps = self.cap.get(cv2.CAP_PROP_FPS)
+            if source_fps > 0:
+                self._frame_period = 1 / source_fps
+
+    def run(self) -> None:
+        """Keep decoding frames, then release the capture if requested"""
+        try:
+            self._grab_frames()
+        finally:
+            with self._condition:
+                self._is_exited = True
+                release = self._release_on_exit
+            if release:
+                self.cap.release()
+
+    def _grab_frames(self) -> None:
+        """Keep decoding frames, and replace the latest one"""
+        next_time = time.perf_counter()
+        while self.running:
+            read_start = time.perf_counter()
+            status, frame = self.cap.read()
+            if status and self.metrics is not None:
+                self.metrics.observe("capture", time.perf_counter() - read_start)
+            if status and self.recorder is not None:
+                self.recorder.record_frame(frame)
+            with self._condition:
+                if not status:
+                    _LOG.debug("Capture source ended")
+                    self._is_ended = True
+                    self._condition.notify_all()
+                    break
+
+                if not self.drop_frames:
+                    self._condition.wait_for(
+                        lambda: len(self._frames) < self.queue_size or not self.running
+                    )
+                    if not self.running:
+                        break
+                if len(self._frames) >= self.queue_size:
+                    self._frames.popleft()
+                    self.dropped_frames += 1
+                    if self.metrics is not None:
+                        self.metrics.increment("dropped_frames")
+                self._frames.append(frame)
+                self.captured_frames += 1
+                self._condition.notify_all()
+
+            if self.rate_counter is not None:
+                self.rate_counter.tick()
+
+            if self._frame_period:
+                next_time += self._frame_period
+                time.sleep(max(0.0, next_time - time.perf_counter()))
+
+    def read(
+        self, timeout: Optional[float] = None
+    ) -> Tuple[bool, Optional[np.ndarray]]:
+        """Take the oldest kept frame (the newest one for a queue size of one),
+        waiting for one if none is available
+
+        Args:
+            timeout (Optional[float], optional): Max seconds to wait for a frame.
+            Defaults to None (wait until a frame arrives).
+
+        Returns:
+            Tuple[bool, Optional[np.ndarray]]: status which is ``False`` if the source
+            ended, and the frame which is ``None`` if no frame arrived within ``timeout``.
+        """
+        status, frames = self.read_batch(1, timeout)
+        return status, frames[0] if frames else None
+
+    def read_batch(
+        self,
+        max_frames: int,
+        timeout: Optional[float] = None,
+    ) -> Tuple[bool, List[np.ndarray]]:
+        """Take up to ``max_frames`` kept frames in decoding order, waiting for
+        at least one if none is available
+
+        Args:
+            max_frames (int): Max number of frames to take
+            timeout (Optional[float], optional): Max seconds to wait for a frame.
+            Defaults to None (wait until a frame arrives).
+
+        Returns:
+            Tuple[bool, List[np.ndarray]]: status which is ``False`` if the source
+            ended, and the frames which are empty if no frame arrived within ``timeout``.
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._frames or self._is_ended or not self.running,
+                timeout,
+            )
+            frames = [
+                self._frames.popleft()
+                for _ in range(min(max_frames, len(self._frames)))
+            ]
+            if frames:
+                self._condition.notify_all()
+            if not frames and self._is_ended:
+                return False, frames
+            return True, frames
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of kept frames waiting to be read"""
+        with self._condition:
+            return len(self._frames)
+
+    @property
+    def is_ended(self) -> bool:
+        """Whether the capture source has no more frames"""
+        return self._is_ended
+
+    def stop(self, release_capture: bool = False) -> None:
+        """Stop grabbing frames and wake up any waiting consumer
+
+        Args:
+            release_capture (bool, optional): Whether to release the capture once
+            the grabber is done reading from it. Defaults to False.
+        """
+        with self._condition:
+            self.running = False
+            self._condition.notify_all()
+            if not release_capture:
+                return
+            if self.is_alive() and not self._is_exited:
+                self._release_on_exit = True
+                return
+        self.cap.release()
@@ -0,0 +1,133 @@
+"""Frame scheduling and rate counters for the video pipeline"""
+from typing import Deque, Optional
+from collections import deque
+import threading
+import time
+
+
+class RateCounter:
+    """Measure the rate of events over a rolling time window"""
+
+    def __init__(self, window: float = 2.0) -> None:
+        """Construct rate counter
+
+        Args:
+            window (float, optional): Length of the rolling window in seconds.
+            Defaults to 2.0.
+        """
+        assert window > 0, "Window must be a positive number of seconds"
+        self.window = window
+        self.count = 0
+        self._stamps: Deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def tick(self) -> None:
+        """Record a single event"""
+        now = time.perf_counter()
+        with self._lock:
+            self.count += 1
+            self._stamps.append(now)
+            self._prune(now)
+
+    @property
+    def rate(self) -> float:
+        """Events per second over the rolling window"""
+        now = time.perf_counter()
+        with self._lock:
+            self._prune(now)
+            if len(self._stamps) < 2:
+                return 0.0
+            elapsed = now - self._stamps[0]
+            return (len(self._stamps) - 1) / elapsed if elapsed > 0 else 0.0
+
+    def reset(self) -> None:
+        """Forget all recorded events"""
+        with self._lock:
+            self.count = 0
+            self._stamps.clear()
+
+    def _prune(self, now: float) -> None:
+        """Drop events older than the window"""
+        while self._stamps and now - self._stamps[0] > self.window:
+            self._stamps.popleft()
+
+
+class FrameScheduler:
+    """Pace the video loop at a target frame rate, and decide on which frames
+    the model runs (skip-N mode).
+
+    The scheduler keeps a deadline on a monotonic clock, hence time spent in
+    inference is deducted from the wait instead of adding up to a fixed sleep.
+    If the loop falls behind, the deadline is reset instead of bursting.
+    """
+
+    def __init__(self, target_fps: float = 30.0, skip_frames: int = 1) -> None:
+        """Construct frame scheduler
+
+        Args:
+            target_fps (float, optional): Desired frames per second. Defaults to 30.0.
+            skip_frames (int, optional): Run inference on every Nth frame, and reuse
+            the last output in between. Defaults to 1 (every frame).
+        """
+        self.target_fps = target_fps
+        self.skip_frames = skip_frames
+        self.capture_rate = RateCounter()
+        self.inference_rate = RateCounter()
+        self.display_rate = RateCounter()
+        self._frame_index = 0
+        self._deadline: Optional[float] = None
+
+    @property
+    def target_fps(self) -> float:
+        """Getter for target fps property"""
+        return self._target_fps
+
+    @target_fps.setter
+    def target_fps(self, fps: float) -> None:
+        """Setter for target fps property"""
+        if fps <= 0:
+            raise ValueError("Target FPS must be a positive number")
+        self._target_fps = fps
+        self._period = 1 / fps
+
+    @property
+    def skip_frames(self) -> int:
+        """Getter for skip frames property"""
+        return self._skip_frames
+
+    @skip_frames.setter
+    def skip_frames(self, num_frames: int) -> None:
+        """Setter for skip frames property"""
+        if not isinstance(num_frames, int) or num_frames < 1:
+            raise ValueError("Skip frames must be a positive integer")
+        self._skip_frames = num_frames
+
+    def should_infer(self) -> bool:
+        """Whether the model should run on the current frame. Each call
+        advances the frame index by one.
+
+        Returns:
+            bool: ``True`` on every Nth frame
+        """
+        is_inference_frame = self._frame_index % self._skip_frames == 0
+        self._frame_index += 1
+        return is_inference_frame
+
+    def time_to_next_frame(self) -> float:
+        """Advance the deadline by one period and get the time left until it
+
+        Returns:
+            float: Seconds to wait before processing the next frame
+        """
+        now = time.perf_counter()
+        if self._deadline is None:
+            self._deadline = now
+        self._deadline += self._period
+        if self._deadline < now:
+            self._deadline = now
+        return self._deadline - now
+
+    def reset(self) -> None:
+        """Restart pacing and frame counting, e.g. after the stream was paused"""
+        self._frame_index = 0
+        self._deadline = None
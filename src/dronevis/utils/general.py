@@ -1,5 +1,5 @@
 """Utilities for dronevis library including image processing and parser"""
-from typing import Union, Optional, Sequence
+from typing import TYPE_CHECKING, Union, Optional, Sequence
 import logging
 import os
 import argparse
@@ -12,10 +12,14 @@ import cv2
 import numpy as np
 import coloredlogs
 import wget
-import torch
 
 from dronevis import __version__
 import dronevis.config.gui as cfg
+from dronevis.models import models_list
+from dronevis.models.model_factory import ModelFactory
+
+if TYPE_CHECKING:
+    import torch
 
 
 def write_fps(image: np.ndarray, fps: Union[str, int, float]) -> np.ndarray:
@@ -90,6 +94,28 @@ def gui_parse(arguments: Optional[Sequence[str]] = None) -> argparse.Namespace:
         default="info",
         help="Level for logger",
     )
+    parser.add_argument(
+        "--prewarm",
+        nargs="+",
+        default=[],
+        choices=list(models_list),
+        metavar="MODEL",
+        help="models to load in the background at startup for instant switching",
+    )
+    parser.add_argument(
+        "--model-cache-size",
+        dest="model_cache_size",
+        type=int,
+        default=ModelFactory.max_cached_models,
+        help="max number of loaded models kept in memory",
+    )
+    parser.add_argument(
+        "--model-memory-budget",
+        dest="model_memory_budget",
+        type=float,
+        default=None,
+        help="max memory (in MB) of model weights kept in memory",
+    )
 
     args = parser.parse_args(arguments)
     return args
@@ -203,8 +229,10 @@ def download_file(file_url: str, file_name: str) -> str:
     return model_weights_path
 
 
-def device() -> torch.device:
+def device() -> "torch.device":
     """Returns the device to be used for inference"""
+    import torch  # pylint: disable=import-outside-toplevel
+
     device_name = os.getenv("DEVICE", "cuda" if torch.cuda.is_available() else "cpu")
     device_type = torch.device(device_name)
     return device_type
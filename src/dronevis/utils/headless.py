@@ -0,0 +1,214 @@
+"""Headless video pipeline running capture, inference and output sinks
+without any display (OpenCV windows or Tk)"""
+from typing import List, Optional, Sequence, Union
+import argparse
+import logging
+import time
+
+import cv2
+import numpy as np
+
+from dronevis.abstract.abstract_sink import Sink
+from dronevis.abstract.detections import Detections
+from dronevis.models.model_factory import ModelFactory
+from dronevis.utils.frame_grabber import FrameGrabber
+from dronevis.utils.metrics import MetricsRegistry
+from dronevis.utils.recording import open_capture
+from dronevis.utils.sinks import JSONLSink, MetricsServer, VideoSink
+
+_LOG = logging.getLogger(__name__)
+
+
+class HeadlessPipeline:
+    """Run a model on a video source and hand the outputs to sinks.
+
+    Rendering only happens if one of the sinks needs images. Recorded footage
+    is processed as fast as possible (every frame, no pacing) unless ``realtime``
+    is set, which makes the pipeline usable for throughput testing. Live sources
+    keep the latest-frame-wins behaviour of the video thread.
+    """
+
+    read_timeout = 0.1
+
+    def __init__(
+        self,
+        model_name: str,
+        source: Union[int, str],
+        sinks: Sequence[Sink] = (),
+        realtime: bool = False,
+        batch_size: int = 1,
+        max_frames: Optional[int] = None,
+    ) -> None:
+        """Construct pipeline and load its model
+
+        Args:
+            model_name (str): Name of the model in ``models_list``
+            source (Union[int, str]): Camera index, video file, stream URL, or
+            session recording (``.dvrec``)
+            sinks (Sequence[Sink], optional): Consumers of the outputs. Defaults to ().
+            realtime (bool, optional): Whether to pace recorded footage by its native
+            frame rate. Defaults to False.
+            batch_size (int, optional): Max frames per inference for models with
+            ``predict_batch``. Defaults to 1.
+            max_frames (Optional[int], optional): Stop after processing this number
+            of frames. Defaults to None (until the source ends).
+        """
+        if model_name not in ModelFactory.models_list:
+            err_message = f"Model {model_name} is not supported"
+            _LOG.critical(err_message)
+            raise ValueError(err_message)
+
+        if batch_size < 1:
+            err_message = "Batch size must be a positive integer"
+            _LOG.critical(err_message)
+            raise ValueError(err_message)
+
+        self.source = int(source) if str(source).isdigit() else source
+        self.sinks = list(sinks)
+        self.realtime = realtime
+        self.batch_size = batch_size
+        self.max_frames = max_frames
+        self.metrics = MetricsRegistry()
+        self.model = ModelFactory.create_model(model_name)
+        self.model.metrics = self.metrics
+        self.processed_frames = 0
+        self.running = False
+
+    @property
+    def needs_image(self) -> bool:
+        """Whether any sink needs rendered images"""
+        return any(sink.needs_image for sink in self.sinks)
+
+    def run(self) -> int:
+        """Process the source until it ends, ``max_frames`` is reached or the
+        pipeline is stopped. Sinks are closed afterwards.
+
+        Raises:
+            ConnectionError: The source could not be opened
+
+        Returns:
+            int: Number of processed frames
+        """
+        cap = open_capture(self.source, self.realtime)
+        if not cap.isOpened():
+            raise ConnectionError(f"Cannot open video source {self.source}")
+
+        is_recorded = cap.get(cv2.CAP_PROP_FRAME_COUNT) > 0
+        grabber = FrameGrabber(
+            cap,
+            queue_size=self.batch_size,
+            metrics=self.metrics,
+            realtime=self.realtime,
+            drop_frames=self.realtime or not is_recorded,
+        )
+        self.running = True
+        start_time = time.perf_counter()
+        grabber.start()
+        try:
+            while self.running:
+                status, frames = grabber.read_batch(
+                    self._frames_to_read(), timeout=self.read_timeout
+                )
+                if not status:
+                    break
+                self.metrics.set_gauge("queue_depth", grabber.queue_depth)
+                if frames:
+                    self._process(frames, start_time)
+        finally:
+            self.running = False
+            grabber.stop()
+            grabber.join(timeout=1)
+            cap.release()
+            for sink in self.sinks:
+                sink.close()
+
+        elapsed = time.perf_counter() - start_time
+        _LOG.info(
+            "Processed %d frames in %.2fs (%.1f FPS, inference p50 %.1fms)",
+            self.processed_frames,
+            elapsed,
+            self.processed_frames / elapsed if elapsed > 0 else 0.0,
+            self.metrics.stage("inference")["p50"] * 1000,
+        )
+        return self.processed_frames
+
+    def stop(self) -> None:
+        """Stop processing after the current frames"""
+        self.running = False
+
+    def _frames_to_read(self) -> int:
+        """Number of frames to take for the next inference"""
+        max_frames = self.batch_size if hasattr(self.model, "predict_batch") else 1
+        if self.max_frames is not None:
+            max_frames = min(max_frames, self.max_frames - self.processed_frames)
+        return max_frames
+
+    def _process(self, frames: List[np.ndarray], start_time: float) -> None:
+        """Run inference on frames, then hand the outputs to the sinks"""
+        model = self.model
+        detections: List[Optional[Detections]]
+        start = time.perf_counter()
+        if len(frames) > 1:
+            detections = list(model.predict_batch(frames))
+        elif model.supports_detect:
+            detections = [model.detect(frames[0])]
+        else:
+            detections = [None]
+            frames = [model.predict(frames[0])]
+        frame_time = (time.perf_counter() - start) / len(frames)
+        for _ in frames:
+            self.metrics.observe("inference", frame_time)
+        self.metrics.increment("inferences", len(frames))
+
+        timestamp = time.perf_counter() - start_time
+        for frame, frame_detections in zip(frames, detections):
+            image = None
+            if self.needs_image:
+                image = frame
+                if frame_detections is not None:
+                    with self.metrics.time("draw"):
+                        image = model.render(frame, frame_detections)
+            with self.metrics.time("sink"):
+                for sink in self.sinks:
+                    sink.write(
+                        self.processed_frames, timestamp, frame_detections, image
+                    )
+            self.processed_frames += 1
+            self.metrics.increment("frames")
+
+        if self.max_frames is not None and self.processed_frames >= self.max_frames:
+            self.running = False
+
+
+def run_headless(args: argparse.Namespace) -> int:
+    """Run the headless pipeline with the sinks requested in the parsed
+    ``dronevis --mode headless`` arguments
+
+    Args:
+        args (argparse.Namespace): Parsed CLI arguments
+
+    Returns:
+        int: Number of processed frames
+    """
+    pipeline = HeadlessPipeline(
+        args.model,
+        args.source,
+        realtime=args.realtime,
+        batch_size=args.batch_size,
+        max_frames=args.max_frames,
+    )
+    if args.jsonl:
+        pipeline.sinks.append(JSONLSink(args.jsonl, pipeline.model.class_names))
+    if args.video_out:
+        pipeline.sinks.append(VideoSink(args.video_out))
+
+    metrics_server = None
+    if args.metrics_port is not None:
+        metrics_server = MetricsServer(pipeline.metrics, port=args.metrics_port)
+        metrics_server.start()
+
+    try:
+        return pipeline.run()
+    finally:
+        if metrics_server is not None:
+            metrics_server.stop()
@@ -0,0 +1,43 @@
+"""Single-slot mailbox handing the newest item from a producer thread to a consumer"""
+from typing import Generic, Optional, TypeVar
+import threading
+
+Item = TypeVar("Item")
+
+
+class Mailbox(Generic[Item]):
+    """Thread-safe slot keeping only the newest posted item.
+
+    Producers never wait: posting replaces an item which was not taken yet,
+    so a slow consumer skips superseded items instead of processing a backlog.
+    """
+
+    def __init__(self) -> None:
+        """Construct an empty mailbox"""
+        self._item: Optional[Item] = None
+        self._lock = threading.Lock()
+        self.posted = 0
+        self.superseded = 0
+
+    def post(self, item: Item) -> None:
+        """Put an item, replacing the one waiting in the mailbox (if any)
+
+        Args:
+            item (Item): Posted item
+        """
+        with self._lock:
+            if self._item is not None:
+                self.superseded += 1
+            self._item = item
+            self.posted += 1
+
+    def take(self) -> Optional[Item]:
+        """Take the newest item without waiting
+
+        Returns:
+            Optional[Item]: The newest item, or None if nothing was posted since
+            the last take
+        """
+        with self._lock:
+            item, self._item = self._item, None
+        return item
@@ -0,0 +1,220 @@
+"""Registry of pipeline performance metrics with JSON and Prometheus export"""
+from typing import Any, Deque, Dict, Iterator, Sequence
+from collections import deque
+from contextlib import contextmanager
+import threading
+import json
+import time
+
+import numpy as np
+
+QUANTILES: Sequence[float] = (0.5, 0.95, 0.99)
+
+
+class StageTimings:
+    """Durations of a pipeline stage, with percentiles over a rolling window
+    of the latest samples, and a count and sum over all samples"""
+
+    def __init__(self, window: int = 1000) -> None:
+        """Construct stage timings
+
+        Args:
+            window (int, optional): Number of latest samples used for percentiles.
+            Defaults to 1000.
+        """
+        assert window > 0, "Window must be a positive number of samples"
+        self.count = 0
+        self.total = 0.0
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        """Record a single duration"""
+        self.count += 1
+        self.total += seconds
+        self._samples.append(seconds)
+
+    def percentiles(self, quantiles: Sequence[float] = QUANTILES) -> Dict[float, float]:
+        """Get percentiles of the durations in the rolling window
+
+        Args:
+            quantiles (Sequence[float], optional): Quantiles between 0 and 1.
+            Defaults to p50, p95 and p99.
+
+        Returns:
+            Dict[float, float]: Duration in seconds of each quantile (zeros if empty)
+        """
+        if not self._samples:
+            return {quantile: 0.0 for quantile in quantiles}
+        values = np.percentile(
+            np.fromiter(self._samples, float), np.multiply(quantiles, 100)
+        )
+        return dict(zip(quantiles, values.tolist()))
+
+    def summary(self) -> Dict[str, float]:
+        """Count, mean and percentiles of the durations"""
+        percentiles = self.percentiles()
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": percentiles[0.5],
+            "p95": percentiles[0.95],
+            "p99": percentiles[0.99],
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe registry of per-stage timings, counters and gauges.
+
+    Stages are timed with ``time`` (a context manager) or ``observe``. Counters
+    only go up (e.g. dropped frames), while gauges hold the latest value
+    (e.g. queue depths). A ``snapshot`` of all metrics can be exported with
+    ``to_json`` or ``to_prometheus``.
+    """
+
+    def __init__(self, window: int = 1000) -> None:
+        """Construct metrics registry
+
+        Args:
+            window (int, optional): Number of latest samples per stage used for
+            percentiles. Defaults to 1000.
+        """
+        self.window = window
+        self._stages: Dict[str, StageTimings] = {}
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """Record the duration of a stage
+
+        Args:
+            stage (str): Name of the stage, e.g. "inference"
+            seconds (float): Duration in seconds
+        """
+        with self._lock:
+            if stage not in self._stages:
+                self._stages[stage] = StageTimings(self.window)
+            self._stages[stage].observe(seconds)
+
+    @contextmanager
+    def time(self, stage: str) -> Iterator[None]:
+        """Time the enclosed block as a stage
+
+        Args:
+            stage (str): Name of the stage, e.g. "inference"
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """Increase a counter
+
+        Args:
+            name (str): Name of the counter, e.g. "dropped_frames"
+            value (float, optional): Non-negative increment. Defaults to 1.
+        """
+        if value < 0:
+            raise ValueError("Counters can only be increased")
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """Set the current value of a gauge
+
+        Args:
+            name (str): Name of the gauge, e.g. "queue_depth"
+            value (float): Current value
+        """
+        with self._lock:
+            self._gauges[name] = value
+
+    def stage(self, stage: str) -> Dict[str, float]:
+        """Get the summary of a stage (zeros if it was never observed)"""
+        with self._lock:
+            timings = self._stages.get(stage, StageTimings(self.window))
+            return timings.summary()
+
+    def counter(self, name: str) -> float:
+        """Get the value of a counter (zero if it was never increased)"""
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def gauge(self, name: str) -> float:
+        """Get the value of a gauge (zero if it was never set)"""
+        with self._lock:
+            return self._gauges.get(name, 0)
+
+    def reset(self) -> None:
+        """Forget all recorded metrics"""
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+            self._gauges.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get all metrics as a dictionary
+
+        Returns:
+            Dict[str, Any]: Summaries of ``stages`` in seconds, along with
+            ``counters`` and ``gauges`` values
+        """
+        with self._lock:
+            return {
+                "stages": {
+                    name: timings.summary() for name, timings in self._stages.items()
+                },
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+            }
+
+    def to_json(self) -> str:
+        """Export all metrics as a JSON object"""
+        return json.dumps(self.snapshot())
+
+    def to_prometheus(self, namespace: str = "dronevis") -> str:
+        """Export all metrics in the Prometheus text exposition format
+
+        Stages are exported as a single summary with a ``stage`` label, while
+        counters and gauges are exported under their own names.
+
+        Args:
+            namespace (str, optional): Prefix of metric names. Defaults to "dronevis".
+
+        Returns:
+            str: Metrics text
+        """
+        with self._lock:
+            stages = {
+                name: (timings.percentiles(), timings.count, timings.total)
+                for name, timings in self._stages.items()
+            }
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+
+        lines = []
+        if stages:
+            metric = f"{namespace}_stage_seconds"
+            lines.append(f"# HELP {metric} Duration of video pipeline stages")
+            lines.append(f"# TYPE {metric} summary")
+            for name, (percentiles, count, total) in stages.items():
+                for quantile, value in percentiles.items():
+                    lines.append(
+                        f'{metric}{{stage="{name}",quantile="{quantile}"}} {value}'
+                    )
+                lines.append(f'{metric}_sum{{stage="{name}"}} {total}')
+                lines.append(f'{metric}_count{{stage="{name}"}} {count}')
+
+        for name, value in counters.items():
+            metric = f"{namespace}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+
+        for name, value in gauges.items():
+            metric = f"{namespace}_{name}"
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {value}")
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,405 @@
+"""Record and replay of drone sessions (navdata, AT commands and video)
+
+Sessions are written to a single append-only container:
+
+- a file header (``MAGIC`` and version),
+- records made of a stream id, a timestamp (seconds since the start of the
+  recording) and a size, followed by their payload: raw navdata datagrams, sent
+  AT command datagrams, or JPEG encoded video frames,
+- an index of every record (a numpy structured array) and a footer pointing to
+  it, written when the recorder is closed.
+
+Readers memory-map the container and return payloads as views of the map. If a
+recording was not closed (e.g. the process crashed), its index is rebuilt by
+scanning the records.
+
+Recordings replay through ``ReplayCapture``, a drop-in for ``cv2.VideoCapture``
+used by the video thread and the headless pipeline (see ``open_capture``), and
+``DatagramReplay``, which feeds datagrams to the navdata handlers or to a UDP
+port, at original speed or as fast as possible.
+"""
+from enum import IntEnum
+from typing import Callable, Iterator, List, Optional, Tuple, Union
+import logging
+import mmap
+import os
+import socket
+import struct
+import threading
+import time
+
+import cv2
+import numpy as np
+
+_LOG = logging.getLogger(__name__)
+
+MAGIC = b"DRONEVIS"
+VERSION = 1
+RECORDING_SUFFIX = ".dvrec"
+_FILE_HEADER = struct.Struct("=8sI")  # magic, version
+_RECORD = struct.Struct("=BdI")  # stream, timestamp, payload size
+_FOOTER = struct.Struct("=QQ8s")  # index offset, number of records, magic
+_FOOTER_MAGIC = b"DVRINDEX"
+INDEX_DTYPE = np.dtype(
+    [("stream", "u1"), ("timestamp", "f8"), ("offset", "u8"), ("size", "u4")]
+)
+
+
+class Stream(IntEnum):
+    """Streams of a recording"""
+
+    NAVDATA = 0  # Received navdata datagrams
+    COMMAND = 1  # Sent AT command datagrams
+    FRAME = 2  # JPEG encoded video frames
+
+
+class SessionRecorder:
+    """Thread-safe writer of timestamped session records"""
+
+    def __init__(self, path: str, jpeg_quality: int = 90) -> None:
+        """Create the recording
+
+        Args:
+            path (str): Path of the container, usually ending with ``.dvrec``
+            jpeg_quality (int, optional): Quality of the recorded video frames.
+            Defaults to 90.
+        """
+        self.path = path
+        self.jpeg_quality = jpeg_quality
+        self._file = open(path, "wb")  # pylint: disable=consider-using-with
+        self._file.write(_FILE_HEADER.pack(MAGIC, VERSION))
+        self._offset = _FILE_HEADER.size
+        self._index: List[Tuple[int, float, int, int]] = []
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        self.closed = False
+
+    def __len__(self) -> int:
+        """Number of written records"""
+        return len(self._index)
+
+    def record(
+        self,
+        stream: Stream,
+        payload: Union[bytes, memoryview],
+        timestamp: Optional[float] = None,
+    ) -> None:
+        """Write a record
+
+        Args:
+            stream (Stream): Stream of the record
+            payload (Union[bytes, memoryview]): Content of the record
+            timestamp (Optional[float], optional): Monotonic time of the record.
+            Defaults to None (now).
+        """
+        when = (time.monotonic() if timestamp is None else timestamp) - self._start
+        size = len(payload)
+        with self._lock:
+            if self.closed:
+                return
+            self._file.write(_RECORD.pack(stream, when, size))
+            self._file.write(payload)
+            self._index.append((stream, when, self._offset + _RECORD.size, size))
+            self._offset += _RECORD.size + size
+
+    def record_navdata(self, packet: Union[bytes, memoryview]) -> None:
+        """Write a received navdata datagram"""
+        self.record(Stream.NAVDATA, packet)
+
+    def record_command(self, datagram: Union[bytes, memoryview]) -> None:
+        """Write a sent AT commands datagram"""
+        self.record(Stream.COMMAND, datagram)
+
+    def record_frame(self, frame: np.ndarray) -> None:
+        """Encode a video frame in JPEG, then write it"""
+        timestamp = time.monotonic()
+        status, jpeg = cv2.imencode(
+            ".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), self.jpeg_quality]
+        )
+        if not status:
+            _LOG.warning("Could not encode a recorded frame")
+            return
+        self.record(Stream.FRAME, jpeg.data, timestamp)
+
+    def close(self) -> None:
+        """Write the index, then close the recording"""
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+            index = np.array(self._index, dtype=INDEX_DTYPE)
+            self._file.write(index.tobytes())
+            self._file.write(_FOOTER.pack(self._offset, len(index), _FOOTER_MAGIC))
+            self._file.close()
+        _LOG.info("Recorded %d records to %s", len(index), self.path)
+
+    def __enter__(self) -> "SessionRecorder":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+
+class SessionRecording:
+    """Memory-mapped reader of a recording.
+
+    Payloads are views of the map, which should be released (or copied) before
+    closing the recording.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Map the recording and load its index
+
+        Args:
+            path (str): Path of the container
+
+        Raises:
+            IOError: The file is not a recording
+        """
+        self.path = path
+        self._file = open(path, "rb")  # pylint: disable=consider-using-with
+        size = os.fstat(self._file.fileno()).st_size
+        if size < _FILE_HEADER.size:
+            self._file.close()
+            err_message = f"{path} is not a dronevis recording"
+            _LOG.critical(err_message)
+            raise IOError(err_message)
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = _FILE_HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            err_message = f"{path} is not a dronevis recording (version {VERSION})"
+            _LOG.critical(err_message)
+            raise IOError(err_message)
+        self.index = self._load_index(size)
+
+    def _load_index(self, size: int) -> np.ndarray:
+        """Read the index of the footer, or rebuild it by scanning records"""
+        if size >= _FILE_HEADER.size + _FOOTER.size:
+            offset, count, magic = _FOOTER.unpack_from(self._map, size - _FOOTER.size)
+            if magic == _FOOTER_MAGIC:
+                return np.frombuffer(
+                    self._map, dtype=INDEX_DTYPE, count=count, offset=offset
+                ).copy()
+
+        _LOG.warning("Recording %s has no index, scanning records", self.path)
+        records = []
+        offset = _FILE_HEADER.size
+        while offset + _RECORD.size <= size:
+            stream, timestamp, length = _RECORD.unpack_from(self._map, offset)
+            if offset + _RECORD.size + length > size:
+                break  # Truncated record
+            records.append((stream, timestamp, offset + _RECORD.size, length))
+            offset += _RECORD.size + length
+        return np.array(records, dtype=INDEX_DTYPE)
+
+    def __len__(self) -> int:
+        """Number of records"""
+        return len(self.index)
+
+    @property
+    def duration(self) -> float:
+        """Time between the first and the last records"""
+        if not len(self.index):
+            return 0.0
+        return float(self.index["timestamp"].max() - self.index["timestamp"].min())
+
+    def select(self, stream: Stream) -> np.ndarray:
+        """Get the index entries of a stream, in recording order"""
+        return self.index[self.index["stream"] == stream]
+
+    def payload(self, entry: np.void) -> memoryview:
+        """Get a view of the payload of an index entry"""
+        offset = int(entry["offset"])
+        return memoryview(self._map)[offset : offset + int(entry["size"])]
+
+    def records(self, stream: Stream) -> Iterator[Tuple[float, memoryview]]:
+        """Iterate over the timestamps and payloads of a stream"""
+        for entry in self.select(stream):
+            yield float(entry["timestamp"]), self.payload(entry)
+
+    def frame(self, entry: np.void) -> np.ndarray:
+        """Decode the video frame of an index entry"""
+        with self.payload(entry) as jpeg:
+            return cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+    def close(self) -> None:
+        """Unmap the recording"""
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> "SessionRecording":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+
+class _Pacer:
+    """Wait for the recorded time of records, relative to the first one"""
+
+    def __init__(self, realtime: bool) -> None:
+        self.realtime = realtime
+        self._origin: Optional[Tuple[float, float]] = None
+
+    def wait(self, timestamp: float) -> None:
+        """Sleep until the replay time of a record"""
+        if not self.realtime:
+            return
+        if self._origin is None:
+            self._origin = (time.monotonic(), timestamp)
+        start, first = self._origin
+        delay = start + timestamp - first - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class ReplayCapture:
+    """Video capture replaying the frames of a recording, as a drop-in for
+    ``cv2.VideoCapture``.
+
+    Frames are paced by their recorded timestamps in ``realtime`` mode, and
+    read as fast as possible otherwise. The capture reports its frame count,
+    but no frame rate, as it paces itself.
+    """
+
+    def __init__(
+        self, recording: Union[str, SessionRecording], realtime: bool = True
+    ) -> None:
+        """Open recording
+
+        Args:
+            recording (Union[str, SessionRecording]): Path or opened recording
+            realtime (bool, optional): Whether to replay frames at their recorded
+            pace. Defaults to True.
+        """
+        self._owned = isinstance(recording, str)
+        self.recording = (
+            SessionRecording(recording) if isinstance(recording, str) else recording
+        )
+        self._frames = self.recording.select(Stream.FRAME)
+        self._position = 0
+        self._pacer = _Pacer(realtime)
+        self._opened = True
+
+    def isOpened(self) -> bool:  # pylint: disable=invalid-name
+        """Whether the capture can be read"""
+        return self._opened
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """Read the next frame
+
+        Returns:
+            Tuple[bool, Optional[np.ndarray]]: status which is ``False`` once every
+            frame was read, and the frame
+        """
+        if not self._opened or self._position >= len(self._frames):
+            return False, None
+        entry = self._frames[self._position]
+        self._position += 1
+        self._pacer.wait(float(entry["timestamp"]))
+        return True, self.recording.frame(entry)
+
+    def get(self, prop: int) -> float:
+        """Get a capture property (frame count, position, size)"""
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return float(len(self._frames))
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return float(self._position)
+        if prop in (cv2.CAP_PROP_FRAME_WIDTH, cv2.CAP_PROP_FRAME_HEIGHT):
+            if not len(self._frames):
+                return 0.0
+            height, width = self.recording.frame(self._frames[0]).shape[:2]
+            return float(width if prop == cv2.CAP_PROP_FRAME_WIDTH else height)
+        return 0.0
+
+    def release(self) -> None:
+        """Close the capture (and the recording if it was opened by path)"""
+        if self._opened and self._owned:
+            self.recording.close()
+        self._opened = False
+
+
+def open_capture(
+    source: Union[int, str], realtime: bool = True
+) -> Union[cv2.VideoCapture, ReplayCapture]:
+    """Open a video source, replaying recordings with ``ReplayCapture``
+
+    Args:
+        source (Union[int, str]): Camera index, video file, stream URL or recording
+        realtime (bool, optional): Whether to replay recordings at their recorded
+        pace. Defaults to True.
+
+    Returns:
+        Union[cv2.VideoCapture, ReplayCapture]: Opened capture
+    """
+    if isinstance(source, str) and source.endswith(RECORDING_SUFFIX):
+        return ReplayCapture(source, realtime)
+    return cv2.VideoCapture(source)
+
+
+DatagramHandler = Callable[[memoryview, float], None]
+
+
+class DatagramReplay(threading.Thread):
+    """Replay the datagrams of a stream to a handler or to a UDP address.
+
+    Handlers have the signature of the navdata handlers, which take the
+    datagram and its reception time (``time.perf_counter()``), e.g.
+    ``AsyncDrone.handle_navdata``. Sending to a UDP address feeds the navdata
+    thread (or the simulator with the commands stream) through its socket.
+    """
+
+    def __init__(
+        self,
+        recording: SessionRecording,
+        target: Union[DatagramHandler, Tuple[str, int]],
+        stream: Stream = Stream.NAVDATA,
+        realtime: bool = True,
+    ) -> None:
+        """Construct replay thread
+
+        Args:
+            recording (SessionRecording): Opened recording
+            target (Union[DatagramHandler, Tuple[str, int]]): Handler or UDP address
+            stream (Stream, optional): Replayed stream. Defaults to Stream.NAVDATA.
+            realtime (bool, optional): Whether to replay datagrams at their recorded
+            pace. Defaults to True.
+        """
+        super().__init__(daemon=True)
+        self.recording = recording
+        self.target = target
+        self.stream = stream
+        self.realtime = realtime
+        self.running = True
+        self.replayed = 0
+
+    def run(self) -> None:
+        """Replay the stream until it ends or the thread is stopped"""
+        sock: Optional[socket.socket] = None
+        handler = self.target
+        if not callable(handler):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            address = handler
+
+            def send(datagram: memoryview, _: float) -> None:
+                sock.sendto(datagram, address)  # type: ignore[union-attr]
+
+            handler = send
+
+        pacer = _Pacer(self.realtime)
+        try:
+            for timestamp, datagram in self.recording.records(self.stream):
+                if not self.running:
+                    break
+                pacer.wait(timestamp)
+                with datagram:
+                    handler(datagram, time.perf_counter())
+                self.replayed += 1
+        finally:
+            if sock is not None:
+                sock.close()
+
+    def stop(self) -> None:
+        """Stop replaying"""
+        self.running = False
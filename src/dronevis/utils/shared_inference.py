@@ -0,0 +1,536 @@
+"""Inference backend running a model in worker processes over shared memory.
+
+Frames are copied into the slots of a shared memory ring, and workers only
+receive the slot coordinates, instead of pickled arrays. Workers return
+detections packed into compact structs, while output images of models
+without structured detections are written back into the slot of their frame.
+Hence, the Python pre- and postprocessing of models runs on other cores than
+the capture, the video loop and the GUI, without contending for their GIL.
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+import logging
+import multiprocessing
+import queue
+import struct
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from dronevis.abstract.abstract_model import CVModel
+from dronevis.abstract.detections import Detections
+from dronevis.models.model_factory import ModelFactory
+from dronevis.utils.drawing import draw_detections
+from dronevis.utils.general import write_fps
+
+_LOG = logging.getLogger(__name__)
+
+ModelOutput = Union[Detections, np.ndarray]
+
+# Kinds of worker messages
+_READY = 0
+_DETECTIONS = 1
+_IMAGE_IN_SLOT = 2
+_IMAGE = 3
+_ERROR = 4
+
+# Detections: count, masks height and width, keypoints per detection and values
+# per keypoint (zeros without masks or keypoints)
+_DETECTIONS_HEADER = struct.Struct("=5I")
+
+
+def pack_detections(detections: Detections) -> bytes:
+    """Pack detections into a compact struct: a header, then the arrays bytes
+    (boxes and scores as float32, class ids as int64, masks as packed bits,
+    keypoints as float32)
+
+    Args:
+        detections (Detections): Detections on an image
+
+    Returns:
+        bytes: Packed detections
+    """
+    count = len(detections)
+    mask_h = mask_w = points = values = 0
+    parts = [
+        np.ascontiguousarray(detections.boxes, dtype=np.float32).tobytes(),
+        np.ascontiguousarray(detections.scores, dtype=np.float32).tobytes(),
+        np.ascontiguousarray(detections.class_ids, dtype=np.int64).tobytes(),
+    ]
+    if detections.masks is not None:
+        mask_h, mask_w = detections.masks.shape[1:]
+        parts.append(np.packbits(detections.masks.astype(bool)).tobytes())
+    if detections.keypoints is not None:
+        points, values = detections.keypoints.shape[1:]
+        parts.append(
+            np.ascontiguousarray(detections.keypoints, dtype=np.float32).tobytes()
+        )
+    header = _DETECTIONS_HEADER.pack(count, mask_h, mask_w, points, values)
+    return header + b"".join(parts)
+
+
+def unpack_detections(packed: bytes) -> Detections:
+    """Unpack detections packed by ``pack_detections``
+
+    Args:
+        packed (bytes): Packed detections
+
+    Returns:
+        Detections: Detections backed by the packed bytes
+    """
+    count, mask_h, mask_w, points, values = _DETECTIONS_HEADER.unpack_from(packed)
+    offset = _DETECTIONS_HEADER.size
+
+    def take(dtype: Any, size: int) -> np.ndarray:
+        nonlocal offset
+        array = np.frombuffer(packed, dtype=dtype, count=size, offset=offset)
+        offset += array.nbytes
+        return array
+
+    detections = Detections(
+        boxes=take(np.float32, count * 4).reshape(count, 4),
+        scores=take(np.float32, count),
+        class_ids=take(np.int64, count),
+    )
+    if mask_h:
+        size = count * mask_h * mask_w
+        bits = take(np.uint8, (size + 7) // 8)
+        detections.masks = (
+            np.unpackbits(bits, count=size).astype(bool).reshape(count, mask_h, mask_w)
+        )
+    if points:
+        detections.keypoints = take(np.float32, count * points * values).reshape(
+            count, points, values
+        )
+    return detections
+
+
+class FrameRing:
+    """Shared memory block split into fixed-size frame slots"""
+
+    def __init__(self, slots: int, slot_size: int, name: Optional[str] = None):
+        """Create the block, or attach to an existing one by name
+
+        Args:
+            slots (int): Number of slots
+            slot_size (int): Size of a slot in bytes
+            name (Optional[str], optional): Name of an existing block. Defaults to
+            None (create a block).
+        """
+        self.slots = slots
+        self.slot_size = slot_size
+        self.owner = name is None
+        self.memory = shared_memory.SharedMemory(
+            name=name, create=self.owner, size=slots * slot_size
+        )
+
+    @property
+    def name(self) -> str:
+        """Name of the shared memory block"""
+        return self.memory.name
+
+    def view(self, slot: int, shape: Tuple[int, ...], dtype: Any) -> np.ndarray:
+        """Array view of a slot
+
+        Args:
+            slot (int): Index of the slot
+            shape (Tuple[int, ...]): Shape of the array
+            dtype (Any): Type of the array
+
+        Returns:
+            np.ndarray: View backed by the shared memory
+        """
+        return np.ndarray(
+            shape, dtype=dtype, buffer=self.memory.buf, offset=slot * self.slot_size
+        )
+
+    def close(self) -> None:
+        """Detach from the block, and free it if it was created here"""
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+
+def _worker(model_name: str, tasks: Any, results: Any) -> None:
+    """Load a model, then run it on the frames of the tasks until a None task"""
+    # pylint: disable=broad-exception-caught
+    try:
+        model = ModelFactory.create_model(model_name)
+    except Exception as error:
+        results.put((_READY, None, f"{type(error).__name__}: {error}"))
+        return
+    results.put((_READY, model.supports_detect, model.class_names))
+
+    rings: Dict[str, FrameRing] = {}
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        request, ring_name, slots, slot_size, slot, shape, dtype = task
+        try:
+            if ring_name not in rings:
+                rings[ring_name] = FrameRing(slots, slot_size, ring_name)
+            frame = rings[ring_name].view(slot, shape, dtype)
+            if model.supports_detect:
+                frame.flags.writeable = False
+                results.put(
+                    (request, _DETECTIONS, pack_detections(model.detect(frame)))
+                )
+                continue
+            output = model.predict(frame)
+            if output.shape == frame.shape and output.dtype == frame.dtype:
+                if output is not frame:
+                    frame[...] = output
+                results.put((request, _IMAGE_IN_SLOT, None))
+            else:
+                results.put((request, _IMAGE, output))
+        except Exception as error:
+            results.put((request, _ERROR, f"{type(error).__name__}: {error}"))
+    for ring in rings.values():
+        ring.close()
+
+
+class SharedMemoryBackend:
+    """Pool of worker processes running the same model on submitted frames.
+
+    Each worker loads the model once. Submitting a frame copies it into a free
+    slot of the ring and returns a future, so several frames can be in flight
+    (one per worker keeps every core busy). Submitting waits for a free slot
+    when all of them are in flight.
+
+    The ring is allocated for the first submitted frame, hence later frames
+    must not be larger.
+
+    Workers are checked every ``poll_interval`` seconds. If one of them exits,
+    the backend is broken: pending requests fail with ``RuntimeError``, and so
+    do later submissions.
+    """
+
+    poll_interval = 0.5
+
+    def __init__(
+        self,
+        model_name: str,
+        workers: int = 2,
+        slots: Optional[int] = None,
+        start_method: str = "spawn",
+        load_timeout: float = 300.0,
+    ) -> None:
+        """Start the workers, and wait for their model to be loaded
+
+        Args:
+            model_name (str): Name of the model in ``models_list``
+            workers (int, optional): Number of worker processes. Defaults to 2.
+            slots (Optional[int], optional): Number of frames in flight. Defaults to
+            None (two per worker).
+            start_method (str, optional): Start method of the worker processes.
+            Defaults to "spawn".
+            load_timeout (float, optional): Seconds to wait for the workers to load
+            the model. Defaults to 300.0.
+
+        Raises:
+            RuntimeError: Workers could not load the model
+        """
+        assert workers > 0, "Workers must be a positive number of processes"
+        self.model_name = model_name
+        self.slots = slots if slots is not None else 2 * workers
+        self.supports_detect = False
+        self.class_names: Optional[Sequence[str]] = None
+        self.ring: Optional[FrameRing] = None
+        context = multiprocessing.get_context(start_method)
+        self._tasks = context.Queue()
+        self._results = context.Queue()
+        self._workers = [
+            context.Process(
+                target=_worker,
+                args=(model_name, self._tasks, self._results),
+                name=f"InferenceWorker-{index}",
+                daemon=True,
+            )
+            for index in range(workers)
+        ]
+        self._free: "queue.Queue[int]" = queue.Queue()
+        for slot in range(self.slots):
+            self._free.put(slot)
+        self._pending: Dict[int, Tuple[Future, int, Tuple[int, ...], Any]] = {}
+        self._request = 0
+        self._error: Optional[str] = None  # set once the backend can't run requests
+        self._lock = threading.Lock()
+
+        for worker in self._workers:
+            worker.start()
+        try:
+            self._wait_ready(load_timeout)
+        except Exception:
+            self.close()
+            raise
+        self._collector = threading.Thread(
+            target=self._collect, name="InferenceCollector", daemon=True
+        )
+        self._collector.start()
+
+    def _wait_ready(self, timeout: float) -> None:
+        """Wait for every worker to load the model"""
+        deadline = time.monotonic() + timeout
+        ready = 0
+        while ready < len(self._workers):
+            remaining = deadline - time.monotonic()
+            try:
+                _, supports_detect, info = self._results.get(
+                    timeout=max(min(remaining, self.poll_interval), 0)
+                )
+            except queue.Empty as error:
+                dead_worker = self._dead_worker()
+                if dead_worker is None and remaining > 0:
+                    continue
+                reason = dead_worker if dead_worker is not None else "timed out"
+                err_message = f"Workers couldn't load model {self.model_name}: {reason}"
+                _LOG.critical(err_message)
+                raise RuntimeError(err_message) from error
+            ready += 1
+            if supports_detect is None:
+                err_message = f"Workers couldn't load model {self.model_name}: {info}"
+                _LOG.critical(err_message)
+                raise RuntimeError(err_message)
+            self.supports_detect = supports_detect
+            self.class_names = info
+
+    def submit(self, frame: np.ndarray) -> "Future[ModelOutput]":
+        """Run the model on a frame in a worker
+
+        Args:
+            frame (np.ndarray): Input image
+
+        Raises:
+            ValueError: Frame is larger than the ring slots
+            RuntimeError: Backend is closed, or one of its workers exited
+
+        Returns:
+            Future[ModelOutput]: Detections, or the output image of models without
+            structured detections
+        """
+        with self._lock:
+            if self.ring is None:
+                self.ring = FrameRing(self.slots, frame.nbytes)
+        ring = self.ring
+        if frame.nbytes > ring.slot_size:
+            err_message = "Frame is larger than the first frame of the backend"
+            _LOG.critical(err_message)
+            raise ValueError(err_message)
+
+        slot = self._take_slot()
+        ring.view(slot, frame.shape, frame.dtype)[...] = frame
+        future: "Future[ModelOutput]" = Future()
+        with self._lock:
+            if self._error is not None:
+                self._free.put(slot)
+                raise RuntimeError(self._error)
+            self._request += 1
+            request = self._request
+            self._pending[request] = (future, slot, frame.shape, frame.dtype)
+        self._tasks.put(
+            (
+                request,
+                ring.name,
+                ring.slots,
+                ring.slot_size,
+                slot,
+                frame.shape,
+                frame.dtype.str,
+            )
+        )
+        return future
+
+    def _take_slot(self) -> int:
+        """Wait for a free ring slot, unless the backend is broken"""
+        while self._error is None:
+            try:
+                return self._free.get(timeout=self.poll_interval)
+            except queue.Empty:
+                continue
+        raise RuntimeError(self._error)
+
+    def map(self, frames: Sequence[np.ndarray]) -> List[ModelOutput]:
+        """Run the model on frames across the workers, and wait for the outputs"""
+        futures = [self.submit(frame) for frame in frames]
+        return [future.result() for future in futures]
+
+    def _collect(self) -> None:
+        """Resolve the futures of the requests processed by the workers"""
+        while True:
+            try:
+                message = self._results.get(timeout=self.poll_interval)
+            except queue.Empty:
+                dead_worker = self._dead_worker()
+                if dead_worker is not None and self._error is None:
+                    err_message = f"Worker of model {self.model_name}: {dead_worker}"
+                    _LOG.critical(err_message)
+                    self._fail_pending(err_message)
+                    break
+                continue
+            if message is None:
+                break
+            request, kind, payload = message
+            with self._lock:
+                if request not in self._pending:  # already failed
+                    continue
+                future, slot, shape, dtype = self._pending.pop(request)
+            try:
+                if kind == _DETECTIONS:
+                    future.set_result(unpack_detections(payload))
+                elif kind == _IMAGE_IN_SLOT:
+                    assert self.ring is not None
+                    future.set_result(self.ring.view(slot, shape, dtype).copy())
+                elif kind == _IMAGE:
+                    future.set_result(payload)
+                else:
+                    future.set_exception(RuntimeError(payload))
+            finally:
+                self._free.put(slot)
+
+    def _dead_worker(self) -> Optional[str]:
+        """Describe the first worker which exited, if any"""
+        for worker in self._workers:
+            if not worker.is_alive():
+                return f"{worker.name} exited with code {worker.exitcode}"
+        return None
+
+    def _fail_pending(self, err_message: str) -> None:
+        """Break the backend, fail the pending requests and free their slots"""
+        with self._lock:
+            if self._error is None:
+                self._error = err_message
+            pending, self._pending = self._pending, {}
+        for future, slot, *_ in pending.values():
+            future.set_exception(RuntimeError(self._error))
+            self._free.put(slot)
+
+    def close(self) -> None:
+        """Stop the workers, fail the pending requests and free the ring"""
+        with self._lock:
+            if self._error is None:
+                self._error = "Inference backend closed"
+        for _ in self._workers:
+            self._tasks.put(None)
+        for worker in self._workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+        collector = getattr(self, "_collector", None)
+        if collector is not None and collector.is_alive():
+            self._results.put(None)
+            collector.join(timeout=5)
+        self._fail_pending("Inference backend closed")
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+    def __enter__(self) -> "SharedMemoryBackend":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+
+class ProcessModel(CVModel):
+    """Model running in worker processes through a ``SharedMemoryBackend``,
+    usable in place of the model it runs (e.g. by the video thread, whose
+    micro-batches are spread across the workers)"""
+
+    def __init__(self, model_name: str, workers: int = 2) -> None:
+        """Construct model, without starting the workers
+
+        Args:
+            model_name (str): Name of the model in ``models_list``
+            workers (int, optional): Number of worker processes. Defaults to 2.
+        """
+        self.model_name = model_name
+        self.workers = workers
+        self.backend: Optional[SharedMemoryBackend] = None
+
+    def load_model(self) -> None:
+        """Start the workers, each loading the model"""
+        if self.backend is None:
+            self.backend = SharedMemoryBackend(self.model_name, self.workers)
+
+    def _started(self) -> SharedMemoryBackend:
+        """Backend, started on first use"""
+        if self.backend is None:
+            self.load_model()
+            assert self.backend is not None
+        return self.backend
+
+    @property
+    def supports_detect(self) -> bool:
+        """Whether the model run by the workers implements ``detect``"""
+        return self._started().supports_detect
+
+    @property
+    def class_names(self) -> Optional[Sequence[str]]:
+        """Names indexed by the class ids of the model run by the workers"""
+        return self._started().class_names
+
+    def transform_img(self, image: np.ndarray) -> np.ndarray:
+        """Images are transformed by the workers"""
+        return image
+
+    def detect(self, image: np.ndarray) -> Detections:
+        """Get the detections of the model on an image"""
+        if not self.supports_detect:
+            return super().detect(image)
+        return self._started().submit(image).result()
+
+    def predict(self, image: np.ndarray) -> np.ndarray:
+        """Get the output image of the model on an image"""
+        return self.render(image, self._started().submit(image).result())
+
+    def predict_batch(self, images: Sequence[np.ndarray]) -> List[ModelOutput]:
+        """Run the model on images across the workers, to be drawn with ``render``"""
+        return self._started().map(images)
+
+    def render(self, image: np.ndarray, detections: ModelOutput) -> np.ndarray:
+        """Draw detections on the image, or get the output image of models without
+        structured detections"""
+        if isinstance(detections, np.ndarray):
+            return detections
+        return draw_detections(image, detections, self.class_names)
+
+    def close(self) -> None:
+        """Stop the workers"""
+        if self.backend is not None:
+            self.backend.close()
+            self.backend = None
+
+    def detect_webcam(
+        self, video_index: Union[int, str] = 0, window_name: str = "Cam Detection"
+    ) -> None:
+        """Run inference on webcam stream
+
+        Args:
+            video_index (Union[int, str], optional): Index of the video streaming
+            device. Defaults to 0.
+            window_name (str, optional): Name of stream window.
+            Defaults to "Cam Detection".
+        """
+        cap = cv2.VideoCapture(video_index)
+        if not cap.isOpened():
+            _LOG.error("Could not open video capture")
+            return
+
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+
+            prev_time = time.perf_counter()
+            frame = self.predict(frame)
+            fps = 1 / (time.perf_counter() - prev_time)
+            cv2.imshow(window_name, write_fps(frame, fps))
+            if cv2.waitKey(1) & 0xFF == ord("q"):
+                break
+
+        cap.release()
+        cv2.destroyAllWindows()
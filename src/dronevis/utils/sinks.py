@@ -0,0 +1,173 @@
+"""Output sinks and metrics endpoint for the headless video pipeline"""
+from typing import IO, Optional, Sequence
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import logging
+import json
+
+import cv2
+import numpy as np
+
+from dronevis.abstract.abstract_sink import Sink
+from dronevis.abstract.detections import Detections
+from dronevis.utils.metrics import MetricsRegistry
+
+_LOG = logging.getLogger(__name__)
+
+
+class JSONLSink(Sink):
+    """Log detections of each frame as a JSON line"""
+
+    def __init__(self, path: str, class_names: Optional[Sequence[str]] = None) -> None:
+        """Open the log file
+
+        Args:
+            path (str): Path of the JSON lines file
+            class_names (Optional[Sequence[str]], optional): Names indexed by class id
+            to be logged along with the ids. Defaults to None.
+        """
+        self.path = path
+        self.class_names = class_names
+        self._file: IO[str] = open(path, "w", encoding="utf-8")
+
+    def write(
+        self,
+        frame_index: int,
+        timestamp: float,
+        detections: Optional[Detections],
+        image: Optional[np.ndarray],
+    ) -> None:
+        """Write the detections of a frame as a single JSON line"""
+        record = {"frame": frame_index, "time": round(timestamp, 6)}
+        if detections is not None:
+            record["boxes"] = np.round(detections.boxes, 2).tolist()
+            record["scores"] = np.round(detections.scores, 4).tolist()
+            record["class_ids"] = detections.class_ids.tolist()
+            if self.class_names is not None:
+                record["classes"] = [
+                    self.class_names[class_id] for class_id in detections.class_ids
+                ]
+            if detections.keypoints is not None:
+                record["keypoints"] = np.round(detections.keypoints, 2).tolist()
+        self._file.write(json.dumps(record) + "\n")
+
+    def close(self) -> None:
+        """Close the log file"""
+        self._file.close()
+
+
+class VideoSink(Sink):
+    """Encode rendered frames into a video file"""
+
+    needs_image = True
+
+    def __init__(self, path: str, fps: float = 30.0, fourcc: str = "mp4v") -> None:
+        """Construct video sink. The writer is opened on the first frame,
+        hence the video size matches the rendered images.
+
+        Args:
+            path (str): Path of the output video
+            fps (float, optional): Frame rate of the output video. Defaults to 30.0.
+            fourcc (str, optional): Codec of the output video. Defaults to "mp4v".
+        """
+        self.path = path
+        self.fps = fps
+        self.fourcc = fourcc
+        self._writer: Optional[cv2.VideoWriter] = None
+
+    def write(
+        self,
+        frame_index: int,
+        timestamp: float,
+        detections: Optional[Detections],
+        image: Optional[np.ndarray],
+    ) -> None:
+        """Encode the rendered image of a frame"""
+        if image is None:
+            return
+        if self._writer is None:
+            height, width = image.shape[:2]
+            self._writer = cv2.VideoWriter(
+                self.path,
+                cv2.VideoWriter_fourcc(*self.fourcc),
+                self.fps,
+                (width, height),
+            )
+            if not self._writer.isOpened():
+                raise ValueError(f"Cannot open video writer for {self.path}")
+        self._writer.write(image)
+
+    def close(self) -> None:
+        """Finish encoding the video"""
+        if self._writer is not None:
+            self._writer.release()
+            self._writer = None
+
+
+class MetricsServer:
+    """HTTP endpoint serving a metrics registry in the Prometheus text format
+    on ``/metrics``, and as JSON on ``/metrics.json``"""
+
+    def __init__(
+        self,
+        metrics: MetricsRegistry,
+        host: str = "0.0.0.0",
+        port: int = 9100,
+    ) -> None:
+        """Bind the metrics endpoint
+
+        Args:
+            metrics (MetricsRegistry): Registry to be served
+            host (str, optional): Address to bind. Defaults to "0.0.0.0".
+            port (int, optional): Port to bind, 0 binds a free port. Defaults to 9100.
+        """
+        registry = metrics
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            """Handle metrics requests"""
+
+            def do_GET(self) -> None:  # pylint: disable=invalid-name
+                """Respond with the current metrics"""
+                if self.path == "/metrics":
+                    body = registry.to_prometheus().encode()
+                    content_type = "text/plain; version=0.0.4"
+                elif self.path == "/metrics.json":
+                    body = registry.to_json().encode()
+                    content_type = "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args) -> None:  # pylint: disable=W0622
+                """Log requests at debug level only"""
+                _LOG.debug(format, *args)
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        """Bound port of the endpoint"""
+        return self._server.server_address[1]
+
+    def start(self) -> None:
+        """Serve the metrics in a daemon thread"""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="MetricsServer", daemon=True
+        )
+        self._thread.start()
+        _LOG.info("Serving metrics on port %d", self.port)
+
+    def stop(self) -> None:
+        """Stop serving the metrics"""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
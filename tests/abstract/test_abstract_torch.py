@@ -73,3 +73,67 @@ def test_draw_boxes(model):
     labels = torch.tensor([0, 1]).to(dtype=torch.int32)
     res = model.draw_boxes(boxes, classes, labels, img)
     assert isinstance(res, np.ndarray)
+
+
+def test_predict_batch(model):
+    """Batched inference should return one detections result per image"""
+    images = [np.zeros((100, 100, 3), dtype=np.uint8) for _ in range(3)]
+    detections = model.predict_batch(images, detection_threshold=0.0)
+    assert len(detections) == 3
+    for frame_detections in detections:
+        assert frame_detections.boxes.shape == (len(frame_detections), 4)
+        assert frame_detections.scores.shape == (len(frame_detections),)
+        assert frame_detections.class_ids.shape == (len(frame_detections),)
+
+
+def test_predict_batch_with_different_sizes(model):
+    """Images of different sizes should still be batched in one call"""
+    images = [
+        np.zeros((100, 100, 3), dtype=np.uint8),
+        np.zeros((120, 80, 3), dtype=np.uint8),
+    ]
+    assert len(model.predict_batch(images)) == 2
+
+
+def test_predict_batch_empty(model):
+    """An empty batch should return no detections"""
+    assert model.predict_batch([]) == []
+
+
+def test_render_batch_detections(model):
+    """Detections from a batch should be drawn on their frame"""
+    img = np.zeros((100, 100, 3), dtype=np.uint8)
+    detections = model.predict_batch([img], detection_threshold=0.0)[0]
+    res = model.render(img, detections)
+    assert isinstance(res, np.ndarray)
+    assert res.shape == img.shape
+
+
+def test_draw_boxes_in_place(model):
+    """Boxes should be drawn on the uint8 input frame without copies"""
+    img = np.zeros((224, 224, 3), dtype=np.uint8)
+    boxes = np.array([[0, 0, 50, 50]])
+    labels = torch.tensor([1]).to(dtype=torch.int32)
+    res = model.draw_boxes(boxes, ["person"], labels, img)
+    assert res is img
+    assert res.dtype == np.uint8
+    assert res.any()
+
+
+def test_transform_img_reorders_channels(model):
+    """BGR uint8 frames should become RGB float tensors in [0, 1]"""
+    img = np.zeros((20, 30, 3), dtype=np.uint8)
+    img[:, :, 0] = 255  # blue channel in BGR
+    tensor = model.transform_img(img)
+    assert tensor.shape == (3, 20, 30)
+    assert tensor.dtype == torch.float32
+    assert torch.all(tensor[2] == 1.0)
+    assert torch.all(tensor[0] == 0.0)
+
+
+def test_detect_does_not_draw(model):
+    """Structured detections should leave the input frame untouched"""
+    img = np.zeros((100, 100, 3), dtype=np.uint8)
+    detections = model.detect(img, detection_threshold=0.0)
+    assert not img.any()
+    assert detections.boxes.shape == (len(detections), 4)
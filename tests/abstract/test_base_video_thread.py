@@ -106,3 +106,49 @@ def test_running_is_equal_true(vid_thread: BaseVideoThread):
     assert vid_thread.running
     vid_thread.stop()
     assert not vid_thread.running
+
+
+def wait_for_model(thread: BaseVideoThread, model_name: str, timeout: float = 10):
+    """Wait until the video thread swaps in the model"""
+    deadline = time.perf_counter() + timeout
+    while thread.model_name != model_name and time.perf_counter() < deadline:
+        time.sleep(0.01)
+
+
+def test_change_model_in_background():
+    """The new model should be loaded in the background, warmed up,
+    then swapped in while keeping the switch timings.
+    """
+    BaseVideoThread._instances = {}
+    thread = BaseVideoThread(lambda: None, lambda *args: None, "None")
+    previous_model = thread.model
+    loader = thread.change_model("HaarFaceDetector")
+    loader.join()
+    wait_for_model(thread, "HaarFaceDetector")
+
+    assert thread.model is not previous_model
+    switch = thread.last_model_switch
+    assert switch is not None
+    assert switch.model_name == "HaarFaceDetector"
+    assert switch.latency >= switch.load_time + switch.warmup_time >= 0
+    thread.close_thread()
+    thread.join()
+    BaseVideoThread._instances = {}
+
+
+def test_change_model_keeps_latest_request():
+    """Only the model of the latest request should be swapped in"""
+    BaseVideoThread._instances = {}
+    thread = BaseVideoThread(lambda: None, lambda *args: None, "None")
+    first_loader = thread.change_model("HaarFaceDetector")
+    second_loader = thread.change_model("None")
+    first_loader.join()
+    second_loader.join()
+    wait_for_model(thread, "None")
+    time.sleep(0.1)
+
+    assert thread.model_name == "None"
+    assert thread.last_model_switch.model_name == "None"
+    thread.close_thread()
+    thread.join()
+    BaseVideoThread._instances = {}
@@ -1,4 +1,5 @@
 """Testing no operation model"""
+import pytest
 import numpy as np
 
 from dronevis.abstract.noop_model import NOOPModel
@@ -22,3 +23,11 @@ def test_idle_predict():
     output_image = model.predict(image)
 
     assert np.equal(image, output_image).all()
+
+
+def test_detect_not_supported():
+    """Models without structured detections should raise on detect"""
+    model = NOOPModel()
+    assert not model.supports_detect
+    with pytest.raises(NotImplementedError):
+        model.detect(np.zeros((3, 10)))
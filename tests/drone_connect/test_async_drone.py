@@ -0,0 +1,214 @@
+"""Testing the asyncio drone against a local UDP stand-in for the drone"""
+from typing import List, Optional, Tuple
+import asyncio
+import selectors
+import socket
+import threading
+import time
+
+import pytest
+
+from dronevis.drone_connect.async_drone import AsyncDrone
+from dronevis.drone_connect.navdata_decode import (
+    NavdataDemo,
+    NavdataPacket,
+    encode_navdata,
+)
+
+DEMO = NavdataDemo(0, 75, 0.0, 0.0, 0.0, 800, 0.0, 0.0, 0.0)
+
+
+class DroneStandIn(threading.Thread):
+    """Local drone answering AT commands on a command port, and streaming
+    navdata with the ``command_ack`` bit to the client of its navdata port"""
+
+    def __init__(self, acknowledge: bool = True, navdata_period: float = 0.005):
+        super().__init__(daemon=True)
+        self.acknowledge = acknowledge
+        self.navdata_period = navdata_period
+        self.datagrams: List[str] = []
+        self.ack = False
+        self.running = True
+        self.client: Optional[Tuple[str, int]] = None
+        self.command_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.command_sock.bind(("127.0.0.1", 0))
+        self.data_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.data_sock.bind(("127.0.0.1", 0))
+        self.command_port = self.command_sock.getsockname()[1]
+        self.data_port = self.data_sock.getsockname()[1]
+
+    @property
+    def commands(self) -> List[str]:
+        """Received AT commands"""
+        return [
+            command
+            for datagram in self.datagrams
+            for command in datagram.split("\r")
+            if command
+        ]
+
+    def run(self) -> None:
+        selector = selectors.DefaultSelector()
+        selector.register(self.command_sock, selectors.EVENT_READ)
+        selector.register(self.data_sock, selectors.EVENT_READ)
+        sequence = 0
+        next_navdata = time.monotonic()
+        while self.running:
+            for key, _ in selector.select(timeout=self.navdata_period):
+                data, addr = key.fileobj.recvfrom(4096)  # type: ignore[union-attr]
+                if key.fileobj is self.data_sock:
+                    self.client = addr
+                    continue
+                datagram = data.decode()
+                self.datagrams.append(datagram)
+                if "AT*CONFIG=" in datagram and self.acknowledge:
+                    self.ack = True
+                if "AT*CTRL=" in datagram and datagram.endswith(",5,0\r"):
+                    self.ack = False
+            if self.client is not None and time.monotonic() >= next_navdata:
+                sequence += 1
+                packet = encode_navdata(
+                    int(self.ack) << 6, sequence, {"navdata_demo": DEMO}
+                )
+                self.data_sock.sendto(packet, self.client)
+                next_navdata += self.navdata_period
+        selector.close()
+        self.command_sock.close()
+        self.data_sock.close()
+
+    def stop(self) -> None:
+        self.running = False
+        self.join(timeout=1)
+
+
+@pytest.fixture
+def stand_in():
+    """Start a drone stand-in"""
+    drone = DroneStandIn()
+    drone.start()
+    yield drone
+    drone.stop()
+
+
+def make_drone(stand_in: DroneStandIn, raw_packets: bool = False) -> AsyncDrone:
+    """Construct a drone talking to the stand-in"""
+    drone = AsyncDrone(
+        "127.0.0.1",
+        command_port=stand_in.command_port,
+        data_port=stand_in.data_port,
+        local_data_port=0,
+        raw_packets=raw_packets,
+    )
+    drone.land_duration = 0.0
+    drone.config_timeout = 0.2
+    return drone
+
+
+def test_config_resolves_on_ack(stand_in: DroneStandIn):
+    """Configurations should be acknowledged through navdata, after the
+    session configurations, and navdata should reach the callback"""
+    drone = make_drone(stand_in)
+    received = []
+    drone.connect()
+    drone.set_callback(received.append)
+    try:
+        assert drone.is_connected
+        assert drone.set_config(activate_navdata=True)
+    finally:
+        drone.stop()
+
+    configs = [
+        command.split(",", 1)[1]
+        for command in stand_in.commands
+        if command.startswith("AT*CONFIG=")
+    ]
+    assert configs[0] == f'"custom:session_id","{drone.session_id}"'
+    assert configs[1] == f'"custom:profile_id","{drone.profile_id}"'
+    assert configs[2] == f'"custom:application_id","{drone.app_id}"'
+    assert configs[3] == '"general:navdata_demo","FALSE"'
+    assert received and received[-1]["navdata_demo"]["battery_percentage"] == 75
+    assert isinstance(received[-1]["drone_state"], dict)
+    assert drone.metrics.stage("navdata_latency")["count"] == len(received)
+
+
+def test_raw_packets_callback(stand_in: DroneStandIn):
+    """Callbacks should receive decoded packets once opted in"""
+    drone = make_drone(stand_in, raw_packets=True)
+    received = []
+    drone.connect()
+    drone.set_callback(received.append)
+    try:
+        assert drone.set_config(activate_navdata=True)
+    finally:
+        drone.stop()
+    assert received and isinstance(received[-1], NavdataPacket)
+    assert received[-1].drone_state.command_ack in (0, 1)
+
+
+def test_keepalive_sends_commands(stand_in: DroneStandIn):
+    """The keepalive should repeat the current command with the watchdog
+    reset, in a single datagram with increasing sequence numbers"""
+    drone = make_drone(stand_in)
+    drone.connect()
+    drone.takeoff()
+    time.sleep(0.35)
+    drone.stop()
+
+    keepalives = [
+        datagram for datagram in stand_in.datagrams if "AT*COMWDG" in datagram
+    ]
+    assert len(keepalives) >= 8
+    assert keepalives[1].startswith("AT*COMWDG=") and "AT*REF=" in keepalives[1]
+    sequences = [
+        int(command.split("=")[1].split(",")[0]) for command in stand_in.commands
+    ]
+    assert sequences == sorted(sequences)
+    assert len(set(sequences)) == len(sequences)
+    assert any("AT*REF=" in command for command in stand_in.commands[-4:])
+
+
+def test_config_without_ack_fails():
+    """Configurations which are never acknowledged should fail after retries"""
+    stand_in = DroneStandIn(acknowledge=False)
+    stand_in.start()
+    drone = make_drone(stand_in)
+    drone.config_retries = 1
+    drone.config_timeout = 0.05
+    drone.connect()
+    try:
+        assert not drone.set_config(outdoor=True)
+    finally:
+        drone.stop()
+        stand_in.stop()
+
+
+def test_asyncio_api(stand_in: DroneStandIn):
+    """Asyncio applications should run the core on their own loop"""
+
+    async def fly() -> bool:
+        drone = make_drone(stand_in)
+        await drone.start()
+        try:
+            acknowledged = await drone.configure("control:altitude_max", "3000")
+            await drone.wait_for_ack(False)
+        finally:
+            await drone.close()
+        return acknowledged
+
+    assert asyncio.run(fly())
+    assert "AT*CONFIG=" in "".join(stand_in.datagrams)
+
+
+def test_set_config_batches_settings(stand_in: DroneStandIn):
+    """Settings of several configurations should share one datagram and ACK"""
+    drone = make_drone(stand_in)
+    drone.connect()
+    try:
+        assert drone.set_config(nervosity_level=50, max_altitude=3, outdoor=True)
+    finally:
+        drone.stop()
+
+    batches = [datagram for datagram in stand_in.datagrams if "control:" in datagram]
+    assert len(batches) == 1
+    assert batches[0].count("AT*CONFIG=") == 6
+    assert batches[0].count("AT*CONFIG_IDS=") == 6
@@ -0,0 +1,41 @@
+"""Testing the preformatted AT commands encoder"""
+import struct
+
+import pytest
+
+from dronevis.drone_connect import at_encoder
+from dronevis.drone_connect.at_encoder import ATFrame, ATTemplate
+
+
+def test_templates_match_commands():
+    """Preformatted templates should encode the usual AT commands"""
+    assert at_encoder.TAKEOFF.encode(7) == b"AT*REF=7,290718208\r"
+    assert at_encoder.LAND.encode(7) == b"AT*REF=7,290717696\r"
+    assert at_encoder.EMERGENCY.encode(7) == b"AT*REF=7,290717952\r"
+    assert at_encoder.WATCHDOG.encode(7) == b"AT*COMWDG\r"
+    assert str(at_encoder.HOVER) == "AT*PCMD=#ID#,0,0,0,0,0\r"
+    assert at_encoder.as_template("AT*FTRIM=#ID#\r") == at_encoder.FLAT_TRIM
+
+
+def test_pcmd_packs_floats():
+    """Progressive commands should send floats as their binary integers"""
+    expected = [struct.unpack("=l", struct.pack("f", value))[0] for value in (0.2, -1)]
+    command = at_encoder.pcmd(0.2, -1, 0, 0.0)
+    assert command.encode(3) == b"AT*PCMD=3,1,%d,%d,0,0\r" % tuple(expected)
+    assert at_encoder.pcmd(0.2, -1, 0, 0.0) is command
+
+
+def test_frame_numbers_commands():
+    """Numbered commands of a frame should consume sequence numbers"""
+    commands = ATFrame(
+        at_encoder.WATCHDOG, at_encoder.TAKEOFF, ATTemplate(""), at_encoder.HOVER
+    )
+    datagram, sequence = commands.encode(9)
+    assert datagram == b"AT*COMWDG\rAT*REF=9,290718208\rAT*PCMD=10,0,0,0,0,0\r"
+    assert sequence == 11
+    datagram, sequence = at_encoder.frame(at_encoder.WATCHDOG).encode(sequence)
+    assert datagram == b"AT*COMWDG\r"
+    assert sequence == 11
+    assert ATTemplate('AT*CONFIG=#ID#,"key","100%"\r').encode(1).endswith(b'100%"\r')
+    with pytest.raises(ValueError):
+        ATFrame(*[at_encoder.TAKEOFF] * 60)
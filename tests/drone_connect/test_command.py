@@ -1,7 +1,11 @@
 """Test real drone command thread"""
+import socket
+import threading
+import time
+
 import pytest
 
-from dronevis.drone_connect.command import Command
+from dronevis.drone_connect.command import Command, config_batches
 
 
 @pytest.fixture
@@ -47,3 +51,124 @@ def test_stop(command):
     """Test stop"""
     assert command.stop()
     assert not command.thread_attr.running
+
+
+@pytest.fixture
+def drone_socket(monkeypatch):
+    """Local socket receiving the commands"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.settimeout(1)
+    monkeypatch.setattr(Command, "command_port", sock.getsockname()[1])
+    yield sock
+    sock.close()
+
+
+def test_heartbeat_coalesces_commands(drone_socket):
+    """Each tick should send the watchdog reset and the current
+    command in one datagram, and record its jitter"""
+    cmd = Command("127.0.0.1")
+    cmd.command("AT*REF=#ID#,290717696\r")
+    cmd.start()
+    datagrams = [drone_socket.recv(1024).decode() for _ in range(10)]
+    cmd.stop()
+    cmd.join(timeout=1)
+
+    sequences = []
+    for datagram in datagrams:
+        watchdog, ref, rest = datagram.split("\r")
+        assert watchdog == "AT*COMWDG" and rest == ""
+        sequences.append(int(ref.split("=")[1].split(",")[0]))
+    assert sequences == list(range(sequences[0], sequences[0] + 10))
+    assert cmd.metrics.stage("heartbeat_jitter")["count"] >= 10
+    assert cmd.metrics.stage("heartbeat_period")["count"] >= 9
+
+
+def test_heartbeat_keeps_period(drone_socket):
+    """Ticks should follow the deadlines of the period without drifting"""
+    cmd = Command("127.0.0.1")
+    cmd.period = 0.01
+    cmd.start()
+    start = time.monotonic()
+    for _ in range(50):
+        drone_socket.recv(1024)
+    elapsed = time.monotonic() - start
+    cmd.stop()
+    cmd.join(timeout=1)
+    # Ticks skipped after a late one are not sent
+    missed = cmd.metrics.counter("heartbeat_missed")
+    assert 0.45 <= elapsed - missed * cmd.period < 0.75
+
+
+def test_config_batches_fit_datagrams():
+    """Configurations should be packed after their session identifiers,
+    in batches fitting in a datagram"""
+    settings = [(f"control:key_{index}", "TRUE") for index in range(30)]
+    batches = config_batches(settings, "AT*CONFIG_IDS=#ID#\r", max_size=256)
+    assert len(batches) > 1
+    commands = [command for batch in batches for command in batch]
+    assert commands[::2] == ["AT*CONFIG_IDS=#ID#\r"] * 30
+    assert commands[1] == 'AT*CONFIG=#ID#,"control:key_0","TRUE"\r'
+    for batch in batches:
+        numbered = "".join(batch).replace("#ID#", "9" * 10)
+        assert len(numbered) <= 256
+    with pytest.raises(ValueError):
+        config_batches([("control:key", "x" * 300)], "", max_size=256)
+
+
+def test_configure_many_acknowledged_once(drone_socket):
+    """Configurations fitting in a datagram should wait for a single ACK"""
+    cmd = Command("127.0.0.1")
+    cmd.is_configured = True
+    cmd.activate_navdata()
+    settings = [("control:outdoor", "TRUE"), ("control:altitude_max", "3000")]
+
+    received = []
+
+    def acknowledge():
+        received.append(drone_socket.recv(1024).decode())
+        cmd.ack_command()
+
+    drone = threading.Thread(target=acknowledge)
+    drone.start()
+    assert cmd.configure_many(settings)
+    drone.join()
+    commands = received[0].split("\r")
+    assert len(commands) == 5
+    assert commands[1] == 'AT*CONFIG=11,"control:outdoor","TRUE"'
+    assert commands[3] == 'AT*CONFIG=13,"control:altitude_max","3000"'
+    assert drone_socket.recv(1024).decode() == "AT*CTRL=14,5,0\r"
+
+
+def test_configure_many_fills_datagrams(drone_socket):
+    """Batches filled up to the datagram size should still fit once the ACK
+    clearing command is prepended"""
+    cmd = Command("127.0.0.1")
+    cmd.is_configured = True
+    cmd.counter = 10**9  # as many digits as reserved for sequence numbers
+
+    def numbered_size(command: str) -> int:
+        return len(command) - len("#ID#") + len(str(cmd.counter))
+
+    ids_command = (
+        f'AT*CONFIG_IDS=#ID#,"{cmd.session_id}","{cmd.profile_id}","{cmd.app_id}"\r'
+    )
+    value_size = (
+        cmd.max_datagram_size
+        - numbered_size("AT*CTRL=#ID#,5,0\r")
+        - numbered_size(ids_command)
+        - numbered_size('AT*CONFIG=#ID#,"control:key",""\r')
+    )
+    assert cmd.configure_many([("control:key", "x" * value_size)] * 2)
+    datagrams = [drone_socket.recv(2048).decode() for _ in range(3)]
+    assert datagrams[1].startswith("AT*CTRL=")
+    assert len(datagrams[1]) == cmd.max_datagram_size
+    assert datagrams[2].startswith("AT*CTRL=")
+
+    # A larger configuration should be rejected before applying any batch
+    settings = [("control:key", "x"), ("control:key", "x" * (value_size + 1))]
+    with pytest.raises(ValueError):
+        cmd.configure_many(settings)
+    drone_socket.settimeout(0.2)
+    with pytest.raises(socket.timeout):
+        drone_socket.recv(2048)
@@ -0,0 +1,135 @@
+"""Testing the navigation data thread on a local socket"""
+from types import SimpleNamespace
+import socket
+import time
+
+import pytest
+
+from dronevis.drone_connect.navdata import Navdata
+from dronevis.drone_connect.navdata_decode import NavdataDemo, encode_navdata
+
+DEMO = NavdataDemo(0, 50, 12000.0, -3000.0, 0.0, 1000, 2.5, 0.0, 0.0)
+
+
+class FakeCommand:
+    """Command thread stand-in recording navdata activation and ACKs"""
+
+    def __init__(self) -> None:
+        self.thread_attr = SimpleNamespace(ip_address="127.0.0.1")
+        self.navdata_enabled = False
+        self.acks = 0
+
+    def activate_navdata(self, activate: bool = True) -> None:
+        """Record navdata activation"""
+        self.navdata_enabled = activate
+
+    def ack_command(self) -> bool:
+        """Count ACKs"""
+        self.acks += 1
+        return True
+
+
+@pytest.fixture
+def navdata_port(monkeypatch) -> int:
+    """Bind the navdata thread to a free local port"""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    monkeypatch.setattr(Navdata, "data_port", port)
+    return port
+
+
+def wait_for(condition, timeout: float = 2.0) -> bool:
+    """Wait until a condition holds"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_navdata_drains_bursts(navdata_port: int):
+    """Every datagram of a burst should reach the callback, and ACKs
+    should be forwarded to the command thread"""
+    com = FakeCommand()
+    received = []
+    nav_thread = Navdata(com, received.append, raw_packets=True)  # type: ignore
+    nav_thread.start()
+    assert wait_for(lambda: com.navdata_enabled)
+
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as drone:
+        for sequence in range(1, 101):
+            state = 1 << 6 if sequence % 10 == 0 else 0
+            packet = encode_navdata(state, sequence, {"navdata_demo": DEMO})
+            drone.sendto(packet, ("127.0.0.1", navdata_port))
+        assert wait_for(lambda: len(received) == 100)
+
+    nav_thread.stop()
+    nav_thread.join(timeout=1)
+    assert not nav_thread.is_alive()
+    assert not com.navdata_enabled
+    assert [packet.sequence for packet in received] == list(range(1, 101))
+    assert received[-1]["navdata_demo"]["altitude"] == 1000
+    assert received[-1]["navdata_demo"]["theta"] == 12000
+    assert com.acks == 10
+    assert nav_thread.metrics.stage("navdata_latency")["count"] == 100
+    assert nav_thread.metrics.counter("navdata_lost") == 0
+
+
+def test_navdata_change_callback(navdata_port: int):
+    """Callbacks should be changed while running, and invalid ones rejected"""
+    com = FakeCommand()
+    first, second = [], []
+    nav_thread = Navdata(com, first.append)  # type: ignore[arg-type]
+    assert not nav_thread.change_callback("WRONG")  # type: ignore[arg-type]
+    nav_thread.start()
+    assert wait_for(lambda: com.navdata_enabled)
+
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as drone:
+        drone.sendto(encode_navdata(0, 1, {}), ("127.0.0.1", navdata_port))
+        assert wait_for(lambda: len(first) == 1)
+        assert nav_thread.change_callback(second.append)
+        drone.sendto(encode_navdata(0, 3, {}), ("127.0.0.1", navdata_port))
+        assert wait_for(lambda: len(second) == 1)
+
+    nav_thread.stop()
+    nav_thread.join(timeout=1)
+    assert len(first) == 1
+    assert nav_thread.metrics.counter("navdata_lost") == 1
+
+
+def test_navdata_legacy_callback(navdata_port: int):
+    """Callbacks should receive the navdata dictionaries by default"""
+    received = []
+    nav_thread = Navdata(FakeCommand(), received.append)  # type: ignore[arg-type]
+    nav_thread.start()
+
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as drone:
+        packet = encode_navdata(1 << 0, 1, {"navdata_demo": DEMO})
+        drone.sendto(packet, ("127.0.0.1", navdata_port))
+        assert wait_for(lambda: len(received) == 1)
+
+    nav_thread.stop()
+    nav_thread.join(timeout=1)
+    assert isinstance(received[0], dict)
+    assert received[0]["drone_state"]["flying"] == 1
+    assert received[0]["navdata_demo"] == {
+        **DEMO._asdict(),
+        "theta": 12,
+        "phi": -3,
+        "vx": 2,
+        "vy": 0,
+        "vz": 0,
+    }
+
+
+def test_navdata_stop_wakes_up_thread(navdata_port: int):
+    """Stopping should not wait for incoming data"""
+    nav_thread = Navdata(FakeCommand(), lambda _: None)  # type: ignore[arg-type]
+    nav_thread.start()
+    start = time.perf_counter()
+    nav_thread.stop()
+    nav_thread.join(timeout=1)
+    assert not nav_thread.is_alive()
+    assert time.perf_counter() - start < 0.5
@@ -1,5 +1,37 @@
 """Testing drone packet decode"""
-from dronevis.drone_connect.navdata_decode import _drone_status_decode
+import struct
+
+import pytest
+
+from dronevis.drone_connect.navdata_decode import (
+    NAVDATA_OPTIONS,
+    GPSInfo,
+    NavdataDecoder,
+    NavdataDemo,
+    NavdataTime,
+    VisionDetect,
+    _drone_status_decode,
+    decode_navdata,
+    encode_navdata,
+    navdata_checksum,
+    navdata_decode,
+    register_navdata_option,
+)
+
+DEMO = NavdataDemo(0x20000, 87, 12500.0, -3200.0, 90000.0, 1200, 150.5, -20.25, 3.0)
+VISION = VisionDetect(1, 320, 180, 40, 30, 1500)
+GPS = GPSInfo(30.5, 31.25, 23.0, 1.5, 1, 1, 0)
+# Option sizes (including tag and size) of the AR.Drone SDK
+SDK_OPTION_SIZES = {1: 8, 2: 52, 3: 46, 10: 56, 21: 18, 22: 75, 23: 56, 24: 72}
+
+
+def full_packet() -> bytes:
+    """Encode a packet with every registered option"""
+    options = {}
+    for tag, option in NAVDATA_OPTIONS.items():
+        values = option.layout.unpack(bytes(range(tag, tag + option.layout.size)))
+        options[option.name] = option.record._make(values)
+    return encode_navdata(0, 7, options)
 
 
 def test_drone_status_decode():
@@ -40,3 +72,118 @@ def test_drone_status_decode():
     result = _drone_status_decode(packet)
 
     assert result == expected_output
+
+
+def test_decode_navdata_options():
+    """Options should be decoded into typed records, from any buffer"""
+    packet = encode_navdata(
+        1 << 6, 42, {"navdata_demo": DEMO, "vision_detect": VISION, "gps_info": GPS}
+    )
+    for buffer in (packet, bytearray(packet), memoryview(packet)):
+        navdata = decode_navdata(buffer)
+        assert navdata.sequence == 42
+        assert navdata.drone_state.command_ack == 1
+        assert navdata.drone_state.flying == 0
+        assert navdata.get("navdata_demo") == DEMO
+        assert navdata.get("vision_detect") == VISION
+        assert navdata.get("gps_info") == GPS
+        assert navdata.checksum == sum(packet[:-8])
+
+
+def test_decode_navdata_mapping_access():
+    """Decoded packets should be indexable like the legacy dictionaries"""
+    navdata = decode_navdata(encode_navdata(0, 1, {"navdata_demo": DEMO}))
+    assert navdata["drone_state"]["command_ack"] == 0
+    assert navdata["navdata_demo"]["altitude"] == 1200
+    assert navdata["navdata_demo"][1] == 87
+    assert "gps_info" not in navdata
+    with pytest.raises(KeyError):
+        navdata["navdata_demo"]["unknown"]  # pylint: disable=expression-not-assigned
+
+
+def test_navdata_decode_legacy_format():
+    """The dictionary decoder should keep converting angles and velocities"""
+    navdata = navdata_decode(encode_navdata(2, 1, {"navdata_demo": DEMO}))
+    assert navdata["drone_state"] == _drone_status_decode(2)
+    assert navdata["vision_detect"] == {}
+    assert navdata["gps_info"] == {}
+    assert navdata["navdata_demo"] == {
+        "ctrl_state": 0x20000,
+        "battery_percentage": 87,
+        "theta": 12,
+        "phi": -3,
+        "psi": 90000.0,
+        "altitude": 1200,
+        "vx": 150,
+        "vy": -20,
+        "vz": 3,
+    }
+
+
+def test_decode_navdata_skips_unknown_and_short_options():
+    """Unknown options should be skipped by size, and truncated ones ignored"""
+    packet = encode_navdata(0, 1, {"gps_info": GPS})
+    unknown = struct.pack("=HH", 99, 12) + bytes(8)
+    short_demo = struct.pack("=HH", 0, 8) + bytes(4)
+    navdata = decode_navdata(packet[:16] + unknown + short_demo + packet[16:])
+    assert navdata.options == {"gps_info": GPS}
+
+
+def test_decode_navdata_short_packet():
+    """Packets shorter than the header cannot be decoded"""
+    with pytest.raises(IOError):
+        decode_navdata(bytes(8))
+
+
+@pytest.mark.parametrize("tag,size", SDK_OPTION_SIZES.items())
+def test_option_layouts(tag: int, size: int):
+    """Registered layouts should match the option sizes sent by the drone"""
+    assert NAVDATA_OPTIONS[tag].layout.size + 4 == size
+
+
+def test_decoder_subscriptions():
+    """Only subscribed options should be decoded"""
+    packet = full_packet()
+    decoder = NavdataDecoder(options=["altitude", 22])
+    assert decoder.subscribed == {10: "altitude", 22: "magneto"}
+    assert set(decoder.decode(packet).options) == {"altitude", "magneto"}
+
+    decoder.subscribe("time")
+    decoder.unsubscribe(22)
+    navdata = decoder.decode(packet)
+    assert set(navdata.options) == {"altitude", "time"}
+    assert isinstance(navdata["time"], NavdataTime)
+
+    all_options = NavdataDecoder(NAVDATA_OPTIONS).decode(packet)
+    assert len(all_options.options) == len(NAVDATA_OPTIONS)
+    assert all_options["altitude"] == navdata["altitude"]
+
+
+def test_decoder_unknown_option():
+    """Subscribing to an unregistered option should raise"""
+    with pytest.raises(ValueError):
+        NavdataDecoder(options=["unknown"])
+    with pytest.raises(ValueError):
+        NavdataDecoder(options=[99])
+
+
+def test_decoder_verify_checksum():
+    """Packets with an invalid or missing checksum should be dropped if verified"""
+    packet = bytearray(full_packet())
+    assert navdata_checksum(packet, len(packet) - 8) == sum(packet[:-8])
+    decoder = NavdataDecoder(verify_checksum=True)
+    assert decoder.decode(packet).checksum == sum(packet[:-8])
+
+    packet[20] ^= 0xFF
+    NavdataDecoder().decode(packet)  # not verified
+    with pytest.raises(IOError):
+        decoder.decode(packet)
+    with pytest.raises(IOError):
+        decoder.decode(packet[:-8])
+
+
+def test_register_option_mismatch():
+    """Layouts should have a value per record field"""
+    with pytest.raises(ValueError):
+        register_navdata_option(99, "broken", "=II", NavdataTime)
+    assert 99 not in NAVDATA_OPTIONS
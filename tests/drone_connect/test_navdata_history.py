@@ -0,0 +1,103 @@
+"""Testing the navdata ring buffer"""
+import time
+
+import numpy as np
+import pytest
+
+from dronevis.drone_connect.demo_drone import DemoNavThread
+from dronevis.drone_connect.navdata_decode import (
+    NavdataDemo,
+    decode_navdata,
+    encode_navdata,
+)
+from dronevis.drone_connect.navdata_history import NavdataHistory
+
+
+def demo_navdata(altitude: int) -> dict:
+    """Navdata dictionary like the ones of the demo drone"""
+    return {
+        "navdata_demo": {
+            "battery_percentage": 80,
+            "theta": 0.0,
+            "phi": 0.0,
+            "psi": 0.0,
+            "altitude": altitude,
+            "vx": 1.0,
+            "vy": 2.0,
+            "vz": 3.0,
+        }
+    }
+
+
+def test_empty_history():
+    """Empty history should have no samples"""
+    history = NavdataHistory(capacity=4)
+    assert len(history) == 0
+    assert np.isnan(history.latest_value("altitude"))
+    with pytest.raises(IndexError):
+        history.latest()
+    timestamps, values = history.last(10, "altitude", now=0.0)
+    assert len(timestamps) == len(values) == 0
+
+
+def test_append_packets_and_dicts():
+    """Decoded packets and dictionaries should be stored alike"""
+    history = NavdataHistory(capacity=4)
+    demo = NavdataDemo(0, 50, 0.0, 0.0, 0.0, 1500, 0.0, 0.0, 0.0)
+    history.append(decode_navdata(encode_navdata(0, 1, {"navdata_demo": demo})), 1.0)
+    assert history.latest_value("altitude") == 1500
+    history.append(demo_navdata(2000), 2.0)
+    timestamp, row = history.latest()
+    assert timestamp == 2.0
+    assert row[history.columns.index("altitude")] == 2000
+    history.append({}, 3.0)
+    assert np.isnan(history.latest_value("altitude"))
+
+
+def test_append_demo_drone_navdata():
+    """Fields missing from received options should be stored as NaN"""
+    history = NavdataHistory(capacity=16)
+    nav_thread = DemoNavThread(history.append)
+    nav_thread.start()
+    deadline = time.monotonic() + 2
+    while len(history) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    nav_thread.running = False
+    nav_thread.join(timeout=1)
+
+    assert len(history) >= 2
+    _, row = history.latest()
+    values = dict(zip(history.columns, row))
+    assert not np.isnan(values["battery_percentage"])
+    assert not np.isnan(values["altitude"])
+    assert not np.isnan(values["vx"])
+    assert np.isnan(values["theta"]) and np.isnan(values["psi"])
+
+
+def test_ring_buffer_wraps_around():
+    """Only the latest samples should be kept, in chronological order"""
+    history = NavdataHistory(capacity=5)
+    for second in range(12):
+        history.append(demo_navdata(second * 100), float(second))
+
+    assert len(history) == 5
+    assert history.count == 12
+    timestamps, altitude = history.last(100, "altitude", now=11.0)
+    np.testing.assert_array_equal(timestamps, [7, 8, 9, 10, 11])
+    np.testing.assert_array_equal(altitude, [700, 800, 900, 1000, 1100])
+
+
+def test_windowed_queries_are_views():
+    """Windowed queries should select by time without copying"""
+    history = NavdataHistory(capacity=8)
+    for second in range(10):
+        history.append(demo_navdata(second), float(second))
+
+    timestamps, altitude = history.last(2.5, "altitude", now=9.0)
+    np.testing.assert_array_equal(timestamps, [7, 8, 9])
+    np.testing.assert_array_equal(altitude, [7, 8, 9])
+    assert np.shares_memory(altitude, history.latest()[1])
+
+    timestamps, rows = history.between(3.0, 4.0)
+    np.testing.assert_array_equal(timestamps, [3, 4])
+    assert rows.shape == (2, len(history.columns))
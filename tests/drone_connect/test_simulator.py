@@ -0,0 +1,147 @@
+"""Testing the real client stack against the drone simulator"""
+import socket
+import time
+
+import pytest
+
+from dronevis.drone_connect import Drone
+from dronevis.drone_connect.at_encoder import LAND, TAKEOFF, pcmd
+from dronevis.drone_connect.command import Command
+from dronevis.drone_connect.navdata import Navdata
+from dronevis.drone_connect.navdata_decode import (
+    NAVDATA_OPTIONS,
+    NavdataDecoder,
+    decode_navdata,
+)
+from dronevis.drone_connect.simulator import (
+    DroneSimulator,
+    FlightModel,
+    SimulatorConfig,
+)
+from dronevis.utils.recording import SessionRecording, Stream
+
+
+def local_config(**kwargs) -> SimulatorConfig:
+    """Simulator configuration on free local ports"""
+    return SimulatorConfig(
+        command_port=0, navdata_port=0, video_port=0, telnet_port=0, **kwargs
+    )
+
+
+@pytest.fixture
+def client_ports(monkeypatch):
+    """Point the client classes to a simulator"""
+
+    def point(simulator: DroneSimulator) -> None:
+        ports = simulator.ports
+        monkeypatch.setattr(Drone, "telnet_port", ports["telnet"])
+        monkeypatch.setattr(Command, "command_port", ports["command"])
+        monkeypatch.setattr(Navdata, "data_port", ports["navdata"])
+        monkeypatch.setattr(Navdata, "local_data_port", 0)
+
+    return point
+
+
+def wait_for(condition, timeout: float = 2.0) -> bool:
+    """Wait until a condition holds"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_flight_model_commands():
+    """AT commands should drive the simulated flight"""
+    flight = FlightModel()
+    assert flight.apply(TAKEOFF.encode(5).decode()[:-1], 0.0)
+    flight.step(0.5)
+    assert flight.flying and flight.altitude == pytest.approx(350)
+    assert flight.apply(pcmd(0.0, -0.5, 0.0, 0.0).encode(6).decode()[:-1], 0.0)
+    packet = decode_navdata(flight.navdata(1, 1.0, 0.25))
+    assert packet["navdata_demo"]["vx"] == pytest.approx(1000)
+    assert packet.drone_state.com_watchdog == 1
+    assert not flight.apply(LAND.encode(6).decode()[:-1], 0.0)
+    assert flight.apply('AT*CONFIG=7,"general:navdata_demo","FALSE"', 0.0)
+    assert flight.ack and not flight.navdata_demo
+    full = NavdataDecoder(NAVDATA_OPTIONS).decode(flight.navdata(2, 0.0, 0.25))
+    assert len(full.options) == len(NAVDATA_OPTIONS)
+    assert flight.apply("AT*CTRL=8,5,0", 0.0)
+    assert not flight.ack
+    assert not flight.apply("AT*REF=9,takeoff", 0.0)
+
+
+def test_drone_against_simulator(client_ports):
+    """The real drone should connect, configure and fly the simulator"""
+    with DroneSimulator(local_config(navdata_rate=100)) as simulator:
+        client_ports(simulator)
+        drone = Drone("127.0.0.1")
+        drone.connect()
+        assert drone.com_thread is not None
+        drone.com_thread.is_configured = True
+        received = []
+        drone.set_callback(received.append)
+        try:
+            assert drone.set_config(activate_navdata=True, max_altitude=2)
+            assert simulator.flight.configs["control:altitude_max"] == "2000"
+            drone.takeoff()
+            assert wait_for(lambda: received[-1]["drone_state"]["flying"] == 1)
+            assert wait_for(lambda: received[-1]["navdata_demo"]["altitude"] > 0)
+        finally:
+            drone.stop()
+    assert simulator.metrics.counter("simulator_commands") > 0
+    assert simulator.metrics.counter("simulator_commands_stale") == 0
+
+
+def test_link_drops_datagrams():
+    """Lost datagrams should never reach the client"""
+    config = local_config(navdata_rate=200, loss=1.0)
+    with DroneSimulator(config) as simulator:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as client:
+            client.settimeout(0.2)
+            client.sendto(
+                b"\x01\x00\x00\x00", ("127.0.0.1", simulator.ports["navdata"])
+            )
+            with pytest.raises(socket.timeout):
+                client.recv(4096)
+    assert simulator.metrics.counter("simulator_navdata") == 0
+    assert simulator.metrics.counter("simulator_navdata_dropped") > 0
+
+
+def test_video_and_telnet(client_ports):
+    """Video should stream JPEG frames and telnet should answer"""
+    with DroneSimulator(local_config(video_fps=60)) as simulator:
+        client_ports(simulator)
+        assert Drone("127.0.0.1")._check_telnet()
+        address = ("127.0.0.1", simulator.ports["video"])
+        with socket.create_connection(address, timeout=2) as video:
+            data = b""
+            while data.count(b"\xff\xd9") < 2:
+                data += video.recv(65536)
+        assert data.startswith(b"\xff\xd8")
+        assert wait_for(lambda: simulator.metrics.counter("simulator_frames") >= 2)
+
+
+def test_drone_records_session(client_ports, tmp_path):
+    """A recorded flight should hold the sent commands and received navdata"""
+    path = str(tmp_path / "flight.dvrec")
+    with DroneSimulator(local_config(navdata_rate=100)) as simulator:
+        client_ports(simulator)
+        drone = Drone("127.0.0.1")
+        drone.start_recording(path)
+        drone.connect()
+        received = []
+        drone.set_callback(received.append)
+        try:
+            drone.takeoff()
+            assert wait_for(lambda: len(received) > 5)
+        finally:
+            drone.stop()
+    assert drone.recorder is None
+    with SessionRecording(path) as recording:
+        commands = b"".join(
+            bytes(data) for _, data in recording.records(Stream.COMMAND)
+        )
+        assert b"AT*REF=" in commands
+        assert len(recording.select(Stream.NAVDATA)) >= len(received)
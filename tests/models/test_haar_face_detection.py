@@ -36,6 +36,17 @@ def test_predict():
     assert prediction.shape == (200, 200, 3)
 
 
+def test_detect():
+    """Test detect returns structured detections without drawing"""
+    model = HaarFaceDetection()
+    image = np.zeros((200, 200, 3), dtype=np.uint8)
+    detections = model.detect(image)
+    assert model.supports_detect
+    assert detections.boxes.shape == (0, 4)
+    assert len(detections.scores) == len(detections.class_ids) == 0
+    assert not image.any()
+
+
 def test_predict_with_unloaded_model():
     """Test predict with unloaded model"""
     model = HaarFaceDetection()
@@ -63,3 +63,64 @@ def test_create_wrong_model():
     """Test create segmentation model"""
     with pytest.raises(ValueError):
         ModelFactory.create_model("Wrong")
+
+
+@pytest.fixture
+def empty_cache(monkeypatch):
+    """Start and end the test with an empty model cache and default limits.
+    Aliases of the idle model are registered as extra lightweight models."""
+    for model_name in ["Other", "Third"]:
+        monkeypatch.setitem(
+            ModelFactory.models_list, model_name, ModelFactory.models_list["None"]
+        )
+    ModelFactory.clear_cache()
+    yield
+    ModelFactory.clear_cache()
+    ModelFactory.configure_cache(max_cached_models=4)
+    ModelFactory.memory_budget = None
+
+
+def test_create_model_from_cache(empty_cache):
+    """Loaded models should be reused on the next creation"""
+    model = ModelFactory.create_model("None")
+    assert ModelFactory.create_model("None") is model
+    assert ModelFactory.create_model("None", use_cache=False) is not model
+    assert ModelFactory.cached_models() == ["None"]
+
+
+def test_cache_evicts_least_recently_used(empty_cache):
+    """Least recently used models should be evicted over the cache size"""
+    ModelFactory.configure_cache(max_cached_models=2)
+    model = ModelFactory.create_model("None")
+    ModelFactory.create_model("Other")
+    ModelFactory.create_model("None")
+    ModelFactory.create_model("Third")
+    assert ModelFactory.cached_models() == ["None", "Third"]
+    assert ModelFactory.create_model("None") is model
+
+
+def test_cache_memory_budget(empty_cache, monkeypatch):
+    """Models should be evicted once the memory budget is exceeded"""
+    monkeypatch.setattr("dronevis.models.model_factory.model_memory", lambda model: 600)
+    ModelFactory.configure_cache(memory_budget=1000)
+    ModelFactory.create_model("None")
+    ModelFactory.create_model("Other")
+    assert ModelFactory.cached_models() == ["Other"]
+    assert ModelFactory.cache_memory() == 600
+
+    ModelFactory.configure_cache(memory_budget=100)
+    assert not ModelFactory.cached_models()
+
+    with pytest.raises(ValueError):
+        ModelFactory.configure_cache(memory_budget=-1)
+
+
+def test_prewarm(empty_cache):
+    """Prewarmed models should be cached in the background"""
+    thread = ModelFactory.prewarm(["None", "Other"])
+    assert thread is not None
+    thread.join(timeout=60)
+    assert ModelFactory.cached_models() == ["None", "Other"]
+
+    with pytest.raises(ValueError):
+        ModelFactory.prewarm(["Wrong"])
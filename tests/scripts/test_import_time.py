@@ -0,0 +1,71 @@
+"""Guard the CLI startup time by profiling its imports (``python -X importtime``)"""
+from typing import Dict
+import subprocess
+import sys
+
+import pytest
+
+from dronevis.models import models_list
+from dronevis.models.model_factory import ModelFactory
+
+HEAVY_MODULES = [
+    "torch",
+    "torchvision",
+    "ultralytics",
+    "mediapipe",
+    "transformers",
+    "dlib",
+    "ezcrowdcount",
+]
+GUI_MODULES = ["tkinter", "matplotlib", "PIL.ImageTk"]
+CLI_IMPORT_BUDGET_US = 2_000_000
+
+
+def import_times(module_name: str) -> Dict[str, int]:
+    """Import a module in a fresh interpreter, and get the cumulative import time
+    of each imported module in microseconds"""
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize("module_name", ["dronevis.__main__", "dronevis.models"])
+def test_no_heavy_imports(module_name: str):
+    """Importing the CLI or the models registry should not import model frameworks"""
+    times = import_times(module_name)
+    assert module_name in times
+    for heavy_module in HEAVY_MODULES:
+        assert heavy_module not in times, f"{heavy_module} imported at startup"
+
+
+def test_headless_has_no_gui_imports():
+    """The headless pipeline should not import any GUI library"""
+    times = import_times("dronevis.utils.headless")
+    for gui_module in GUI_MODULES + HEAVY_MODULES:
+        assert gui_module not in times, f"{gui_module} imported in headless mode"
+
+
+def test_cli_import_budget():
+    """CLI imports should stay within the startup budget"""
+    times = import_times("dronevis.__main__")
+    assert times["dronevis.__main__"] < CLI_IMPORT_BUDGET_US
+
+
+def test_registry_import_paths():
+    """Registered import paths should resolve to model classes"""
+    noop_class = ModelFactory.get_model_class("None")
+    assert noop_class.__name__ == "NOOPModel"
+    for import_path in models_list.values():
+        module_name, class_name = import_path.split(":")
+        assert module_name.startswith("dronevis.")
+        assert class_name.isidentifier()
@@ -29,6 +29,17 @@ def test_parse_default(cli):
     assert args.logger_level == "info"
 
 
+def test_parse_headless(cli):
+    """Testing cli parser in headless mode"""
+    args = cli.parse(["--mode", "headless", "--model", "SSD", "--source", "0"])
+    assert args.mode == "headless"
+    assert args.model == "SSD"
+    assert args.source == "0"
+    assert not args.realtime
+    with pytest.raises(SystemExit):
+        cli.parse(["--mode", "headless"])
+
+
 def test_print_available_control(capsys):
     """Testing print available control"""
     drone_cli = DroneCli()
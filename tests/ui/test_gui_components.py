@@ -2,9 +2,18 @@
 from tkinter import Canvas, Tk
 import os
 
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+import numpy as np
 import pytest
 
-from dronevis.ui.gui_components import CircularProgressbar, MainButton, DataFrame
+from dronevis.drone_connect.navdata_history import NavdataHistory
+from dronevis.ui.gui_components import (
+    AltitudePlot,
+    CircularProgressbar,
+    MainButton,
+    DataFrame,
+)
 from dronevis.config.gui import BUTTON_COLOR, WHITE_COLOR, FONT_COLOR
 
 
@@ -100,3 +109,25 @@ def test_dataframe_init(mocker):
     root.tk = mocker.Mock()
     dataframe = DataFrame(root, title="dronevis")
     assert isinstance(dataframe, DataFrame)
+
+
+def test_altitude_plot_redraws_on_new_navdata(mocker):
+    """The height graph should keep a single line, and blit it only when new
+    navdata arrived"""
+    history = NavdataHistory(64, {"altitude": ("navdata_demo", "altitude")})
+    canvas = FigureCanvasAgg(Figure())
+    plot = AltitudePlot(canvas, history)
+    blit = mocker.spy(canvas, "blit")
+
+    assert plot.update()  # first full draw caches the background
+    assert not plot.update()
+    for second in range(30):
+        history.append({"navdata_demo": {"altitude": second * 100}}, float(second))
+    assert plot.update()
+    assert not plot.update()
+
+    assert blit.call_count == 1
+    assert list(plot.axis.lines) == [plot.line]
+    times, altitude = plot.line.get_data()
+    np.testing.assert_array_equal(times, np.arange(21.0))
+    np.testing.assert_allclose(altitude, np.arange(9, 30) / 10)
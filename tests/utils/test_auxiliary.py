@@ -0,0 +1,91 @@
+"""Testing the auxiliary model runner"""
+import time
+
+import numpy as np
+
+from dronevis.utils.auxiliary import AuxiliaryModelRunner
+
+
+class SumModel:
+    """Model summing the pixels of frames"""
+
+    def __init__(self) -> None:
+        self.frames = 0
+
+    def predict(self, frame: np.ndarray) -> int:
+        self.frames += 1
+        return int(frame.sum())
+
+
+def wait_for_result(runner: AuxiliaryModelRunner, timeout: float = 2.0):
+    """Wait for the next result of the runner"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        result = runner.results.take()
+        if result is not None:
+            return result
+        time.sleep(0.005)
+    return None
+
+
+def test_model_loads_on_first_enable():
+    """The model should only be created once the runner is enabled"""
+    loads = []
+
+    def load_model() -> SumModel:
+        loads.append(time.monotonic())
+        return SumModel()
+
+    runner = AuxiliaryModelRunner(load_model, SumModel.predict, rate=1000)
+    assert not runner.submit(np.ones((2, 2)))
+    assert not loads and not runner.is_alive()
+
+    runner.enable()
+    try:
+        assert runner.submit(np.ones((2, 2)))
+        assert wait_for_result(runner) == 4
+        runner.disable()
+        assert not runner.submit(np.ones((2, 2)))
+        runner.enable()
+        assert runner.submit(np.full((2, 2), 2))
+        assert wait_for_result(runner) == 8
+    finally:
+        runner.stop()
+        runner.join(timeout=1)
+    assert len(loads) == 1
+    assert runner.metrics.stage("auxiliary_inference")["count"] == 2
+
+
+def test_submit_is_rate_limited():
+    """Frames offered faster than the rate should be skipped"""
+    runner = AuxiliaryModelRunner(SumModel, SumModel.predict, rate=2)
+    runner.enable()
+    try:
+        accepted = [runner.submit(np.zeros((2, 2))) for _ in range(50)]
+        assert accepted.count(True) == 1
+    finally:
+        runner.stop()
+        runner.join(timeout=1)
+    assert not runner.is_alive()
+
+
+def test_failing_model():
+    """Errors of the model should be counted, and a failed load should disable
+    the runner"""
+    runner = AuxiliaryModelRunner(SumModel, lambda model, frame: 1 / 0, rate=1000)
+    runner.enable()
+    runner.submit(np.zeros((2, 2)))
+    deadline = time.monotonic() + 2
+    while not runner.metrics.counter("auxiliary_errors"):
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+    runner.stop()
+    runner.join(timeout=1)
+
+    def broken() -> SumModel:
+        raise IOError("weights not found")
+
+    runner = AuxiliaryModelRunner(broken, SumModel.predict)
+    runner.enable()
+    runner.join(timeout=1)
+    assert not runner.enabled and not runner.submit(np.zeros((2, 2)))
@@ -0,0 +1,40 @@
+"""Test drawing of structured detections"""
+import numpy as np
+
+from dronevis.abstract import Detections
+from dronevis.utils.drawing import draw_detections
+
+
+def test_draw_boxes():
+    """Boxes should be drawn in-place on the image"""
+    image = np.zeros((50, 50, 3), dtype=np.uint8)
+    detections = Detections(
+        boxes=np.array([[10, 10, 30, 30]], dtype=np.float32),
+        scores=np.array([0.9], dtype=np.float32),
+        class_ids=np.array([0]),
+    )
+    output = draw_detections(image, detections)
+    assert output is image
+    assert (image[10, 10:31] == (0, 255, 0)).all()
+    assert not image[20, 20].any()
+
+
+def test_draw_masks_and_keypoints():
+    """Masks should be tinted, and keypoints drawn as dots"""
+    image = np.zeros((50, 50, 3), dtype=np.uint8)
+    masks = np.zeros((1, 50, 50), dtype=bool)
+    masks[0, :5, :5] = True
+    detections = Detections(
+        masks=masks, keypoints=np.array([[[40, 40]]], dtype=np.float32)
+    )
+    draw_detections(image, detections)
+    assert (image[0, 0] == (0, 127, 0)).all()
+    assert not image[10, 10].any()
+    assert (image[40, 40] == (0, 255, 0)).all()
+
+
+def test_draw_empty_detections():
+    """Nothing should be drawn without detections"""
+    image = np.zeros((50, 50, 3), dtype=np.uint8)
+    draw_detections(image, Detections(), class_names=["face"])
+    assert not image.any()
@@ -0,0 +1,90 @@
+"""Testing the multi-model fan-out"""
+import numpy as np
+import pytest
+
+from dronevis.abstract.detections import Detections
+from dronevis.abstract.noop_model import NOOPModel
+from dronevis.models.model_factory import ModelFactory
+from dronevis.utils.fan_out import (
+    PROCESS,
+    ModelBranch,
+    ModelFanOut,
+    OverlayCompositor,
+)
+
+BOX = Detections(
+    boxes=np.array([[2, 2, 12, 12]], dtype=np.float32),
+    scores=np.ones(1, dtype=np.float32),
+    class_ids=np.zeros(1, dtype=np.int64),
+)
+
+
+class BoxModel(NOOPModel):
+    """Model detecting a fixed box, counting its calls"""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def detect(self, image: np.ndarray) -> Detections:
+        self.calls += 1
+        return BOX
+
+
+class WritingModel(NOOPModel):
+    """Model drawing on the frame it detects on"""
+
+    def detect(self, image: np.ndarray) -> Detections:
+        image[0, 0] = 255
+        return Detections()
+
+
+def test_compositor_merges_outputs():
+    """Images should be blended, then detections drawn on top"""
+    frame = np.zeros((20, 20, 3), dtype=np.uint8)
+    depth = ModelBranch("None", output=np.full((10, 10), 200, dtype=np.uint8))
+    boxes = ModelBranch("None", model=BoxModel(), output=BOX)
+    composed = OverlayCompositor(alpha=0.5).compose(frame, [boxes, depth])
+    assert not frame.any()
+    assert composed[15, 15].tolist() == [100, 100, 100]
+    assert composed[2, 7].tolist() == [0, 255, 0]
+
+
+def test_rate_limits_and_shared_frame():
+    """Each branch should run at its own rate on the read-only decoded frame"""
+    every_frame, limited = BoxModel(), BoxModel()
+    branches = [
+        ModelBranch("None", model=every_frame),
+        ModelBranch("None", rate=0.5, model=limited),
+        ModelBranch("None", model=WritingModel()),
+        ModelBranch("None"),
+    ]
+    frame = np.zeros((20, 20, 3), dtype=np.uint8)
+    with ModelFanOut(branches) as fan_out:
+        for _ in range(5):
+            composed = fan_out.process(frame)
+    assert every_frame.calls == 5
+    assert limited.calls == 1
+    assert fan_out.metrics.counter("fan_out_errors") == 5
+    assert fan_out.metrics.stage("model_None")["count"] == 11
+    assert not frame.any()
+    assert composed[2, 7].tolist() == [0, 255, 0]
+    assert branches[3].model is not ModelFactory.create_model("None")
+
+
+def test_process_backend():
+    """Process branches should load their model in the worker processes"""
+    branch = ModelBranch("HaarFaceDetector", backend=PROCESS)
+    frame = np.zeros((60, 80, 3), dtype=np.uint8)
+    with ModelFanOut([branch]) as fan_out:
+        composed = fan_out.process(frame)
+    assert isinstance(branch.output, Detections)
+    assert len(branch.output) == 0
+    assert composed.shape == frame.shape
+
+
+def test_unsupported_branches():
+    """Unknown models and backends should be rejected"""
+    with pytest.raises(ValueError):
+        ModelFanOut([ModelBranch("Unknown")])
+    with pytest.raises(ValueError):
+        ModelFanOut([ModelBranch("None", backend="gpu")])
@@ -0,0 +1,146 @@
+"""Testing latest-frame-wins capture thread"""
+from typing import Generator
+import threading
+import time
+
+import pytest
+import numpy as np
+
+from dronevis.utils.frame_grabber import FrameGrabber
+from dronevis.utils.metrics import MetricsRegistry
+
+
+class FakeCapture:
+    """Capture stand-in producing a fixed number of numbered frames"""
+
+    def __init__(self, num_frames: int = 50, delay: float = 0.001) -> None:
+        self.num_frames = num_frames
+        self.delay = delay
+        self.index = 0
+
+    def get(self, _) -> float:
+        """Live streams report no frame count"""
+        return -1
+
+    def read(self):
+        """Return the next frame filled with its index"""
+        time.sleep(self.delay)
+        if self.index >= self.num_frames:
+            return False, None
+        frame = np.full((2, 2, 3), self.index, dtype=np.uint8)
+        self.index += 1
+        return True, frame
+
+
+class StalledCapture(FakeCapture):
+    """Capture whose reads block until unblocked, recording its release"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.unblocked = threading.Event()
+        self.is_reading = threading.Event()
+        self.released = False
+
+    def read(self):
+        """Block like a stalled stream"""
+        self.is_reading.set()
+        self.unblocked.wait()
+        assert not self.released, "Capture released while reading"
+        return super().read()
+
+    def release(self) -> None:
+        """Record the release"""
+        self.released = True
+
+
+@pytest.fixture
+def grabber() -> Generator[FrameGrabber, None, None]:
+    """Fixture for a started grabber over a fake capture"""
+    frame_grabber = FrameGrabber(FakeCapture())
+    frame_grabber.start()
+    yield frame_grabber
+    frame_grabber.stop()
+    frame_grabber.join()
+
+
+def test_read_returns_newest_frame(grabber: FrameGrabber):
+    """A slow consumer should always get the latest decoded frame"""
+    grabber.join()
+    status, frame = grabber.read(timeout=0.1)
+    assert status
+    assert frame is not None
+    assert frame[0, 0, 0] == 49
+
+
+def test_superseded_frames_are_dropped(grabber: FrameGrabber):
+    """Every frame that was not consumed should be counted as dropped"""
+    grabber.join()
+    grabber.read(timeout=0.1)
+    assert grabber.captured_frames == 50
+    assert grabber.dropped_frames == 49
+
+
+def test_read_after_source_ended(grabber: FrameGrabber):
+    """Once the source ended and the last frame was taken, status is False"""
+    grabber.join()
+    grabber.read(timeout=0.1)
+    status, frame = grabber.read(timeout=0.1)
+    assert grabber.is_ended
+    assert not status
+    assert frame is None
+
+
+def test_stop_wakes_up_reader():
+    """Stopping the grabber should release a reader waiting for a frame"""
+    frame_grabber = FrameGrabber(FakeCapture(num_frames=0, delay=1))
+    frame_grabber.stop()
+    status, frame = frame_grabber.read(timeout=5)
+    assert status
+    assert frame is None
+
+
+def test_read_batch_keeps_newest_frames():
+    """With a queue, the newest frames should be returned in decoding order"""
+    frame_grabber = FrameGrabber(FakeCapture(num_frames=10), queue_size=4)
+    frame_grabber.start()
+    frame_grabber.join()
+    status, frames = frame_grabber.read_batch(8, timeout=0.1)
+    assert status
+    assert [frame[0, 0, 0] for frame in frames] == [6, 7, 8, 9]
+    assert frame_grabber.dropped_frames == 6
+
+
+def test_grabber_records_metrics():
+    """Capture timings and dropped frames should be recorded in the registry"""
+    metrics = MetricsRegistry()
+    frame_grabber = FrameGrabber(
+        FakeCapture(num_frames=10), queue_size=2, metrics=metrics
+    )
+    frame_grabber.start()
+    frame_grabber.join()
+    assert frame_grabber.queue_depth == 2
+    assert metrics.stage("capture")["count"] == 10
+    assert metrics.counter("dropped_frames") == 8
+
+
+def test_stalled_capture_released_on_exit():
+    """A grabber blocked reading a frame should release the capture once it exits,
+    and a stopped grabber right away"""
+    capture = StalledCapture()
+    frame_grabber = FrameGrabber(capture)
+    frame_grabber.start()
+    assert capture.is_reading.wait(timeout=1)
+    frame_grabber.stop(release_capture=True)
+    frame_grabber.join(timeout=0.1)
+    assert frame_grabber.is_alive()
+    assert not capture.released
+    capture.unblocked.set()
+    frame_grabber.join(timeout=1)
+    assert not frame_grabber.is_alive()
+    assert capture.released
+
+    capture = StalledCapture()
+    capture.unblocked.set()
+    frame_grabber = FrameGrabber(capture)
+    frame_grabber.stop(release_capture=True)
+    assert capture.released
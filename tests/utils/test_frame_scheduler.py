@@ -0,0 +1,72 @@
+"""Testing frame scheduler and rate counters"""
+import time
+
+import pytest
+
+from dronevis.utils.frame_scheduler import FrameScheduler, RateCounter
+
+
+def test_rate_counter_without_events():
+    """Rate should be zero if no events were recorded"""
+    counter = RateCounter()
+    assert counter.rate == 0.0
+    assert counter.count == 0
+
+
+def test_rate_counter_measures_rate():
+    """Ticking every 10 ms should give a rate close to 100 per second"""
+    counter = RateCounter()
+    for _ in range(20):
+        counter.tick()
+        time.sleep(0.01)
+    assert counter.count == 20
+    assert 30 < counter.rate < 110
+
+
+def test_rate_counter_reset():
+    """Reset should forget all recorded events"""
+    counter = RateCounter()
+    counter.tick()
+    counter.tick()
+    counter.reset()
+    assert counter.count == 0
+    assert counter.rate == 0.0
+
+
+@pytest.mark.parametrize("target_fps", [0, -5])
+def test_invalid_target_fps(target_fps):
+    """Target fps should be a positive number"""
+    with pytest.raises(ValueError):
+        FrameScheduler(target_fps=target_fps)
+
+
+@pytest.mark.parametrize("skip_frames", [0, -1, 1.5])
+def test_invalid_skip_frames(skip_frames):
+    """Skip frames should be a positive integer"""
+    with pytest.raises(ValueError):
+        FrameScheduler(skip_frames=skip_frames)
+
+
+def test_skip_n_inference_frames():
+    """Inference should run on every Nth frame only"""
+    scheduler = FrameScheduler(skip_frames=3)
+    decisions = [scheduler.should_infer() for _ in range(7)]
+    assert decisions == [True, False, False, True, False, False, True]
+
+
+def test_time_to_next_frame_is_bounded_by_period():
+    """The wait should never be longer than a single frame period"""
+    scheduler = FrameScheduler(target_fps=20)
+    for _ in range(3):
+        wait_time = scheduler.time_to_next_frame()
+        assert 0 <= wait_time <= 0.05 + 1e-3
+        time.sleep(wait_time)
+
+
+def test_deadline_resets_when_falling_behind():
+    """A late loop should not burst frames to catch up"""
+    scheduler = FrameScheduler(target_fps=100)
+    scheduler.time_to_next_frame()
+    time.sleep(0.1)
+    assert scheduler.time_to_next_frame() == 0
+    assert scheduler.time_to_next_frame() > 0
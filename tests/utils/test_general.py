@@ -65,6 +65,17 @@ def test_gui_parse_default_args():
     args = gui_parse([])
     assert args.drone == "demo"
     assert args.logger_level == "info"
+    assert args.prewarm == []
+    assert args.model_memory_budget is None
+
+
+def test_gui_parse_prewarm_models():
+    """Test that gui_parse returns models to prewarm"""
+    args = gui_parse(["--prewarm", "SSD", "YOLOv8Detect", "--model-cache-size", "2"])
+    assert args.prewarm == ["SSD", "YOLOv8Detect"]
+    assert args.model_cache_size == 2
+    with pytest.raises(SystemExit):
+        gui_parse(["--prewarm", "Wrong"])
 
 
 def test_gui_parse_invalid_drone_choice():
@@ -0,0 +1,115 @@
+"""Testing headless video pipeline and its sinks"""
+from typing import List
+import json
+import urllib.request
+
+import cv2
+import numpy as np
+import pytest
+
+from dronevis.abstract.abstract_sink import Sink
+from dronevis.utils.headless import HeadlessPipeline
+from dronevis.utils.metrics import MetricsRegistry
+from dronevis.utils.sinks import JSONLSink, MetricsServer, VideoSink
+
+NUM_FRAMES = 20
+
+
+class RecordingSink(Sink):
+    """Sink keeping the indices of written frames"""
+
+    def __init__(self, needs_image: bool = False) -> None:
+        self.needs_image = needs_image
+        self.indices: List[int] = []
+        self.images: List[np.ndarray] = []
+        self.is_closed = False
+
+    def write(self, frame_index, timestamp, detections, image) -> None:
+        self.indices.append(frame_index)
+        if image is not None:
+            self.images.append(image)
+
+    def close(self) -> None:
+        self.is_closed = True
+
+
+@pytest.fixture
+def video_path(tmp_path) -> str:
+    """Write a short video file"""
+    path = str(tmp_path / "video.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (64, 48))
+    for index in range(NUM_FRAMES):
+        writer.write(np.full((48, 64, 3), index * 10, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def test_pipeline_processes_every_frame(video_path: str):
+    """Video files should be processed at full speed without dropping frames"""
+    sink = RecordingSink()
+    pipeline = HeadlessPipeline("None", video_path, sinks=[sink])
+    assert pipeline.run() == NUM_FRAMES
+    assert sink.indices == list(range(NUM_FRAMES))
+    assert not sink.images
+    assert sink.is_closed
+    assert pipeline.metrics.counter("frames") == NUM_FRAMES
+    assert pipeline.metrics.stage("capture")["count"] == NUM_FRAMES
+
+
+def test_pipeline_max_frames(video_path: str):
+    """The pipeline should stop after the max number of frames"""
+    sink = RecordingSink(needs_image=True)
+    pipeline = HeadlessPipeline("None", video_path, sinks=[sink], max_frames=5)
+    assert pipeline.run() == 5
+    assert len(sink.images) == 5
+
+
+def test_pipeline_with_wrong_inputs(tmp_path):
+    """Unknown models, batch sizes and sources should raise errors"""
+    with pytest.raises(ValueError):
+        HeadlessPipeline("Wrong", "video.avi")
+    with pytest.raises(ValueError):
+        HeadlessPipeline("None", "video.avi", batch_size=0)
+    with pytest.raises(ConnectionError):
+        HeadlessPipeline("None", str(tmp_path / "missing.avi")).run()
+
+
+def test_jsonl_sink(video_path: str, tmp_path):
+    """Detections of each frame should be logged as a JSON line"""
+    jsonl_path = str(tmp_path / "detections.jsonl")
+    sink = JSONLSink(jsonl_path)
+    pipeline = HeadlessPipeline("HaarFaceDetector", video_path, sinks=[sink])
+    pipeline.run()
+    with open(jsonl_path, encoding="utf-8") as jsonl_file:
+        records = [json.loads(line) for line in jsonl_file]
+    assert len(records) == NUM_FRAMES
+    assert records[0]["frame"] == 0
+    assert records[0]["boxes"] == []
+
+
+def test_video_sink(video_path: str, tmp_path):
+    """Rendered frames should be encoded into a video file"""
+    output_path = str(tmp_path / "output.avi")
+    pipeline = HeadlessPipeline(
+        "None", video_path, sinks=[VideoSink(output_path, fourcc="MJPG")]
+    )
+    pipeline.run()
+    cap = cv2.VideoCapture(output_path)
+    assert cap.get(cv2.CAP_PROP_FRAME_COUNT) == NUM_FRAMES
+    cap.release()
+
+
+def test_metrics_server():
+    """Metrics should be served as Prometheus text and JSON"""
+    metrics = MetricsRegistry()
+    metrics.increment("frames", 3)
+    server = MetricsServer(metrics, host="127.0.0.1", port=0)
+    server.start()
+    try:
+        url = f"http://127.0.0.1:{server.port}"
+        with urllib.request.urlopen(url + "/metrics") as response:
+            assert "dronevis_frames_total 3" in response.read().decode()
+        with urllib.request.urlopen(url + "/metrics.json") as response:
+            assert json.loads(response.read())["counters"] == {"frames": 3}
+    finally:
+        server.stop()
@@ -0,0 +1,41 @@
+"""Testing the single-slot mailbox"""
+import threading
+
+from dronevis.utils.mailbox import Mailbox
+
+
+def test_take_returns_newest_item():
+    """Only the newest posted item should be taken, once"""
+    mailbox: Mailbox[int] = Mailbox()
+    assert mailbox.take() is None
+    for item in range(3):
+        mailbox.post(item)
+    assert mailbox.take() == 2
+    assert mailbox.take() is None
+    assert mailbox.posted == 3
+    assert mailbox.superseded == 2
+
+
+def test_concurrent_producer():
+    """Every posted item should be either taken or superseded"""
+    mailbox: Mailbox[int] = Mailbox()
+    taken = []
+
+    def produce() -> None:
+        for item in range(10000):
+            mailbox.post(item)
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    while producer.is_alive():
+        item = mailbox.take()
+        if item is not None:
+            taken.append(item)
+    producer.join()
+    item = mailbox.take()
+    if item is not None:
+        taken.append(item)
+
+    assert taken == sorted(taken)
+    assert taken[-1] == 9999
+    assert len(taken) + mailbox.superseded == mailbox.posted == 10000
@@ -0,0 +1,87 @@
+"""Testing metrics registry"""
+import json
+import time
+
+import pytest
+
+from dronevis.utils.metrics import MetricsRegistry, StageTimings
+
+
+def test_stage_percentiles():
+    """Percentiles should be computed over the rolling window only"""
+    timings = StageTimings(window=100)
+    for value in range(200):
+        timings.observe(value)
+    summary = timings.summary()
+    assert summary["count"] == 200
+    assert summary["mean"] == pytest.approx(99.5)
+    assert summary["p50"] == pytest.approx(149.5)
+    assert summary["p99"] == pytest.approx(198.01)
+
+
+def test_empty_stage():
+    """Stages that were never observed should be all zeros"""
+    metrics = MetricsRegistry()
+    assert metrics.stage("inference") == {
+        "count": 0,
+        "mean": 0.0,
+        "p50": 0.0,
+        "p95": 0.0,
+        "p99": 0.0,
+    }
+
+
+def test_time_stage():
+    """Timed blocks should be recorded even if they raise"""
+    metrics = MetricsRegistry()
+    with metrics.time("inference"):
+        time.sleep(0.01)
+    with pytest.raises(RuntimeError):
+        with metrics.time("inference"):
+            raise RuntimeError
+    summary = metrics.stage("inference")
+    assert summary["count"] == 2
+    # Percentiles interpolate between the samples, hence check the total
+    assert summary["mean"] * summary["count"] >= 0.01
+
+
+def test_counters_and_gauges():
+    """Counters should accumulate, and gauges should keep the latest value"""
+    metrics = MetricsRegistry()
+    metrics.increment("dropped_frames")
+    metrics.increment("dropped_frames", 2)
+    metrics.set_gauge("queue_depth", 3)
+    metrics.set_gauge("queue_depth", 1)
+    assert metrics.counter("dropped_frames") == 3
+    assert metrics.gauge("queue_depth") == 1
+    with pytest.raises(ValueError):
+        metrics.increment("dropped_frames", -1)
+
+    metrics.reset()
+    assert metrics.counter("dropped_frames") == 0
+
+
+def test_json_export():
+    """JSON export should hold stages, counters and gauges"""
+    metrics = MetricsRegistry()
+    metrics.observe("capture", 0.5)
+    metrics.increment("frames")
+    metrics.set_gauge("queue_depth", 2)
+    exported = json.loads(metrics.to_json())
+    assert exported["stages"]["capture"]["p50"] == 0.5
+    assert exported["counters"] == {"frames": 1}
+    assert exported["gauges"] == {"queue_depth": 2}
+
+
+def test_prometheus_export():
+    """Prometheus export should follow the text exposition format"""
+    metrics = MetricsRegistry()
+    metrics.observe("inference", 0.25)
+    metrics.increment("dropped_frames", 4)
+    metrics.set_gauge("queue_depth", 1)
+    lines = metrics.to_prometheus().splitlines()
+    assert "# TYPE dronevis_stage_seconds summary" in lines
+    assert 'dronevis_stage_seconds{stage="inference",quantile="0.95"} 0.25' in lines
+    assert 'dronevis_stage_seconds_count{stage="inference"} 1' in lines
+    assert "dronevis_dropped_frames_total 4" in lines
+    assert "dronevis_queue_depth 1" in lines
@@ -0,0 +1,77 @@
+"""Testing the shared memory inference backend"""
+import numpy as np
+import pytest
+
+from dronevis.abstract.detections import Detections
+from dronevis.utils.shared_inference import (
+    ProcessModel,
+    SharedMemoryBackend,
+    pack_detections,
+    unpack_detections,
+)
+
+
+def test_pack_detections_round_trip():
+    """Packed detections should unpack to the same arrays"""
+    rng = np.random.default_rng(0)
+    detections = Detections(
+        boxes=rng.random((3, 4), dtype=np.float32),
+        scores=rng.random(3, dtype=np.float32),
+        class_ids=np.array([1, 5, 7]),
+        masks=rng.random((3, 5, 7)) > 0.5,
+        keypoints=rng.random((3, 17, 3), dtype=np.float32),
+    )
+    unpacked = unpack_detections(pack_detections(detections))
+    for name in ("boxes", "scores", "class_ids", "masks", "keypoints"):
+        np.testing.assert_array_equal(
+            getattr(unpacked, name), getattr(detections, name)
+        )
+    empty = unpack_detections(pack_detections(Detections()))
+    assert len(empty) == 0 and empty.masks is None and empty.keypoints is None
+
+
+def test_backend_runs_detections_and_images():
+    """Workers should return detections of detecting models, and output images
+    of other models through the ring"""
+    frames = [np.full((60, 80, 3), value, dtype=np.uint8) for value in range(6)]
+    with SharedMemoryBackend("HaarFaceDetector", workers=2) as backend:
+        assert backend.supports_detect
+        outputs = backend.map(frames)
+    assert all(isinstance(output, Detections) for output in outputs)
+
+    with SharedMemoryBackend("None", workers=2, slots=2) as backend:
+        outputs = backend.map(frames)
+    assert [int(output[0, 0, 0]) for output in outputs] == list(range(6))
+
+
+def test_process_model():
+    """Process models should stand in for the models they run"""
+    model = ProcessModel("HaarFaceDetector", workers=1)
+    frame = np.zeros((60, 80, 3), dtype=np.uint8)
+    try:
+        assert model.supports_detect
+        assert len(model.detect(frame)) == 0
+        (detections,) = model.predict_batch([frame])
+        assert model.render(frame, detections).shape == frame.shape
+    finally:
+        model.close()
+
+
+def test_backend_fails_to_load():
+    """Models which can't be loaded should fail the backend construction"""
+    with pytest.raises(RuntimeError):
+        SharedMemoryBackend("Unknown", workers=1)
+
+
+def test_backend_fails_when_a_worker_exits():
+    """Requests should fail once a worker exits, instead of waiting forever"""
+    frame = np.zeros((60, 80, 3), dtype=np.uint8)
+    with SharedMemoryBackend("None", workers=1, slots=1) as backend:
+        backend.map([frame])
+        worker = backend._workers[0]  # pylint: disable=protected-access
+        worker.kill()
+        worker.join()
+        with pytest.raises(RuntimeError):
+            backend.submit(frame).result(timeout=5)
+        with pytest.raises(RuntimeError):
+            backend.submit(frame)